@@ -1,9 +1,14 @@
 import os
+import sys
 import json
 import requests
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 
+# Run from the repository root: python Mini_Programs/AH_searcher_auctions.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from speed_scanner import AuctionTable  # noqa: E402
+
 # === Setup ===
 REGION = 'us'
 REALM_INDEX_URL = f"https://{REGION}.api.blizzard.com/data/wow/connected-realm/index"
@@ -76,17 +81,13 @@ def main():
     auction_url = AUCTION_URL_TEMPLATE.format(realm_id=realm_id)
     response = requests.get(auction_url, headers=headers, params=params)
     response.raise_for_status()
-    auctions = response.json().get('auctions', [])
+    auctions = AuctionTable.from_auctions(response.json().get('auctions', []))
 
     matches = []
-    for auction in auctions:
-        auction_item = auction.get('item', {})
-        if auction_item.get('id') != item_id:
-            continue
-
-        bonus_lists = auction.get('bonus_lists', [])
+    for row in auctions.rows_for_item(item_id):
+        auction = auctions.auction(row)
         suffix = ''
-        for bonus_id in bonus_lists:
+        for bonus_id in auctions.bonus_list(row):
             if bonus_id in SUFFIX_MAP:
                 suffix = SUFFIX_MAP[bonus_id]
                 break
@@ -0,0 +1,115 @@
+import argparse
+import glob
+import gzip
+import importlib
+import json
+import os
+import time
+import zlib
+
+# === Setup ===
+# Recorded payloads benchmarked when no paths are given (run from the repository root)
+DEFAULT_PATTERNS = [
+    "RaidBots_APIs/*.json",
+    "Cache/snapshots/*/*.json.gz",  # Raw auction snapshots archived by speed_scanner.py
+]
+
+# Candidate decoders; any that are not installed are skipped
+DECODERS = {
+    "json": ("json", "loads"),
+    "orjson": ("orjson", "loads"),
+    "ujson": ("ujson", "loads"),
+}
+
+
+def available_decoders():
+    """Returns {name: loads function} for every installed JSON library."""
+    found = {}
+    for name, (module_name, attr) in DECODERS.items():
+        try:
+            found[name] = getattr(importlib.import_module(module_name), attr)
+        except ImportError:
+            continue
+    return found
+
+
+def read_payload(path):
+    """Reads a recorded payload as bytes, transparently un-gzipping .gz files."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return gzip.decompress(raw) if path.endswith(".gz") else raw
+
+
+def best_time(fn, repeat):
+    """Returns the fastest of `repeat` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_file(path, decoders, repeat):
+    raw = read_payload(path)
+    size_mb = len(raw) / 1e6
+    row = {"file": path, "size_mb": round(size_mb, 3), "decode_ms_per_mb": {}}
+
+    for name, loads in decoders.items():
+        seconds = best_time(lambda: loads(raw), repeat)
+        row["decode_ms_per_mb"][name] = round(seconds * 1000 / max(size_mb, 1e-9), 2)
+
+    # Transfer side: compressed size and decompression cost per MB of JSON
+    gzipped = gzip.compress(raw, compresslevel=6)
+    row["gzip_ratio"] = round(len(gzipped) / max(len(raw), 1), 3)
+    row["gunzip_ms_per_mb"] = round(
+        best_time(lambda: zlib.decompress(gzipped, 16 + zlib.MAX_WBITS), repeat) * 1000 / max(size_mb, 1e-9), 2
+    )
+    try:
+        import brotli
+        compressed = brotli.compress(raw, quality=5)
+        row["brotli_ratio"] = round(len(compressed) / max(len(raw), 1), 3)
+        row["unbrotli_ms_per_mb"] = round(
+            best_time(lambda: brotli.decompress(compressed), repeat) * 1000 / max(size_mb, 1e-9), 2
+        )
+    except ImportError:
+        pass
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON decode time per MB on recorded payloads.")
+    parser.add_argument("paths", nargs="*", help="JSON / JSON.gz files or glob patterns")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per decoder (best time is kept)")
+    parser.add_argument("--min-mb", type=float, default=0.1, help="Skip files smaller than this")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    files = []
+    for pattern in args.paths or DEFAULT_PATTERNS:
+        files.extend(sorted(glob.glob(pattern, recursive=True)))
+    files = [f for f in files if os.path.getsize(f) >= args.min_mb * 1e6 or f.endswith(".gz")]
+    if not files:
+        print("❌ No payloads found to benchmark.")
+        return
+
+    decoders = available_decoders()
+    print(f"🔬 Decoders: {', '.join(decoders)} | {len(files)} file(s)\n")
+    header = f"{'File':<48} {'MB':>7}  " + "  ".join(f"{n + ' ms/MB':>13}" for n in decoders) + f"  {'gzip':>6}"
+    print(header)
+
+    rows = []
+    for path in files:
+        row = benchmark_file(path, decoders, args.repeat)
+        rows.append(row)
+        timings = "  ".join(f"{row['decode_ms_per_mb'][n]:>13.2f}" for n in decoders)
+        print(f"{os.path.basename(path):<48} {row['size_mb']:>7.2f}  {timings}  {row['gzip_ratio']:>6.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"decoders": list(decoders), "results": rows}, f, indent=2)
+        print(f"\n💾 Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
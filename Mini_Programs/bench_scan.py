@@ -0,0 +1,259 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Run from the repository root: python Mini_Programs/bench_scan.py --auctions 10000 100000 500000
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import speed_scanner  # noqa: E402
+from synthetic_auctions import load_bonus_pools, load_item_pool, load_upgrade_tracks, make_realistic_snapshot  # noqa: E402
+
+# === Setup ===
+REALM_ID = 3721
+LAST_MODIFIED = "Sat, 17 May 2025 12:00:00 GMT"
+ARMOR_SUBCLASSES = {0: "Miscellaneous", 1: "Cloth", 2: "Leather", 3: "Mail", 4: "Plate"}
+SECONDARY_STAT_IDS = {36: "Haste", 32: "Critical Strike", 40: "Versatility", 49: "Mastery"}
+# Per-call benchmarks run over at most this many inputs taken from the snapshot
+MAX_CALLS = 20000
+# Results file, kept under the git-ignored Cache/ folder
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "Cache", "bench_scan_results.json")
+
+
+class StubResponse:
+    """Just enough of requests.Response for fetch_realm_auctions()."""
+
+    def __init__(self, content):
+        self.status_code = 200
+        self.headers = {"Last-Modified": LAST_MODIFIED}
+        self.content = content
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class StubSession:
+    """Serves one pre-encoded auction snapshot for every request, so no network is touched."""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def request(self, method, url, params=None, headers=None, stream=False, timeout=None):
+        return StubResponse(self.payload)
+
+
+def item_metadata(record):
+    """Item metadata in the scanner's cache format, built from an item-conversions.json record."""
+    secondary = [(SECONDARY_STAT_IDS[s["id"]], s.get("alloc", 0)) for s in record.get("stats", [])
+                 if s.get("id") in SECONDARY_STAT_IDS]
+    total = sum(alloc for _, alloc in secondary)
+    return {
+        'name': record["name"],
+        'ilvl': record.get("itemLevel", 0),
+        'required_level': 80,
+        'item_category': "Armor" if record.get("itemClass") == 4 else "Weapon",
+        'item_type': ARMOR_SUBCLASSES.get(record.get("itemSubClass"), "Unknown"),
+        'slot_type': speed_scanner.INVENTORY_TYPE_MAP.get(record.get("inventoryType"), "Unknown"),
+        'secondary_stats': [[name, alloc / total * 100] for name, alloc in secondary] if total else [],
+    }
+
+
+def fill_item_store(items):
+    """An in-memory metadata store holding every synthetic item, so no item request is ever sent."""
+    store = speed_scanner.ItemMetadataStore(':memory:', memory_size=1_000_000)
+    for record in items:
+        store.put(record["id"], item_metadata(record))
+    return store
+
+
+def sample_results(snapshot, store, raidbots_data):
+    """
+    Result rows for the first MAX_CALLS listings, as if every one had matched.
+
+    The display and CSV benchmarks run on these rather than a profile's matches, so they measure
+    the same work for every profile (a profile with no matches would otherwise time zero calls).
+    """
+    rows = []
+    for auc in snapshot["auctions"][:MAX_CALLS]:
+        item = auc["item"]
+        info = store.get(item["id"])
+        bonuses = speed_scanner.merged_bonus_ids(auc, item)
+        stat1, stat2 = speed_scanner.extract_stat_display_strings(item["id"], bonuses, raidbots_data, store, color=False)
+        rows.append({
+            'realm_id': REALM_ID,
+            'item_id': item["id"],
+            'name': info['name'],
+            'ilvl': info['ilvl'],
+            'max_ilvl': info['ilvl'],
+            'quantity': auc.get('quantity'),
+            'buyout': auc.get('buyout'),
+            'type': info['item_type'],
+            'slot': info['slot_type'],
+            'bonus_lists': bonuses,
+            'stat1': stat1,
+            'stat2': stat2,
+        })
+    return rows
+
+
+def best_time(fn, repeat):
+    """Returns (fastest of `repeat` runs in seconds, result of the last run)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def row(name, count, profile, seconds, calls, **extra):
+    return {
+        "benchmark": name,
+        "auctions": count,
+        "profile": profile,
+        "calls": calls,
+        "best_seconds": round(seconds, 6),
+        "per_call_us": round(seconds / max(calls, 1) * 1e6, 3),
+        **extra,
+    }
+
+
+def bench_profile(count, profile, snapshot, payload, sample, store, raidbots_data, curve_data, repeat):
+    """Times the scan hot paths for one snapshot size and scan profile (display and CSV on `sample`)."""
+    scan_config = speed_scanner.get_scan_config(profile)
+    normal_filters, max_stat_filters = speed_scanner.parse_filter_types(scan_config.filter_type)
+    active_filters = {f: speed_scanner.FILTER_ID_SETS[f] for f in normal_filters if f in speed_scanner.FILTER_ID_SETS}
+    session = StubSession(payload)
+    rows = []
+
+    def scan():
+        speed_scanner.reset_evaluation_memo()
+        return speed_scanner.scan_realm_with_bonus_analysis(
+            session, {}, REALM_ID, "Synthetic", store, raidbots_data, raidbots_data, curve_data,
+            scan_config, active_filters, max_stat_filters
+        )
+
+    seconds, results = best_time(scan, repeat)
+    rows.append(row("scan_realm_with_bonus_analysis", count, profile, seconds, count, results=len(results)))
+
+    bonus_lists = [speed_scanner.merged_bonus_ids(auc, auc["item"]) for auc in snapshot["auctions"][:MAX_CALLS]]
+    infos = [store.get(auc["item"]["id"]) for auc in snapshot["auctions"][:MAX_CALLS]]
+    seconds, _ = best_time(lambda: [
+        speed_scanner.filter_stat_bonuses(bonuses, raidbots_data, raidbots_data, scan_config, info)
+        for bonuses, info in zip(bonus_lists, infos)
+    ], repeat)
+    rows.append(row("filter_stat_bonuses", count, profile, seconds, len(bonus_lists)))
+
+    seconds, _ = best_time(lambda: [
+        speed_scanner.extract_stat_display_strings(r['item_id'], r['bonus_lists'], raidbots_data, store, color=False)
+        for r in sample
+    ], repeat)
+    rows.append(row("extract_stat_display_strings", count, profile, seconds, len(sample)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "speed_gear.csv")
+        seconds, _ = best_time(lambda: speed_scanner.write_csv(sample, filename=path), repeat)
+    rows.append(row("write_csv", count, profile, seconds, len(sample)))
+    return rows
+
+
+def bench_ilvl(count, snapshot, store, raidbots_data, repeat):
+    """Times infer_ilvl_from_bonus_ids() over the snapshot's listings (profile independent)."""
+    calls = []
+    for auc in snapshot["auctions"][:MAX_CALLS]:
+        item = auc["item"]
+        modifiers = item.get("modifiers", [])
+        player_level = next((m["value"] for m in modifiers if m["type"] == 9), 80)
+        calls.append((store.get(item["id"])["ilvl"], speed_scanner.merged_bonus_ids(auc, item), player_level, modifiers))
+    seconds, _ = best_time(lambda: [
+        speed_scanner.infer_ilvl_from_bonus_ids(base, bonuses, raidbots_data, raidbots_data, level, modifiers)
+        for base, bonuses, level, modifiers in calls
+    ], repeat)
+    return row("infer_ilvl_from_bonus_ids", count, None, seconds, len(calls))
+
+
+def compare(report, baseline_path):
+    """Prints each benchmark's time relative to a previous report."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(r["benchmark"], r["auctions"], r["profile"]): r for r in baseline.get("rows", [])}
+    print(f"\n📐 Compared with {baseline_path} ({baseline.get('generated_at', '?')})")
+    for r in report["rows"]:
+        old = previous.get((r["benchmark"], r["auctions"], r["profile"]))
+        if not old or not old["best_seconds"]:
+            continue
+        ratio = r["best_seconds"] / old["best_seconds"]
+        flag = "🐢" if ratio > 1.1 else "🚀" if ratio < 0.9 else "  "
+        print(f"  {flag} {r['benchmark']:<30} {r['auctions']:>7} {r['profile'] or '-':<11} "
+              f"{old['best_seconds']:8.4f}s -> {r['best_seconds']:8.4f}s (x{ratio:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scan hot paths on realistic synthetic snapshots.")
+    parser.add_argument("--auctions", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--profiles", nargs="+", default=["custom", "profitable", "full"])
+    parser.add_argument("--engine", choices=["python", "numpy"], default=speed_scanner.SCAN_ENGINE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Write results as JSON to this path")
+    parser.add_argument("--compare", metavar="PATH", help="Print timings relative to a previous --output file")
+    args = parser.parse_args()
+
+    # Nothing may touch the network or the on-disk caches
+    speed_scanner.CONDITIONAL_AUCTION_REQUESTS = False
+    speed_scanner.ARCHIVE_AUCTION_SNAPSHOTS = False
+    speed_scanner.SCAN_ENGINE = args.engine
+    logging.getLogger().setLevel(logging.WARNING)  # Skip the per-realm progress lines
+    raidbots_data, _, curve_data = speed_scanner.load_scan_datasets(offline=True)
+
+    pools = load_bonus_pools()
+    items = load_item_pool()
+    tracks = load_upgrade_tracks()
+    store = fill_item_store(items)
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "json_decoder": speed_scanner.JSON_DECODER,
+        "engine": speed_scanner.scan_engine(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "rows": [],
+    }
+    print(f"🔬 Scan benchmark (best of {args.repeat} runs, {report['engine']} engine, {len(items)} real items)")
+    for count in args.auctions:
+        snapshot = make_realistic_snapshot(count, seed=args.seed, realm_id=REALM_ID, pools=pools, items=items, tracks=tracks)
+        payload = json.dumps(snapshot).encode("utf-8")
+        print(f"\n📦 synthetic-{count} ({len(payload) / 1e6:.1f} MB)")
+        sample = sample_results(snapshot, store, raidbots_data)
+        rows = [bench_ilvl(count, snapshot, store, raidbots_data, args.repeat)]
+        for profile in args.profiles:
+            rows.extend(bench_profile(count, profile, snapshot, payload, sample, store, raidbots_data, curve_data, args.repeat))
+        for r in rows:
+            results = f" | {r['results']:>6} results" if "results" in r else ""
+            print(f"  {r['benchmark']:<30} {r['profile'] or '-':<11} {r['best_seconds']:8.4f}s | "
+                  f"{r['per_call_us']:9.2f} µs/call x {r['calls']}{results}")
+        report["rows"].extend(rows)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved results to {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
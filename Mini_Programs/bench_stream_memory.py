@@ -0,0 +1,90 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Run from the repository root: python Mini_Programs/bench_stream_memory.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import speed_scanner  # noqa: E402
+from synthetic_auctions import make_snapshot  # noqa: E402
+
+
+def load_payload(path):
+    """Reads a recorded auction snapshot (plain or .gz) as raw bytes."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return f.read()
+
+
+def chunked(raw, chunk_size):
+    for i in range(0, len(raw), chunk_size):
+        yield raw[i:i + chunk_size]
+
+
+def consume_full(raw):
+    """Current path: decode the whole payload, then walk the auctions list."""
+    data = json.loads(raw)
+    count = 0
+    for _ in data.get("auctions", []):
+        count += 1
+    return count
+
+
+def consume_stream(raw, chunk_size):
+    """Streaming path: yield auctions one at a time from body chunks."""
+    count = 0
+    for _ in speed_scanner.iter_json_array_items(chunked(raw, chunk_size), "auctions"):
+        count += 1
+    return count
+
+
+def measure(label, fn):
+    """Runs fn under tracemalloc and returns elapsed seconds and peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<8} | {count:>8} auctions | {elapsed:7.2f}s | peak {peak / 1e6:9.1f} MB")
+    return {"auctions": count, "seconds": round(elapsed, 4), "peak_mb": round(peak / 1e6, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak memory of full vs streaming auction parsing.")
+    parser.add_argument("--file", help="Recorded auction snapshot (.json or .json.gz)")
+    parser.add_argument("--auctions", type=int, nargs="+", default=[10000, 100000, 300000],
+                        help="Synthetic snapshot sizes to test when no --file is given")
+    parser.add_argument("--chunk-size", type=int, default=speed_scanner.STREAM_CHUNK_SIZE)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    if args.file:
+        payloads = [(os.path.basename(args.file), load_payload(args.file))]
+    else:
+        payloads = [(f"synthetic-{n}", json.dumps(make_snapshot(n)).encode("utf-8")) for n in args.auctions]
+
+    report = []
+    print("🔬 Auction parsing memory benchmark (tracemalloc peak, payload bytes excluded)")
+    for name, raw in payloads:
+        print(f"\n📦 {name} ({len(raw) / 1e6:.1f} MB)")
+        report.append({
+            "snapshot": name,
+            "payload_mb": round(len(raw) / 1e6, 2),
+            "full": measure("full", lambda: consume_full(raw)),
+            "stream": measure("stream", lambda: consume_stream(raw, args.chunk_size)),
+        })
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Run from the repository root: python Mini_Programs/bench_vector_engine.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import speed_scanner  # noqa: E402
+from synthetic_auctions import make_snapshot  # noqa: E402
+
+# === Setup ===
+BONUS_DATA_PATH = "RaidBots_APIs/bonuses.json"
+CURVE_DATA_PATH = "RaidBots_APIs/item-curves.json"
+SLOT_TYPES = ["Head", "Chest", "Legs", "Feet", "Wrist", "Hands", "Waist", "Back", "Finger", "Neck", "Shoulder"]
+ITEM_TYPES = ["Cloth", "Leather", "Mail", "Plate", "Miscellaneous"]
+
+
+def fill_item_store(auctions, seed=0):
+    """Pre-fills an in-memory metadata store so both engines run without network calls."""
+    rng = random.Random(seed)
+    store = speed_scanner.ItemMetadataStore(':memory:', memory_size=1_000_000)
+    for item_id in {auc["item"]["id"] for auc in auctions}:
+        store.put(item_id, {
+            'name': f"Item {item_id}",
+            'ilvl': rng.choice([200, 400, 600, 650]),
+            'required_level': rng.choice([60, 70, 80]),
+            'item_category': "Armor",
+            'item_type': rng.choice(ITEM_TYPES),
+            'slot_type': rng.choice(SLOT_TYPES),
+            'secondary_stats': [['Haste', 60.0], ['Mastery', 40.0]],
+        })
+    return store
+
+
+def run_engine(engine, auctions, store, raidbots_data, curve_data, scan_config, active_filters, max_stat_filters):
+    """Times one engine over the snapshot and returns (seconds, results)."""
+    speed_scanner.SCAN_ENGINE = engine
+    speed_scanner.reset_evaluation_memo()
+    start = time.perf_counter()
+    results = speed_scanner.evaluate_realm_auctions(
+        None, {}, 3721, auctions, store, raidbots_data, raidbots_data, curve_data,
+        scan_config, active_filters, max_stat_filters
+    )
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the python and numpy filter engines on synthetic snapshots.")
+    parser.add_argument("--auctions", type=int, nargs="+", default=[200000, 400000])
+    parser.add_argument("--profiles", nargs="+", default=["custom", "profitable", "full"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    if speed_scanner.load_numpy() is None:
+        print("❌ numpy is not installed; the vectorized engine is unavailable")
+        return
+
+    speed_scanner.PRINT_FULL_METADATA = False
+    with open(BONUS_DATA_PATH, "r", encoding="utf-8") as f:
+        raidbots_data = json.load(f)
+    with open(CURVE_DATA_PATH, "r", encoding="utf-8") as f:
+        curve_data = json.load(f)
+    speed_scanner.refresh_filter_id_sets(speed_scanner.get_bonus_index(raidbots_data, raidbots_data))
+
+    report = []
+    print("🔬 Filter engine benchmark (best of {} runs)".format(args.repeat))
+    for count in args.auctions:
+        auctions = make_snapshot(count)["auctions"]
+        store = fill_item_store(auctions)
+        print(f"\n📦 synthetic-{count}")
+        for profile in args.profiles:
+            scan_config = speed_scanner.get_scan_config(profile)
+            normal_filters, max_stat_filters = speed_scanner.parse_filter_types(scan_config.filter_type)
+            active_filters = {f: speed_scanner.FILTER_ID_SETS[f] for f in normal_filters if f in speed_scanner.FILTER_ID_SETS}
+
+            timings = {}
+            outputs = {}
+            for engine in ("python", "numpy"):
+                runs = [run_engine(engine, auctions, store, raidbots_data, curve_data,
+                                   scan_config, active_filters, max_stat_filters) for _ in range(args.repeat)]
+                timings[engine] = min(seconds for seconds, _ in runs)
+                outputs[engine] = runs[0][1]
+
+            # Auctions each engine hands to the metadata-dependent checks (item lookups)
+            lookups = {
+                "python": len(speed_scanner.collect_candidate_auctions(
+                    auctions, raidbots_data, raidbots_data, active_filters, max_stat_filters)),
+                "numpy": len(speed_scanner.vectorized_survivors(
+                    auctions, raidbots_data, raidbots_data, curve_data, scan_config, active_filters, max_stat_filters)),
+            }
+            identical = outputs["python"] == outputs["numpy"]
+            speedup = timings["python"] / timings["numpy"] if timings["numpy"] else float("inf")
+            print(f"  {profile:<11} | {len(outputs['numpy']):>6} results | python {timings['python']:6.2f}s | "
+                  f"numpy {timings['numpy']:6.2f}s | x{speedup:5.1f} | "
+                  f"lookups {lookups['python']:>6} -> {lookups['numpy']:>6} | {'✅ identical' if identical else '❌ MISMATCH'}")
+            report.append({
+                "auctions": count,
+                "profile": profile,
+                "results": len(outputs["numpy"]),
+                "python_seconds": round(timings["python"], 4),
+                "numpy_seconds": round(timings["numpy"], 4),
+                "python_lookups": lookups["python"],
+                "numpy_lookups": lookups["numpy"],
+                "identical": identical,
+            })
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
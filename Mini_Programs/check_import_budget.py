@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Run from the repository root: python Mini_Programs/check_import_budget.py
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# === Setup ===
+# Cumulative `python -X importtime` cost of `import speed_scanner` (median of the runs), in ms
+IMPORT_BUDGET_MS = 60
+# Heavy dependencies the scanner imports on first use; none may be loaded by the import itself
+LAZY_MODULES = ("requests", "tqdm", "dotenv", "numpy", "cProfile", "pstats")
+CREDENTIAL_VARS = ("BLIZZARD_CLIENT_ID", "BLIZZARD_CLIENT_SECRET")
+
+# Imports the module with scanner flags on the command line and reports what the import did
+SIDE_EFFECT_PROBE = """
+import json, logging, sys
+sys.argv = ['speed_scanner.py', '--help', '--config', 'missing.json']
+import speed_scanner
+print('PROBE ' + json.dumps({
+    'loaded': sorted(m for m in %r if m in sys.modules),
+    'root_handlers': len(logging.getLogger().handlers),
+    'root_level': logging.getLevelName(logging.getLogger().level),
+    'credentials_loaded': speed_scanner.CLIENT_ID is not None or speed_scanner.CLIENT_SECRET is not None,
+}))
+""" % (LAZY_MODULES,)
+
+
+def clean_env():
+    """The current environment without Blizzard credentials, so a .env read at import is detectable."""
+    return {k: v for k, v in os.environ.items() if k not in CREDENTIAL_VARS}
+
+
+def import_time_ms():
+    """Cumulative import time of speed_scanner in a fresh interpreter, from -X importtime."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import speed_scanner"],
+                          cwd=REPO_ROOT, env=clean_env(), capture_output=True, text=True, check=True)
+    for line in reversed(proc.stderr.splitlines()):
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 3 and fields[2] == "speed_scanner":
+            return int(fields[1]) / 1000
+    raise RuntimeError("speed_scanner missing from -X importtime output")
+
+
+def probe_side_effects():
+    """Runs SIDE_EFFECT_PROBE in a fresh interpreter; returns its report, or an error entry if the import exited."""
+    proc = subprocess.run([sys.executable, "-c", SIDE_EFFECT_PROBE],
+                          cwd=REPO_ROOT, env=clean_env(), capture_output=True, text=True)
+    reports = [line[len("PROBE "):] for line in proc.stdout.splitlines() if line.startswith("PROBE ")]
+    if proc.returncode != 0 or not reports:
+        return {"error": f"import did not finish (exit status {proc.returncode}) {proc.stderr.strip()[-500:]}".strip()}
+    return json.loads(reports[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that importing speed_scanner stays fast and side-effect free.")
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters to time (the median is checked)")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    timings = [import_time_ms() for _ in range(max(args.runs, 1))]
+    median = statistics.median(timings)
+    effects = probe_side_effects()
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"import took {median:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if "error" in effects:
+        failures.append(effects["error"])
+    else:
+        if effects["loaded"]:
+            failures.append(f"import loaded {', '.join(effects['loaded'])}")
+        if effects["root_handlers"] or effects["root_level"] != "WARNING":
+            failures.append("import configured root logging")
+        if effects["credentials_loaded"]:
+            failures.append("import read credentials from .env")
+
+    print(f"⏱️  import speed_scanner: median {median:.1f} ms over {len(timings)} run(s) "
+          f"(min {min(timings):.1f}, max {max(timings):.1f}; budget {args.budget_ms:.0f} ms)")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Import is within budget and side-effect free")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "median_ms": round(median, 2),
+                "timings_ms": [round(t, 2) for t in timings],
+                "budget_ms": args.budget_ms,
+                "side_effects": effects,
+                "failures": failures,
+            }, f, indent=2)
+        print(f"💾 Saved results to {args.output}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
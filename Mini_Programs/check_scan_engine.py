@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Run from the repository root: python Mini_Programs/check_scan_engine.py
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import speed_scanner  # noqa: E402
+from mock_blizzard_api import FaultInjector, MockBlizzardServer, SnapshotSource, load_realms  # noqa: E402
+
+# === Setup ===
+# Jobs may grow the intern pool by at most this factor over the first job (it must not accumulate)
+POOL_GROWTH_LIMIT = 1.5
+JOB_TIMEOUT_S = 600
+# A cancelled job must stop within this many seconds, even mid-realm with item metadata cold
+CANCEL_BUDGET_S = 2.0
+# How long the cancel check lets the job scan before cancelling it
+CANCEL_AFTER_S = 1.0
+SCAN_CONFIG = {
+    "MIN_ILVL": 0, "MAX_ILVL": 1000, "MAX_BUYOUT": 99999999, "FILTER_TYPE": [],
+    "STAT_DISTRIBUTION_THRESHOLDS": {"Haste": 0, "Crit": 0, "Vers": 0, "Mastery": 0, "Speed": 0},
+    "ALLOWED_ARMOR_SLOTS": ["Head", "Shoulder", "Chest", "Waist", "Legs", "Feet", "Back", "Wrist", "Hands"],
+    "ALLOWED_WEAPON_SLOTS": ["One-Hand", "Two-Hand"], "ALLOWED_ACCESSORY_SLOTS": ["Finger", "Neck"],
+    "ALLOWED_ARMOR_TYPES": ["Cloth", "Leather", "Mail", "Plate", "Miscellaneous"],
+    "ALLOWED_WEAPON_TYPES": ["Sword", "Axe", "Mace", "Dagger", "Staff", "Bow"],
+    "scan_mode": "all", "realm": None,
+}
+
+
+def start_mock(realms, auctions, latency_ms, seed):
+    """Serves `realms` synthetic realms on a free local port from a background thread."""
+    faults = FaultInjector(argparse.Namespace(
+        latency_ms=latency_ms, jitter_ms=0.0, error_429=0.0, retry_after=1, error_401=0.0, timeout=0.0,
+        timeout_seconds=0.0, max_rps=0, fault_endpoints="", seed=seed,
+    ))
+    server = MockBlizzardServer(("127.0.0.1", 0), load_realms(count=realms), SnapshotSource(None, auctions, seed), faults)
+    threading.Thread(target=server.serve_forever, name="mock-api", daemon=True).start()
+    return server
+
+
+def wait_for(job, timeout=JOB_TIMEOUT_S):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"scan job {job.id} still {job.status} after {timeout}s")
+        time.sleep(0.05)
+    return job
+
+
+def check_cancel(engine):
+    """Cancels an all-realm job mid-scan (item metadata cold) and times how long it takes to stop."""
+    job = engine.submit(SCAN_CONFIG)
+    deadline = time.monotonic() + JOB_TIMEOUT_S
+    while job.stage != "scanning" and not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(CANCEL_AFTER_S)
+    if job.finished:
+        return {"cancel_seconds": None, "failure": f"job {job.id} {job.status} before it could be cancelled"}
+    started = time.monotonic()
+    engine.cancel(job.id)
+    wait_for(job)
+    elapsed = time.monotonic() - started
+    failure = None
+    if job.status != "cancelled":
+        failure = f"cancelled job {job.id} ended {job.status}: {job.error}"
+    elif elapsed > CANCEL_BUDGET_S:
+        failure = f"cancelled job took {elapsed:.2f}s to stop (budget {CANCEL_BUDGET_S:.0f}s)"
+    return {"cancel_seconds": round(elapsed, 3), "realms_done": job.realms_done, "failure": failure}
+
+
+def check_pool(engine, jobs):
+    """Scans a different realm (so a new snapshot) per job; the intern pool must not keep growing."""
+    sizes = []
+    for realm_id in range(1, jobs + 1):
+        job = wait_for(engine.submit(dict(SCAN_CONFIG, scan_mode="single", realm=str(realm_id))))
+        if job.status != "done":
+            return {"pool_sizes": sizes, "failure": f"job {job.id} {job.status}: {job.error}"}
+        sizes.append(len(speed_scanner.region_intern_pool))
+    failure = None
+    if sizes[-1] > sizes[0] * POOL_GROWTH_LIMIT:
+        failure = f"intern pool grew from {sizes[0]} to {sizes[-1]} entries over {jobs} jobs"
+    return {"pool_sizes": sizes, "failure": failure}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the in-process ScanEngine against a local mock API and check it.")
+    parser.add_argument("--realms", type=int, default=4)
+    parser.add_argument("--auctions", type=int, default=3000, help="Auctions per synthetic realm snapshot")
+    parser.add_argument("--jobs", type=int, default=4, help="Back-to-back single-realm jobs for the intern pool check")
+    parser.add_argument("--workers", type=int, default=speed_scanner.SCAN_WORKERS)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Mock latency per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    server = start_mock(max(args.realms, args.jobs), args.auctions, args.latency_ms, args.seed)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.update(BLIZZARD_CLIENT_ID="mock", BLIZZARD_CLIENT_SECRET="mock",
+                      BLIZZARD_API_BASE_URL=base, BLIZZARD_TOKEN_URL=f"{base}/token")
+
+    # Every cache, token and CSV the scanner writes lands in a scratch directory
+    workdir = tempfile.mkdtemp(prefix="scan-engine-")
+    os.symlink(os.path.join(REPO_ROOT, "RaidBots_APIs"), os.path.join(workdir, "RaidBots_APIs"))
+    os.makedirs(os.path.join(workdir, "CSVs"))
+    os.makedirs(os.path.join(workdir, "Tokens"))
+    os.chdir(workdir)
+
+    # Rescan every snapshot (no 304s) and lift the request ceiling, the mock has none
+    speed_scanner.CONDITIONAL_AUCTION_REQUESTS = False
+    speed_scanner.ARCHIVE_AUCTION_SNAPSHOTS = False
+    speed_scanner.rate_limiter = speed_scanner.TokenBucketRateLimiter(10_000, 10_000_000)
+    engine = speed_scanner.ScanEngine(workers=args.workers)
+
+    # Cancel first, while the item metadata store is still cold and every realm is slow
+    results = {"workdir": workdir, "cancel": check_cancel(engine), "pool": check_pool(engine, args.jobs)}
+    failures = [r["failure"] for r in results.values() if isinstance(r, dict) and r.get("failure")]
+
+    print(f"\n🧪 ScanEngine check ({args.realms} realm(s) x {args.auctions} auctions, {args.workers} worker(s))")
+    print(f"  Cancel mid-scan stopped the job in {results['cancel']['cancel_seconds']}s")
+    print(f"  Intern pool after each job: {results['pool']['pool_sizes']}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ ScanEngine checks passed")
+
+    if args.output:
+        with open(os.path.join(REPO_ROOT, args.output) if not os.path.isabs(args.output) else args.output,
+                  "w", encoding="utf-8") as f:
+            json.dump({**results, "failures": failures}, f, indent=2)
+        print(f"💾 Saved results to {args.output}")
+    server.shutdown()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+import argparse
+import csv
+import glob
+import gzip
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Run from the repository root: python Mini_Programs/mock_blizzard_api.py
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_auctions import load_bonus_pools, make_snapshot  # noqa: E402
+
+# === Setup ===
+# Point speed_scanner.py at the mock with:
+#   BLIZZARD_API_BASE_URL=http://127.0.0.1:8080 BLIZZARD_TOKEN_URL=http://127.0.0.1:8080/token python speed_scanner.py
+REALM_CSV = "CSVs/realm_map.csv"
+MOCK_TOKEN = "mock-access-token"
+ENDPOINT_KINDS = ("token", "index", "realm", "auctions", "item")
+
+# Synthetic item metadata: (item_class id, inventory type ids, subclass names)
+ITEM_CLASSES = [
+    (4, [1, 3, 5, 6, 7, 8, 9, 10, 16], ["Cloth", "Leather", "Mail", "Plate"]),
+    (2, [13, 15, 17, 21, 22, 26], ["Sword", "Axe", "Mace", "Dagger", "Staff", "Bow"]),
+    (4, [2, 11, 12], ["Miscellaneous"]),
+]
+SECONDARY_STATS = ["Haste", "Critical Strike", "Versatility", "Mastery"]
+
+
+def load_realms(path=REALM_CSV, count=None):
+    """
+    Loads connected realms from the scanner's realm CSV, or makes up `count` of them.
+
+    Returns:
+        dict: connected_realm_id -> list of {'slug', 'name'} realms.
+    """
+    realms = defaultdict(list)
+    if count is None and os.path.exists(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                realms[int(row["connected_realm_id"])].append({"slug": row["slug"], "name": row["name"]})
+        return dict(realms)
+    for crid in range(1, (count or 10) + 1):
+        realms[crid].append({"slug": f"mock-realm-{crid}", "name": f"Mock Realm {crid}"})
+    return dict(realms)
+
+
+def make_item(item_id):
+    """Builds a deterministic item payload shaped like Blizzard's /data/wow/item/{id} response."""
+    rng = random.Random(item_id)
+    class_id, inventory_types, subclasses = rng.choices(ITEM_CLASSES, weights=[7, 2, 1])[0]
+    first, second = rng.sample(SECONDARY_STATS, 2)
+    split = rng.randint(50, 80)
+    return {
+        "id": item_id,
+        "name": f"Mock Item {item_id}",
+        "level": rng.choice([372, 415, 480, 597, 639, 681]),
+        "required_level": rng.choice([70, 80]),
+        "item_class": {"id": class_id},
+        "item_subclass": {"name": rng.choice(subclasses)},
+        "inventory_type": {"id": rng.choice(inventory_types)},
+        "preview_item": {"stats": [
+            {"type": {"name": first}, "value": split * 10},
+            {"type": {"name": second}, "value": (100 - split) * 10},
+        ]},
+    }
+
+
+class SnapshotSource:
+    """
+    Serves auction snapshots, either recorded (speed_scanner.py's archive) or synthetic.
+
+    Bodies are built once per realm and kept both plain and gzip-compressed, so the mock
+    itself is never the bottleneck of a throughput test.
+    """
+
+    def __init__(self, archive_dir=None, auctions=20000, seed=0):
+        self.archive_dir = archive_dir
+        self.auctions = auctions
+        self.seed = seed
+        self.started = int(time.time())
+        self.pools = None
+        self.bodies = {}
+        self.lock = threading.Lock()
+
+    def _recorded(self, realm_id):
+        """Newest archived snapshot of a realm as (epoch, gzip bytes), or None."""
+        paths = glob.glob(os.path.join(self.archive_dir, str(realm_id), "*.json.gz"))
+        if not paths:
+            return None
+        newest = max(paths, key=lambda p: int(os.path.basename(p).split(".")[0]))
+        with open(newest, "rb") as f:
+            return int(os.path.basename(newest).split(".")[0]), f.read()
+
+    def get(self, realm_id):
+        """
+        Returns:
+            tuple: (last_modified (str), plain body (bytes), gzip body (bytes)).
+        """
+        with self.lock:
+            if realm_id not in self.bodies:
+                recorded = self._recorded(realm_id) if self.archive_dir else None
+                if recorded:
+                    epoch, compressed = recorded
+                    plain = gzip.decompress(compressed)
+                else:
+                    if self.pools is None:
+                        self.pools = load_bonus_pools()
+                    snapshot = make_snapshot(self.auctions, seed=self.seed + realm_id, realm_id=realm_id, pools=self.pools)
+                    epoch = self.started
+                    plain = json.dumps(snapshot, separators=(",", ":")).encode("utf-8")
+                    compressed = gzip.compress(plain, compresslevel=5)
+                self.bodies[realm_id] = (formatdate(epoch, usegmt=True), plain, compressed)
+            return self.bodies[realm_id]
+
+
+class FaultInjector:
+    """Decides per request whether to add latency or fail with 429, 401 or a timeout."""
+
+    def __init__(self, args):
+        self.latency = args.latency_ms / 1000
+        self.jitter = args.jitter_ms / 1000
+        self.rate_429 = args.error_429
+        self.retry_after = args.retry_after
+        self.rate_401 = args.error_401
+        self.rate_timeout = args.timeout
+        self.timeout_seconds = args.timeout_seconds
+        self.max_rps = args.max_rps
+        self.kinds = set(args.fault_endpoints.split(","))
+        self.rng = random.Random(args.seed)
+        self.lock = threading.Lock()
+        self.window = (0, 0)  # (second, requests seen in it)
+
+    def delay(self):
+        """Simulated network + server latency in seconds."""
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(self.latency + jitter, 0.0)
+
+    def over_quota(self):
+        """Enforces --max-rps the way Blizzard does: a hard per-second request count."""
+        if not self.max_rps:
+            return False
+        second = int(time.time())
+        with self.lock:
+            current, seen = self.window
+            seen = seen + 1 if current == second else 1
+            self.window = (second, seen)
+        return seen > self.max_rps
+
+    def pick(self, kind):
+        """Returns None, '429', '401' or 'timeout' for a request to the given endpoint kind."""
+        if kind not in self.kinds:
+            return None
+        with self.lock:
+            roll = self.rng.random()
+        for fault, rate in (("429", self.rate_429), ("401", self.rate_401), ("timeout", self.rate_timeout)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+
+class MockBlizzardHandler(BaseHTTPRequestHandler):
+    """Routes the subset of the Blizzard API that speed_scanner.py uses."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MockBlizzard/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path in ("/token", "/oauth/token"):
+            length = int(self.headers.get("Content-Length") or 0)
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+            if form.get("grant_type") != ["client_credentials"]:
+                return self.send_json(400, {"error": "unsupported_grant_type"}, "token")
+            if self.inject_faults("token"):
+                return
+            return self.send_json(200, {"access_token": MOCK_TOKEN, "token_type": "bearer", "expires_in": 86399}, "token")
+        self.send_json(404, {"code": 404, "detail": "Not Found"}, "other")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["__stats"]:
+            return self.send_json(200, self.server.stats_snapshot(), "stats")
+
+        if parts[:3] != ["data", "wow", "connected-realm"] and parts[:3] != ["data", "wow", "item"]:
+            return self.send_json(404, {"code": 404, "detail": "Not Found"}, "other")
+        kind = self.endpoint_kind(parts)
+        if kind is None:
+            return self.send_json(404, {"code": 404, "detail": "Not Found"}, "other")
+
+        if not self.authorized():
+            return self.send_json(401, {"code": 401, "type": "BLZWEBAPI00000401", "detail": "Unauthorized"}, kind)
+        if self.inject_faults(kind):
+            return
+
+        base = f"http://{self.headers.get('Host')}/data/wow"
+        if kind == "index":
+            entries = [{"href": f"{base}/connected-realm/{crid}?namespace=dynamic-us"} for crid in self.server.realms]
+            return self.send_json(200, {"connected_realms": entries}, kind)
+
+        if kind == "item":
+            item_id = int(parts[3])
+            if self.server.missing_items and random.Random(item_id).random() < self.server.missing_items:
+                return self.send_json(404, {"code": 404, "detail": "Not Found"}, kind)
+            return self.send_json(200, make_item(item_id), kind)
+
+        crid = int(parts[3])
+        if crid not in self.server.realms:
+            return self.send_json(404, {"code": 404, "detail": "Not Found"}, kind)
+        if kind == "realm":
+            return self.send_json(200, {"id": crid, "realms": self.server.realms[crid]}, kind)
+
+        last_modified, plain, compressed = self.server.snapshots.get(crid)
+        if self.headers.get("If-Modified-Since") == last_modified:
+            return self.send_body(304, b"", kind, {"Last-Modified": last_modified})
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            return self.send_body(200, compressed, kind, {"Last-Modified": last_modified, "Content-Encoding": "gzip"})
+        return self.send_body(200, plain, kind, {"Last-Modified": last_modified})
+
+    def endpoint_kind(self, parts):
+        """Classifies a /data/wow/... path, or returns None if the mock doesn't serve it."""
+        if parts[2] == "item":
+            return "item" if len(parts) == 4 and parts[3].isdigit() else None
+        if len(parts) == 4 and parts[3] == "index":
+            return "index"
+        if len(parts) >= 4 and parts[3].isdigit():
+            if len(parts) == 4:
+                return "realm"
+            if len(parts) == 5 and parts[4] == "auctions":
+                return "auctions"
+        return None
+
+    def authorized(self):
+        """Requires a bearer token; with --strict-auth it must be the one /token handed out."""
+        auth = self.headers.get("Authorization") or ""
+        if not auth.startswith("Bearer "):
+            return False
+        return not self.server.strict_auth or auth == f"Bearer {MOCK_TOKEN}"
+
+    def inject_faults(self, kind):
+        """Applies latency and any injected failure. Returns True if the request was answered."""
+        faults = self.server.faults
+        delay = faults.delay()
+        if delay:
+            time.sleep(delay)
+        if faults.over_quota():
+            self.send_json(429, {"code": 429, "detail": "Too Many Requests"}, kind, {"Retry-After": str(faults.retry_after)})
+            return True
+        fault = faults.pick(kind)
+        if fault == "429":
+            self.send_json(429, {"code": 429, "detail": "Too Many Requests"}, kind, {"Retry-After": str(faults.retry_after)})
+        elif fault == "401":
+            self.send_json(401, {"code": 401, "type": "BLZWEBAPI00000401", "detail": "Unauthorized"}, kind)
+        elif fault == "timeout":
+            # Hold the connection open without answering, then drop it
+            self.server.record(kind, "timeout", 0)
+            time.sleep(faults.timeout_seconds)
+            self.close_connection = True
+        return fault is not None
+
+    def send_json(self, status, payload, kind, headers=None):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.send_body(status, body, kind, headers)
+
+    def send_body(self, status, body, kind, headers=None):
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        self.server.record(kind, status, len(body))
+
+
+class MockBlizzardServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the mock's data sources, fault settings and counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address, realms, snapshots, faults, strict_auth=False, missing_items=0.0, verbose=False):
+        super().__init__(address, MockBlizzardHandler)
+        self.realms = realms
+        self.snapshots = snapshots
+        self.faults = faults
+        self.strict_auth = strict_auth
+        self.missing_items = missing_items
+        self.verbose = verbose
+        self.started = time.perf_counter()
+        self.counts = Counter()
+        self.bytes_sent = Counter()
+        self.stats_lock = threading.Lock()
+
+    def record(self, kind, status, size):
+        with self.stats_lock:
+            self.counts[(kind, str(status))] += 1
+            self.bytes_sent[kind] += size
+
+    def stats_snapshot(self):
+        """Request counts by endpoint and status, plus bytes sent and the overall request rate."""
+        with self.stats_lock:
+            elapsed = time.perf_counter() - self.started
+            by_endpoint = defaultdict(dict)
+            for (kind, status), count in sorted(self.counts.items()):
+                by_endpoint[kind][status] = count
+            total = sum(self.counts.values())
+            return {
+                "elapsed_s": round(elapsed, 2),
+                "requests": total,
+                "requests_per_s": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+                "by_endpoint": dict(by_endpoint),
+                "bytes_sent": dict(self.bytes_sent),
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Blizzard API endpoints used by speed_scanner.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--snapshots", metavar="DIR",
+                        help="Serve recorded snapshots from speed_scanner.py's archive (e.g. Cache/snapshots)")
+    parser.add_argument("--auctions", type=int, default=20000, help="Auctions per synthetic realm snapshot")
+    parser.add_argument("--realms", type=int, help="Serve N made-up realms instead of CSVs/realm_map.csv")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the latency")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--max-rps", type=int, default=0, help="Answer 429 beyond this many requests per second (0 = off)")
+    parser.add_argument("--error-401", type=float, default=0.0, help="Fraction of requests answered with 401")
+    parser.add_argument("--timeout", type=float, default=0.0, help="Fraction of requests that never get a response")
+    parser.add_argument("--timeout-seconds", type=float, default=90.0, help="How long a timed-out request is held open")
+    parser.add_argument("--fault-endpoints", default="index,realm,auctions,item",
+                        help=f"Comma-separated endpoints faults apply to ({','.join(ENDPOINT_KINDS)})")
+    parser.add_argument("--missing-items", type=float, default=0.0, help="Fraction of item IDs that return 404")
+    parser.add_argument("--strict-auth", action="store_true", help="Only accept the token issued by this mock")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    realms = load_realms(count=args.realms)
+    snapshots = SnapshotSource(args.snapshots, args.auctions, args.seed)
+    server = MockBlizzardServer(
+        (args.host, args.port), realms, snapshots, FaultInjector(args),
+        strict_auth=args.strict_auth, missing_items=args.missing_items, verbose=args.verbose,
+    )
+    base = f"http://{args.host}:{server.server_address[1]}"
+    print(f"🧪 Mock Blizzard API on {base} serving {len(realms)} connected realm(s)")
+    print(f"   BLIZZARD_API_BASE_URL={base} BLIZZARD_TOKEN_URL={base}/token python speed_scanner.py")
+    print(f"   Live counters: {base}/__stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats_snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import time
+
+# Run from the repository root: python Mini_Programs/region_auctions.py --item 212345
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speed_scanner  # noqa: E402
+
+# === Setup ===
+MAX_LISTINGS_SHOWN = 25
+
+
+def load_region(at=None):
+    """Loads every realm's archived snapshot (newest at or before `at`) into one RegionAuctionStore."""
+    store = speed_scanner.RegionAuctionStore()
+    for realm_id in speed_scanner.list_archived_realms():
+        auctions, _ = speed_scanner.load_archived_auctions(realm_id, at, stream=True)
+        store.put(realm_id, speed_scanner.AuctionTable.from_auctions(auctions, store.pool))
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hold every archived realm snapshot in memory and query it region-wide.")
+    parser.add_argument("--at", default="latest", help="Snapshot time: 'latest', epoch seconds or YYYY-MM-DDTHH:MM:SS")
+    parser.add_argument("--item", type=int, help="Item ID to list across all realms")
+    parser.add_argument("--bonus", type=int, help="Only listings whose bonus IDs include this one")
+    parser.add_argument("--csv", action="store_true", help=f"Write every listing to {speed_scanner.REGION_AUCTIONS_CSV}")
+    args = parser.parse_args()
+
+    if not speed_scanner.list_archived_realms():
+        print(f"❌ No archived snapshots in {speed_scanner.SNAPSHOT_ARCHIVE_DIR}; run a scan first.")
+        return
+
+    start = time.perf_counter()
+    store = load_region(speed_scanner.parse_replay_timestamp(args.at))
+    print(f"🗺️  Loaded {store.total_auctions()} auctions from {len(store.realms())} realm(s) in "
+          f"{time.perf_counter() - start:.1f}s ({store.nbytes() / 1e6:.1f} MB, "
+          f"{len(store.pool)} interned lists)")
+
+    if args.item:
+        matches = store.find_item(args.item, args.bonus)
+        print(f"\n🔎 {len(matches)} listing(s) of item {args.item}" + (f" with bonus {args.bonus}" if args.bonus else ""))
+        for realm_id, auction in matches[:MAX_LISTINGS_SHOWN]:
+            buyout = auction.get('buyout')
+            price = f"{buyout // 10000}g" if buyout else "BID ONLY"
+            bonuses = auction['item'].get('bonus_lists', [])
+            print(f"- Realm {realm_id:<5} | {price:>10} | x{auction.get('quantity', 1)} | bonus {bonuses}")
+
+    if args.csv:
+        speed_scanner.write_region_auctions_csv(store)
+        print(f"\n💾 Saved listings to {speed_scanner.REGION_AUCTIONS_CSV}")
+
+
+if __name__ == "__main__":
+    main()
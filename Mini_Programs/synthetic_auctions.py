@@ -0,0 +1,187 @@
+import json
+import random
+
+# === Setup ===
+BONUS_DATA_PATH = "RaidBots_APIs/bonuses.json"
+UPGRADE_SETS_PATH = "RaidBots_APIs/bonus-upgrade-sets.json"
+ITEM_DATA_PATH = "RaidBots_APIs/item-conversions.json"
+
+# Stat suffix, socket and speed bonus IDs are sampled from the real Raidbots data so that
+# synthetic snapshots exercise the same filter paths as live auction data.
+SPEED_BONUS_ID = 42
+# rawStats IDs of the tertiary stats (Speed, Leech, Avoidance, Indestructible)
+TERTIARY_STAT_IDS = {61, 62, 63, 64}
+
+
+def load_bonus_pools(path=BONUS_DATA_PATH):
+    """
+    Groups real bonus IDs from bonuses.json by the role they play in an item's bonus list.
+
+    'tertiary' and 'upgrade' are extra views used by make_realistic_auction(); the original
+    pools are unchanged so make_snapshot() keeps producing the same snapshots.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        bonuses = json.load(f)
+
+    pools = {"level": [], "curve": [], "stats": [], "socket": [], "other": [], "tertiary": [], "upgrade": []}
+    for bid_str, bonus in bonuses.items():
+        bid = int(bid_str)
+        if any(raw.get("stat") in TERTIARY_STAT_IDS for raw in bonus.get("rawStats") or []):
+            pools["tertiary"].append(bid)
+        if "upgrade" in bonus:
+            pools["upgrade"].append(bid)
+        if "curveId" in bonus:
+            pools["curve"].append(bid)
+        elif "level" in bonus:
+            pools["level"].append(bid)
+        elif "stats" in bonus:
+            pools["stats"].append(bid)
+        elif bonus.get("socket"):
+            pools["socket"].append(bid)
+        else:
+            pools["other"].append(bid)
+    return pools
+
+
+def make_auction(rng, auction_id, pools, item_ids):
+    """Builds one auction entry shaped like Blizzard's connected-realm auctions payload."""
+    bonus_lists = [rng.choice(pools["level"] or [0])]
+    if rng.random() < 0.35:
+        bonus_lists.append(rng.choice(pools["curve"]))
+    if rng.random() < 0.6:
+        bonus_lists.append(rng.choice(pools["stats"]))
+    if rng.random() < 0.05:
+        bonus_lists.append(rng.choice(pools["socket"]))
+    if rng.random() < 0.02:
+        bonus_lists.append(SPEED_BONUS_ID)
+    if rng.random() < 0.3:
+        bonus_lists.append(rng.choice(pools["other"]))
+
+    item = {"id": rng.choice(item_ids), "bonus_lists": bonus_lists}
+    if rng.random() < 0.7:
+        item["modifiers"] = [
+            {"type": 9, "value": rng.choice([30, 50, 60, 70, 80])},
+            {"type": 28, "value": rng.randint(1000, 3000)},
+        ]
+
+    auction = {
+        "id": auction_id,
+        "item": item,
+        "quantity": 1,
+        "time_left": rng.choice(["SHORT", "MEDIUM", "LONG", "VERY_LONG"]),
+    }
+    if rng.random() < 0.9:
+        # Log-uniform buyouts from 1g to 10m gold, in copper
+        auction["buyout"] = int(10 ** rng.uniform(4, 11))
+    else:
+        auction["bid"] = int(10 ** rng.uniform(4, 9))
+    return auction
+
+
+def load_upgrade_tracks(path=UPGRADE_SETS_PATH):
+    """Returns each upgrade track (bonus-upgrade-sets.json group) as its list of per-level bonus IDs."""
+    with open(path, "r", encoding="utf-8") as f:
+        upgrade_sets = json.load(f)
+    return [[step["bonusId"] for step in steps] for steps in upgrade_sets.values() if steps]
+
+
+def load_item_pool(path=ITEM_DATA_PATH):
+    """
+    Returns real equippable item records (id, name, itemClass, itemSubClass, inventoryType,
+    itemLevel, stats) from Raidbots' item-conversions.json, one per item ID.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        conversions = json.load(f)
+    items = {}
+    for conversion in conversions.values():
+        for item in conversion.get("items", []):
+            items.setdefault(item["id"], item)
+    return list(items.values())
+
+
+def make_realistic_auction(rng, auction_id, pools, items, tracks):
+    """
+    Builds one auction for a real item with a coherent bonus list: an upgrade-track step or an
+    item level / curve bonus, then an optional stat suffix, socket, tertiary stat and misc bonus.
+    """
+    record = rng.choice(items)
+    if tracks and rng.random() < 0.5:
+        bonus_lists = [rng.choice(rng.choice(tracks))]
+    else:
+        bonus_lists = [rng.choice(pools["level"] or [0])]
+        if rng.random() < 0.35:
+            bonus_lists.append(rng.choice(pools["curve"]))
+    if rng.random() < 0.4:
+        bonus_lists.append(rng.choice(pools["stats"]))
+    if rng.random() < 0.05:
+        bonus_lists.append(rng.choice(pools["socket"]))
+    if rng.random() < 0.08:
+        bonus_lists.append(rng.choice(pools["tertiary"] or [SPEED_BONUS_ID]))
+    if rng.random() < 0.3:
+        bonus_lists.append(rng.choice(pools["other"]))
+
+    item = {"id": record["id"], "bonus_lists": bonus_lists}
+    if rng.random() < 0.7:
+        item["modifiers"] = [
+            {"type": 9, "value": rng.choice([60, 70, 70, 80, 80, 80])},
+            {"type": 28, "value": rng.randint(1000, 3000)},
+        ]
+
+    auction = {
+        "id": auction_id,
+        "item": item,
+        "quantity": 1,
+        "time_left": rng.choice(["SHORT", "MEDIUM", "LONG", "VERY_LONG"]),
+    }
+    if rng.random() < 0.9:
+        auction["buyout"] = int(10 ** rng.uniform(4, 11))
+    else:
+        auction["bid"] = int(10 ** rng.uniform(4, 9))
+    return auction
+
+
+def make_realistic_snapshot(auction_count, seed=0, realm_id=3721, pools=None, items=None, tracks=None):
+    """
+    Like make_snapshot(), but every auction is a real item (see load_item_pool()) with a coherent
+    bonus combination (see make_realistic_auction()). Use the same items to fill item metadata.
+    """
+    rng = random.Random(seed)
+    pools = pools or load_bonus_pools()
+    items = items or load_item_pool()
+    tracks = load_upgrade_tracks() if tracks is None else tracks
+    href = f"https://us.api.blizzard.com/data/wow/connected-realm/{realm_id}"
+    return {
+        "_links": {"self": {"href": f"{href}/auctions?namespace=dynamic-us"}},
+        "connected_realm": {"href": f"{href}?namespace=dynamic-us"},
+        "auctions": [make_realistic_auction(rng, 1000000 + i, pools, items, tracks) for i in range(auction_count)],
+    }
+
+
+def make_snapshot(auction_count, seed=0, realm_id=3721, item_pool_size=5000, pools=None):
+    """
+    Builds a synthetic connected-realm auction snapshot.
+
+    Args:
+        auction_count (int): Number of auctions in the snapshot.
+        seed (int): Random seed so runs are reproducible.
+        realm_id (int): Connected realm ID used in the _links block.
+        item_pool_size (int): Number of distinct item IDs to draw from.
+        pools (dict): Output of load_bonus_pools(); loaded from disk when omitted.
+
+    Returns:
+        dict: Snapshot with '_links', 'connected_realm' and 'auctions' keys.
+    """
+    rng = random.Random(seed)
+    pools = pools or load_bonus_pools()
+    item_ids = [rng.randint(100000, 240000) for _ in range(item_pool_size)]
+    href = f"https://us.api.blizzard.com/data/wow/connected-realm/{realm_id}"
+    return {
+        "_links": {"self": {"href": f"{href}/auctions?namespace=dynamic-us"}},
+        "connected_realm": {"href": f"{href}?namespace=dynamic-us"},
+        "auctions": [make_auction(rng, 1000000 + i, pools, item_ids) for i in range(auction_count)],
+    }
+
+
+if __name__ == "__main__":
+    snapshot = make_snapshot(10)
+    print(json.dumps(snapshot["auctions"][:3], indent=2))
@@ -1,36 +1,43 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response
 import pandas as pd
 import json
-import subprocess
 import os
-import sys
+from speed_scanner import SCAN_REPORT_FILE, ScanEngine, load_scan_history, prometheus_metrics
 
 app = Flask(__name__)
 
 # === Config Paths ===
 CSV_PATH = "CSVs/speed_gear.csv"
-CONFIG_PATH = "scan_config.json"
-SCANNER_PATH = "speed_scanner.py"
+
+# Warm in-process scanner; its worker thread starts with the first /scan
+engine = ScanEngine()
 
 # === Utility ===
-def load_csv():
-    if os.path.exists(CSV_PATH):
-        return pd.read_csv(CSV_PATH)
+def load_csv(path=CSV_PATH):
+    if os.path.exists(path):
+        return pd.read_csv(path)
     return pd.DataFrame()
 
-# === Routes ===
-@app.route("/")
-def index():
-    data = load_csv().to_dict(orient="records")
-    return render_template("index.html", table_data=data)
+def results_csv_path():
+    """CSV of the newest finished web scan job, or the CLI's CSV_PATH if no job has finished yet."""
+    done = [job for job in engine.list_jobs() if job.status == "done"]
+    if done:
+        return max(done, key=lambda job: job.finished_at).csv_path
+    return CSV_PATH
 
-@app.route("/scan", methods=["POST"])
-def run_scan():
-    raw = request.json
-    
+def load_scan_report():
+    if os.path.exists(SCAN_REPORT_FILE):
+        with open(SCAN_REPORT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return None
+
+def build_scan_profile(raw):
+    """Converts the UI form payload into a full scan profile (scan_config.json format)."""
     # --- Sanitize FILTER_TYPE ---
     valid_filter_values = {
         "Haste", "Crit", "Vers", "Mastery", "Speed", "Prismatic",
+        "Socket", "Leech", "Avoidance", "Indestructible",
+        "Strength", "Agility", "Intellect",
         "Max-Haste", "Max-Crit", "Max-Vers", "Max-Mastery"
     }
     raw["FILTER_TYPE"] = [
@@ -40,78 +47,104 @@ def run_scan():
     if not isinstance(raw.get("FILTER_TYPE"), list):
         raw["FILTER_TYPE"] = []
 
+    # === Convert UI config to full SCAN_PROFILE ===
+    ilvl_min = int(raw.get("min_ilvl") or raw.get("MIN_ILVL") or 0)
+    ilvl_max = int(raw.get("max_ilvl") or raw.get("MAX_ILVL") or 1000)
+    max_buyout = int(raw.get("max_buyout") or raw.get("MAX_BUYOUT") or 99999999)
+
+    stat_thresholds = raw.get("STAT_DISTRIBUTION_THRESHOLDS") or {
+        "Haste": 71 if raw.get("haste") else 0,
+        "Crit": 71 if raw.get("crit") else 0,
+        "Vers": 71 if raw.get("vers") else 0,
+        "Mastery": 71 if raw.get("mastery") else 0,
+        "Speed": 71 if raw.get("speed") else 0
+    }
+
+    return {
+        "MIN_ILVL": ilvl_min,
+        "MAX_ILVL": ilvl_max,
+        "MAX_BUYOUT": max_buyout,
+        "FILTER_TYPE": raw.get("FILTER_TYPE", []),
+        "STAT_DISTRIBUTION_THRESHOLDS": stat_thresholds,
+        "ALLOWED_ARMOR_SLOTS": [s for s in raw.get("slots", []) if s in [
+            "Head", "Shoulder", "Chest", "Waist", "Legs", "Feet", "Back", "Wrist", "Hands"]],
+        "ALLOWED_WEAPON_SLOTS": [s for s in raw.get("slots", []) if s in [
+            "One-Hand", "Two-Hand", "Main-Hand", "Off-Hand", "Held In Off-hand", "Ranged", "Ranged Right"]],
+        "ALLOWED_ACCESSORY_SLOTS": [s for s in raw.get("slots", []) if s in [
+            "Finger", "Trinket", "Neck", "Held In Off-hand"]],
+        "ALLOWED_ARMOR_TYPES": raw.get("ALLOWED_ARMOR_TYPES") or raw.get("armor_types", []),
+        "ALLOWED_WEAPON_TYPES": raw.get("ALLOWED_WEAPON_TYPES") or raw.get("weapon_types", []),
+        "slots": raw.get("slots", []),
+        "scan_mode": raw.get("scan_mode", "all"),
+        "realm": raw.get("realm", None),
+    }
+
+# === Routes ===
+@app.route("/")
+def index():
+    data = load_csv(results_csv_path()).to_dict(orient="records")
+    return render_template("index.html", table_data=data)
+
+@app.route("/scan", methods=["POST"])
+def run_scan():
+    raw = request.json
+
     print("\n📥 Received scan config:")
     print(json.dumps(raw, indent=2))
 
-    # === Convert UI config to full SCAN_PROFILE ===
     try:
-        ilvl_min = int(raw.get("min_ilvl") or raw.get("MIN_ILVL") or 0)
-        ilvl_max = int(raw.get("max_ilvl") or raw.get("MAX_ILVL") or 1000)
-        max_buyout = int(raw.get("max_buyout") or raw.get("MAX_BUYOUT") or 99999999)
-
-        stat_thresholds = raw.get("STAT_DISTRIBUTION_THRESHOLDS") or {
-            "Haste": 71 if raw.get("haste") else 0,
-            "Crit": 71 if raw.get("crit") else 0,
-            "Vers": 71 if raw.get("vers") else 0,
-            "Mastery": 71 if raw.get("mastery") else 0,
-            "Speed": 71 if raw.get("speed") else 0
-        }
-
-        profile = {
-            "MIN_ILVL": ilvl_min,
-            "MAX_ILVL": ilvl_max,
-            "MAX_BUYOUT": max_buyout,
-            "FILTER_TYPE": raw.get("FILTER_TYPE", []),
-            "STAT_DISTRIBUTION_THRESHOLDS": stat_thresholds,
-            "ALLOWED_ARMOR_SLOTS": [s for s in raw.get("slots", []) if s in [
-                "Head", "Shoulder", "Chest", "Waist", "Legs", "Feet", "Back", "Wrist", "Hands"]],
-            "ALLOWED_WEAPON_SLOTS": [s for s in raw.get("slots", []) if s in [
-                "One-Hand", "Two-Hand", "Main-Hand", "Off-Hand", "Held In Off-hand", "Ranged", "Ranged Right"]],
-            "ALLOWED_ACCESSORY_SLOTS": [s for s in raw.get("slots", []) if s in [
-                "Finger", "Trinket", "Neck", "Held In Off-hand"]],
-            "ALLOWED_ARMOR_TYPES": raw.get("ALLOWED_ARMOR_TYPES") or raw.get("armor_types", []),
-            "ALLOWED_WEAPON_TYPES": raw.get("ALLOWED_WEAPON_TYPES") or raw.get("weapon_types", []),
-            "slots": raw.get("slots", []),
-            "scan_mode": raw.get("scan_mode", "all"),
-            "realm": raw.get("realm", None),
-        }
-
-        # Write transformed profile
-        with open(CONFIG_PATH, "w") as f:
-            json.dump(profile, f, indent=2)
-            print(f"💾 Saved scan profile to {CONFIG_PATH}")
-
-        # Run scan
-        print(f"🚀 Running: {SCANNER_PATH} --config {CONFIG_PATH}\n")
-        result = subprocess.run(
-            ["python", SCANNER_PATH, "--config", CONFIG_PATH],
-            stdout=sys.stdout,
-            stderr=sys.stderr,
-            text=True,
-            encoding="utf-8",
-            check=True
-        )
-        # Load results to check if CSV is empty
-        df = pd.read_csv(CSV_PATH)
-        if df.empty:
-            print("Scan completed but returned no matching results.")
-            return jsonify({"success": True, "no_results": True})
-        
-        # Print scan results
-        print(result.stdout)
-        if result.stderr:
-            print("❌ stderr:", result.stderr)
-        print("✅ Scan completed successfully")
-        return jsonify({"success": True})
-
-    except Exception as e:
-        print(f"❌ Scan failed due to error: {e}")
-        return jsonify({"success": False, "error": str(e)})
+        job = engine.submit(build_scan_profile(raw))
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"❌ Scan rejected due to error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    # The scan runs on the engine thread; the UI polls /scan/<job_id>
+    return jsonify({"success": True, "job_id": job.id, "status": job.status}), 202
+
+@app.route("/scan/<job_id>")
+def scan_status(job_id):
+    job = engine.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": f"Unknown scan job {job_id}"}), 404
+    return jsonify({"success": True, **job.to_dict()})
+
+@app.route("/scan/<job_id>/cancel", methods=["POST"])
+def cancel_scan(job_id):
+    job = engine.cancel(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": f"Unknown scan job {job_id}"}), 404
+    return jsonify({"success": True, **job.to_dict()})
+
+@app.route("/scan/<job_id>/results")
+def scan_results(job_id):
+    job = engine.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": f"Unknown scan job {job_id}"}), 404
+    if job.status != "done":
+        return jsonify({"success": False, "error": f"Scan job {job_id} is {job.status}"}), 409
+    # Same row format as /reload, read from the job's own CSV
+    return jsonify(load_csv(job.csv_path).to_dict(orient="records"))
+
+@app.route("/jobs")
+def list_jobs():
+    return jsonify([job.to_dict() for job in engine.list_jobs()])
 
 @app.route("/reload")
 def reload_csv():
-    df = load_csv()
+    df = load_csv(results_csv_path())
     return jsonify(df.to_dict(orient="records"))
 
+@app.route("/report")
+def scan_report():
+    # Last run report plus the per-run history (oldest first)
+    return jsonify({"report": load_scan_report(), "history": load_scan_history()})
+
+@app.route("/metrics")
+def metrics():
+    report = load_scan_report()
+    if report is None:
+        return Response("# No scan has been run yet\n", mimetype="text/plain; version=0.0.4")
+    return Response(prometheus_metrics(report, load_scan_history()), mimetype="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -7,23 +7,47 @@ and writes matching results to a CSV file.
 
 Usage:
     python speed_scanner.py
+
+Importing the module has no side effects: logging, credentials (.env) and command-line
+parsing are set up by main(), and requests, tqdm, python-dotenv and numpy are imported on
+first use.
 """
 
 import os  # Interact with the operating system (file paths, environment variables)
 import time  # Handle timing and delays between API requests
 import json  # Parse and write JSON data
 import logging  # Log progress and warnings
-import requests  # Make HTTP requests to Blizzard and Raidbots APIs
 import csv  # Read and write CSV files
 from urllib.parse import urlparse  # Parse URLs for realm mapping
-from dotenv import load_dotenv  # Load environment variables from a .env file
-from tqdm import tqdm  # Display progress bars for realm scanning
 import re  # Regular expressions for parsing item level strings
 from time import perf_counter # Measure elapsed time for performance tracking
 import sys # System-specific parameters and functions
-from pathlib import Path # Handle file paths in a cross-platform way
 import argparse
-import json
+import sqlite3  # Persistent on-disk item metadata store
+from collections import OrderedDict, namedtuple  # In-memory LRU tier of the item metadata store; bonus index rows
+import codecs  # Incremental UTF-8 decoding of streamed auction payloads
+import hashlib  # Fingerprint scan configs for the auction snapshot cache
+import pickle  # Binary snapshots of parsed Raidbots datasets
+from collections.abc import Mapping  # Lazy read-only view over the Raidbots datasets
+from functools import cached_property, lru_cache  # Lazily derived listing values in the scan plan; one-time lazy imports
+import gzip  # Compress archived raw auction snapshots
+from datetime import datetime  # Parse --replay timestamps
+from email.utils import parsedate_to_datetime  # Turn Last-Modified headers into archive keys
+from itertools import chain  # Flatten bonus lists into one array for the vectorized engine
+from array import array  # Typed columns of the compact auction table
+import queue  # Bounded hand-off queues between scan pipeline stages
+import threading  # Guard shared counters when realms are scanned concurrently
+import random  # Sample debug trace events
+from bisect import bisect_left  # Bucket scan metric observations
+from contextlib import contextmanager, nullcontext  # Scan phase timers; optional per-realm profiling
+import tracemalloc  # --profile: per-realm allocation sites (cProfile/pstats are imported by RealmProfiler)
+from logging.handlers import QueueHandler, QueueListener  # Write debug trace events off the scan threads
+from concurrent.futures import ThreadPoolExecutor, as_completed  # Bounded parallel realm scanning
+# requests (HTTP), tqdm (progress bars), python-dotenv (.env credentials) and numpy are imported
+# where they are first used, so `import speed_scanner` stays fast for app.py and Mini_Programs
+
+# numpy, once load_numpy() has imported it (optional: vectorized filter engine, --engine numpy)
+np = None
 
 
 # === SCAN PROFILE DEFINITIONS ===
@@ -124,12 +148,63 @@ SCAN_PROFILES = {
 # Maximum number of connected-realms to scan (Max=83)
 MAX_REALMS = 83
 
-# Toggles full debugging metadata
-PRINT_FULL_METADATA = True  # Set to True to print full auction metadata per matching item
-suppress_inline_debug = False  # Global override for suppressing debug prints during formatted output
+# Toggles verbose console output (DEBUG logging of the per-request and per-item debug lines)
+PRINT_FULL_METADATA = False
+
+# Print the end-of-run scan summary (cache and memo hit rates, predicate plan, limiter wait, phases)
+PRINT_SCAN_SUMMARY = True
+
+# Structured debug trace (--trace): request, item and listing events written as JSON lines by a
+# background thread. Events are kept with probability TRACE_SAMPLE_RATE; when item or realm
+# selectors are set, only events matching them are traced and those are always kept.
+TRACE_SAMPLE_RATE = 1.0
+TRACE_ITEM_IDS = set()
+TRACE_REALM_IDS = set()
+TRACE_QUEUE_SIZE = 10000  # Events waiting for the writer thread; further events are dropped, never waited on
+
+# Runs kept in the scan history; a run slower than SCAN_REGRESSION_FACTOR x the median of the
+# last SCAN_REGRESSION_WINDOW comparable runs (same realm count and scan mode) is flagged
+SCAN_HISTORY_LIMIT = 500
+SCAN_REGRESSION_WINDOW = 10
+SCAN_REGRESSION_FACTOR = 1.25
 
-# Limits the number of requests to Blizzard's API
+# ScanEngine (app.py): finished jobs kept (with their output folders) before the oldest are removed
+JOB_HISTORY_LIMIT = 20
+
+# --profile: entries listed in the hotspot summary, and stack frames kept per allocation
+PROFILE_TOP_N = 15
+PROFILE_TRACEMALLOC_FRAMES = 1
+
+# Limits the number of requests to Blizzard's API (per-second burst and hourly quota)
 MAX_REQUESTS_PER_SEC = 90
+MAX_REQUESTS_PER_HOUR = 36000
+
+# (connect, read) timeout in seconds for every Blizzard API request; timed-out attempts are retried
+REQUEST_TIMEOUT = (10, 60)
+
+# Number of realm auction downloads kept in flight at once (1 = serial scan)
+SCAN_WORKERS = 4
+
+# Parse auction snapshots incrementally from the response body instead of loading them whole
+STREAM_AUCTIONS = False
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Run fetch -> decode -> filter as overlapping stages; at most this many snapshots wait in each queue
+PIPELINE_SCAN = False
+PIPELINE_MAX_BUFFERED = 2
+
+# Download and pre-filter every realm first, then bulk-prefetch item metadata before evaluating
+TWO_PHASE_SCAN = False
+
+# Filter engine: 'python' evaluates auction by auction; 'numpy' applies the metadata-free filters
+# as array masks over batches of auctions and only evaluates the survivors in Python
+SCAN_ENGINE = 'python'
+VECTOR_BATCH_SIZE = 100000
+
+# Convert decoded auction snapshots into compact AuctionTables as they arrive
+AUCTION_TABLES = True
+# Also keep every realm's latest table in region_auctions for region-wide queries
+HOLD_REGION_AUCTIONS = False
 
 # Deletes records older than a specified duration in the scan cache
 SCAN_EXPIRY_DAYS = 2
@@ -148,13 +223,78 @@ LEGACY_BONUS_IDS = [6654, 6655, 7968]
 
 # Filenames for output and caching
 CSV_FILENAME = 'CSVs/speed_gear.csv'
+REGION_AUCTIONS_CSV = 'CSVs/region_auctions.csv'
 REALM_CSV = 'CSVs/realm_map.csv'
 LOADED_SERVERS_CSV = 'CSVs/loaded_servers.csv'
 TOKEN_CACHE = 'Tokens/token_cache.json'
 BONUS_DATA_FILE = 'RaidBots_APIs/bonus_data_cache.json'
 BONUS_DATA_URL = 'https://www.raidbots.com/static/data/live/bonuses.json' # Provides bonus ID adjustments (level increases per bonus)
-
-# Mapping of bonus IDs to their respective filter types
+CACHE_DIR = 'Cache'
+AUCTION_SNAPSHOT_CACHE = os.path.join(CACHE_DIR, 'auction_snapshots.json')  # Last-Modified + results per realm
+ITEM_METADATA_DB = os.path.join(CACHE_DIR, 'item_metadata.sqlite3')  # Persistent item metadata store
+SNAPSHOT_ARCHIVE_DIR = os.path.join(CACHE_DIR, 'snapshots')  # Raw gzip auction snapshots, one folder per realm
+RAIDBOTS_SNAPSHOT_DIR = os.path.join(CACHE_DIR, 'raidbots')  # Pickled copies of the parsed Raidbots datasets
+RAIDBOTS_SNAPSHOT_FORMAT = 1  # Bump to invalidate every Raidbots snapshot after a loader change
+RAIDBOTS_MANIFEST = os.path.join(CACHE_DIR, 'raidbots_manifest.json')  # Dataset version, ETags and last check time
+BONUS_INDEX_CACHE = os.path.join(CACHE_DIR, 'bonus_index.pickle')  # Compiled per-bonus-ID lookup table
+BONUS_INDEX_FORMAT = 2  # Bump whenever BonusInfo or compile_bonus() changes
+TRACE_FILE = os.path.join(CACHE_DIR, 'scan_trace.jsonl')  # Default --trace output (JSON lines, appended)
+SCAN_REPORT_FILE = os.path.join(CACHE_DIR, 'scan_report.json')  # Metrics of the most recent scan run
+SCAN_HISTORY_FILE = os.path.join(CACHE_DIR, 'scan_history.jsonl')  # One metrics summary per scan run
+PROFILE_DIR = os.path.join(CACHE_DIR, 'profiles')  # --profile output, one folder per run
+JOB_OUTPUT_DIR = os.path.join(CACHE_DIR, 'jobs')  # ScanEngine job config, CSV and run report, one folder per job
+RAIDBOTS_BASE_URL = 'https://www.raidbots.com/static/data/live'
+
+# Raidbots .json files kept in RaidBots_APIs/ (metadata.json carries the dataset version)
+RAIDBOTS_DATASETS = [
+    "metadata",
+    "bonuses",
+    "equippable-items",
+    "equippable-items-full",
+    "item-names",
+    "talents",
+    "instances",
+    "enchantments",
+    "crafting",
+    "item-curves",
+    "item-conversions",
+    "item-sets",
+    "item-limit-categories",
+    "level-selector-sequences",
+    "bonus-crafted-stats",
+    "bonus-effects",
+    "bonus-id-base-levels",
+    "bonus-id-levels",
+    "bonus-level-deltas",
+    "bonus-sockets",
+    "bonus-upgrade-sets"
+]
+RAIDBOTS_CHECK_INTERVAL_HOURS = 12  # How often the remote metadata.json is compared with the local copy
+RAIDBOTS_DOWNLOAD_WORKERS = 6
+
+# Caches built from the Raidbots datasets; cleared whenever the dataset version changes
+RAIDBOTS_DERIVED_CACHES = [RAIDBOTS_SNAPSHOT_DIR, AUCTION_SNAPSHOT_CACHE, BONUS_INDEX_CACHE]
+
+# Item metadata cache lifetimes and in-memory LRU size
+ITEM_CACHE_TTL_DAYS = 30
+ITEM_NEGATIVE_TTL_HOURS = 24  # How long a 404 item is remembered as missing
+ITEM_CACHE_MEMORY_SIZE = 20000
+ITEM_METADATA_FORMAT = 2  # Bump whenever the stored metadata changes shape; older rows are discarded
+
+# Sends If-Modified-Since for auction snapshots and reuses stored results on 304 Not Modified
+CONDITIONAL_AUCTION_REQUESTS = True
+
+# Archives every downloaded auction snapshot (gzip) so scans can be replayed offline with --replay
+ARCHIVE_AUCTION_SNAPSHOTS = True
+ARCHIVE_COMPRESS_LEVEL = 5
+ARCHIVE_MAX_SNAPSHOTS_PER_REALM = 6  # Oldest snapshots beyond this are pruned per realm
+ARCHIVE_MAX_AGE_DAYS = 3
+ARCHIVE_MAX_TOTAL_MB = 2048  # Oldest snapshots region-wide are pruned beyond this size
+
+# Set by --replay: scan archived snapshots as of this epoch time instead of the live API (None = live)
+REPLAY_TIMESTAMP = None
+
+# Mapping of bonus IDs to their respective filter types (hand-maintained seeds; see FILTER_ID_SETS)
 FILTER_ID_MAP = {
     "Speed": SPEED_IDS,
     "Prismatic": PRISMATIC_IDS,
@@ -164,6 +304,42 @@ FILTER_ID_MAP = {
     "Mastery": MASTERY_IDS
 }
 
+# Filter types derived from bonuses.json when the data loads: any bonus whose rawStats carry one
+# of these stat IDs belongs to the filter. Primary-stat filters include the combined-stat IDs.
+FILTER_STAT_IDS = {
+    "Speed": frozenset([61]),
+    "Leech": frozenset([62]),
+    "Avoidance": frozenset([63]),
+    "Indestructible": frozenset([64]),
+    "Haste": frozenset([36]),
+    "Crit": frozenset([32]),
+    "Vers": frozenset([40]),
+    "Mastery": frozenset([49]),
+    "Strength": frozenset([4, 71, 72, 74]),
+    "Agility": frozenset([3, 71, 72, 73]),
+    "Intellect": frozenset([5, 71, 73, 74]),
+}
+SOCKET_FILTER = "Socket"  # Derived from bonus-sockets.json and the 'socket' flag in bonuses.json
+SECONDARY_FILTERS = ("Haste", "Crit", "Vers", "Mastery")
+
+# Filter type -> frozenset of bonus IDs: the hand lists above, unioned with the derived IDs once
+# load_scan_datasets() has run (see refresh_filter_id_sets)
+FILTER_ID_SETS = {name: frozenset(FILTER_ID_MAP.get(name, ())) for name in [*FILTER_ID_MAP, *FILTER_STAT_IDS, SOCKET_FILTER]}
+
+# Secondary-stat bonus IDs as O(1) lookups: bonus ID -> names of the lists containing it
+STAT_ID_LISTS = {name: frozenset(ids) for name, ids in
+                 {"HASTE_IDS": HASTE_IDS, "CRIT_IDS": CRIT_IDS, "VERS_IDS": VERS_IDS, "MASTERY_IDS": MASTERY_IDS}.items()}
+ALL_STAT_IDS = frozenset(HASTE_IDS + CRIT_IDS + VERS_IDS + MASTERY_IDS)
+STAT_ID_SOURCES = {bid: [name for name, ids in STAT_ID_LISTS.items() if bid in ids] for bid in ALL_STAT_IDS}
+
+# Mapping long stat names to filter keys
+STAT_NAME_MAP = {
+    "Critical Strike": "Crit",
+    "Versatility": "Vers",
+    "Mastery": "Mastery",
+    "Haste": "Haste"
+}
+
 # Human-readable mapping for armor subclass IDs
 ARMOR_TYPE_MAP = {
     1: "Cloth",
@@ -219,85 +395,605 @@ INVENTORY_TYPE_MAP = {
     28: "Relic"
 }
 
-# Global tracking for rate control
-throttle_tracker = {
-    'start_time': None,
-    'request_count': 0
-}
-
 debug_stats = {
     'blizzard_requests': 0,
     'item_metadata_hits': 0,
     'item_metadata_misses': 0,
     'auction_calls': 0,
     'realms_scanned': 0,
+    'auctions_not_modified': 0,
+    'rate_limited': 0,
+    'request_timeouts': 0,
+    'evaluation_memo_hits': 0,
+    'evaluation_memo_misses': 0,
+    'signature_hits': 0,
+    'signature_misses': 0,
 }
 
-# === Command-line argument parsing ===
-parser = argparse.ArgumentParser()
-parser.add_argument('--config', type=str, help='Path to JSON config file')
-args = parser.parse_args()
+# Guards debug_stats when realms are scanned from worker threads
+stats_lock = threading.Lock()
 
-if args.config:
-    with open(args.config, "r") as f:
-        config_data = json.load(f)
-        # Apply to your constants (FILTER_TYPE, ALLOWED_SLOTS, etc.)
-        
-# === Handle command-line config ===
-parser = argparse.ArgumentParser()
-parser.add_argument("--config", type=str, help="Path to scan config JSON")
-args = parser.parse_args()
-
-# Default profile to load
-profile_name = "custom"
-
-# Load config from file if passed
-# if args.config and os.path.exists(args.config):
-#     with open(args.config, "r") as f:
-#         config = json.load(f)
-#         # Extract filters from the file
-#         CUSTOM_PROFILE = {
-#             "MIN_ILVL": 1,
-#             "MAX_ILVL": 1000,
-#             "MAX_BUYOUT": int(config.get("max_buyout", 99999999)),
-#             "FILTER_TYPE": [],
-#             "ALLOWED_SLOTS": config.get("slots", []),
-#             "REQUIRE_PRISMATIC": config.get("prismatic", False),
-#             "STAT_DISTRIBUTION_THRESHOLDS": {
-#                 "Haste": 71 if config.get("haste") else 0,
-#                 "Crit": 71 if config.get("crit") else 0,
-#                 "Vers": 71 if config.get("vers") else 0,
-#                 "Mastery": 71 if config.get("mastery") else 0,
-#                 "Speed": 71 if config.get("speed") else 0
-#             }
-#         }
-
-#         # Assign FILTER_TYPE based on enabled stats
-#         if config.get("haste"): CUSTOM_PROFILE["FILTER_TYPE"].append("Haste")
-#         if config.get("crit"): CUSTOM_PROFILE["FILTER_TYPE"].append("Crit")
-#         if config.get("vers"): CUSTOM_PROFILE["FILTER_TYPE"].append("Vers")
-#         if config.get("mastery"): CUSTOM_PROFILE["FILTER_TYPE"].append("Mastery")
-#         if config.get("speed"): CUSTOM_PROFILE["FILTER_TYPE"].append("Speed")
-
-#         # Inject this into SCAN_PROFILES
-#         SCAN_PROFILES["custom"] = CUSTOM_PROFILE
-#         profile_name = "custom"
-
-
-# === Conditional global logging based on debug flag ===
-LOG_LEVEL = logging.DEBUG if PRINT_FULL_METADATA else logging.INFO
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format='[%(levelname)s] %(message)s',
-    stream=sys.stderr
-)
-logging.getLogger("urllib3").setLevel(LOG_LEVEL)
 
-# Ensure tqdm lock is acquired to display progress safely
-tqdm.get_lock()
+def increment_stat(key, amount=1):
+    """Thread-safe increment of a debug_stats counter."""
+    with stats_lock:
+        debug_stats[key] += amount
+
+
+# === SCAN METRICS ===
+# Phase timers, per-realm histograms and rate-limiter wait for one scan run. Exported as a JSON
+# run report (plus one summary line per run in the scan history) and in Prometheus text format.
+SCAN_PHASES = ('token', 'realm_map', 'dataset_load', 'download', 'decode', 'filter', 'metadata_fetch', 'output')
+REALM_HISTOGRAM_BOUNDS = {
+    'realm_bytes': (1e5, 1e6, 5e6, 1e7, 2.5e7, 5e7, 1e8),
+    'realm_auctions': (1000, 5000, 10000, 25000, 50000, 100000, 200000),
+    'realm_latency_seconds': (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+}
+
+
+def bucket_label(bound):
+    """Prometheus 'le' label of a histogram bound."""
+    if bound == float('inf'):
+        return '+Inf'
+    return str(int(bound)) if float(bound).is_integer() else str(bound)
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts[i] holds the observations <= bounds[i], the last slot the rest."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def summary(self):
+        """Cumulative bucket counts keyed by 'le' label, as in the Prometheus exposition format."""
+        buckets = {}
+        running = 0
+        for bound, n in zip(self.bounds + (float('inf'),), self.counts):
+            running += n
+            buckets[bucket_label(bound)] = running
+        return {'buckets': buckets, 'count': self.count, 'sum': round(self.sum, 4),
+                'min': self.min, 'max': self.max}
+
+
+class ScanMetrics:
+    """
+    Metrics registry for one scan run, shared by every scan thread.
+
+    Phases are timed with `with scan_metrics.phase(name):` and are exclusive: time spent in a
+    nested phase (metadata_fetch inside filter) is not counted again in the outer one. Phase
+    seconds are summed over threads, so concurrent scans can exceed the wall-clock duration.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started_at = time.time()
+        self.started = perf_counter()
+        self.phases = {name: [0.0, 0] for name in SCAN_PHASES}
+        self.histograms = {name: Histogram(bounds) for name, bounds in REALM_HISTOGRAM_BOUNDS.items()}
+        self.realms = {}
+        self.wait_seconds = 0.0
+        self.waits = 0
+
+    def add_phase(self, name, seconds):
+        with self.lock:
+            entry = self.phases.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    @contextmanager
+    def phase(self, name):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        stack.append(0.0)
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - started
+            inner = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.add_phase(name, elapsed - inner)
+
+    def observe_realm(self, realm_id, **values):
+        """Record per-realm values (bytes, auctions, latency_seconds) and add them to the realm histograms."""
+        with self.lock:
+            self.realms.setdefault(realm_id, {}).update(values)
+            for key, value in values.items():
+                self.histograms[f'realm_{key}'].observe(value)
+
+    def add_wait(self, seconds):
+        """Record time a request spent waiting on the rate limiter."""
+        with self.lock:
+            self.wait_seconds += seconds
+            self.waits += 1
+
+    def report(self, **context):
+        """
+        Build the JSON run report.
+
+        Args:
+            **context: Run details stored at the top level (realm count, profile, mode, ...).
+
+        Returns:
+            dict: Phases, realm histograms and values, rate-limiter wait and debug_stats counters.
+        """
+        with stats_lock:
+            counters = dict(debug_stats)
+        with self.lock:
+            return {
+                'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+                'duration_seconds': round(perf_counter() - self.started, 3),
+                **context,
+                'phases': {name: {'seconds': round(seconds, 4), 'count': count}
+                           for name, (seconds, count) in self.phases.items()},
+                'histograms': {name: h.summary() for name, h in self.histograms.items()},
+                'per_realm': {str(rid): dict(values) for rid, values in self.realms.items()},
+                'rate_limiter_wait': {'seconds': round(self.wait_seconds, 4), 'count': self.waits},
+                'counters': counters,
+            }
+
+
+# Registry of the current run; main() starts a fresh one per scan
+scan_metrics = ScanMetrics()
+
+
+def reset_scan_metrics():
+    """Start a new metrics registry (and so a new run) with zeroed debug_stats, and return it."""
+    global scan_metrics
+    with stats_lock:
+        debug_stats.update(dict.fromkeys(debug_stats, 0))
+    scan_metrics = ScanMetrics()
+    return scan_metrics
+
+
+def scan_history_entry(report):
+    """The compact per-run line kept in the scan history."""
+    return {
+        'started_at': report['started_at'],
+        'duration_seconds': report['duration_seconds'],
+        'realms': report.get('realms'),
+        'results': report.get('results'),
+        'mode': report.get('mode'),
+        'phases': {name: p['seconds'] for name, p in report['phases'].items()},
+        'rate_limiter_wait_seconds': report['rate_limiter_wait']['seconds'],
+        'requests': report['counters'].get('blizzard_requests', 0),
+    }
+
+
+def load_scan_history(filename=SCAN_HISTORY_FILE):
+    """Read the scan history (oldest first); unreadable lines are skipped."""
+    if not os.path.exists(filename):
+        return []
+    history = []
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                history.append(json.loads(line))
+            except ValueError:
+                continue
+    return history
+
+
+def write_scan_report(report, report_file=SCAN_REPORT_FILE, history_file=SCAN_HISTORY_FILE):
+    """
+    Write the run report and append its summary to the scan history (trimmed to SCAN_HISTORY_LIMIT).
+
+    Returns:
+        list: The scan history before this run was added.
+    """
+    os.makedirs(os.path.dirname(report_file), exist_ok=True)
+    tmp_path = f"{report_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, report_file)
+
+    history = load_scan_history(history_file)
+    kept = history[-(SCAN_HISTORY_LIMIT - 1):] + [scan_history_entry(report)]
+    tmp_path = f"{history_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(entry) + "\n" for entry in kept)
+    os.replace(tmp_path, history_file)
+    return history
+
+
+def duration_regression(report, history):
+    """
+    Compare a run with the median of the last SCAN_REGRESSION_WINDOW comparable runs.
+
+    Returns:
+        float: Median duration of those runs if this one took more than SCAN_REGRESSION_FACTOR
+        times as long, otherwise None.
+    """
+    durations = [entry['duration_seconds'] for entry in history
+                 if entry.get('realms') == report.get('realms') and entry.get('mode') == report.get('mode')]
+    durations = sorted(durations[-SCAN_REGRESSION_WINDOW:])
+    if not durations:
+        return None
+    mid = len(durations) // 2
+    median = durations[mid] if len(durations) % 2 else (durations[mid - 1] + durations[mid]) / 2
+    if median > 0 and report['duration_seconds'] > median * SCAN_REGRESSION_FACTOR:
+        return median
+    return None
+
+
+def prometheus_metrics(report, history=()):
+    """
+    Render a run report in the Prometheus text exposition format.
+
+    Args:
+        report (dict): Run report from ScanMetrics.report() (e.g. read back from SCAN_REPORT_FILE).
+        history (list, optional): Scan history; its length is exported as speedscanner_runs_recorded.
+
+    Returns:
+        str: The metrics page.
+    """
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP speedscanner_{name} {help_text}")
+        lines.append(f"# TYPE speedscanner_{name} {kind}")
+        for labels, value in samples:
+            label_str = "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}" if labels else ""
+            lines.append(f"speedscanner_{name}{label_str} {value}")
+
+    started = datetime.fromisoformat(report['started_at']).timestamp()
+    metric('last_run_timestamp_seconds', 'gauge', 'Start time of the last scan run', [({}, started)])
+    metric('last_run_duration_seconds', 'gauge', 'Wall-clock duration of the last scan run',
+           [({}, report['duration_seconds'])])
+    metric('last_run_realms', 'gauge', 'Realms scanned in the last run', [({}, report.get('realms', 0))])
+    metric('last_run_results', 'gauge', 'Listings found in the last run', [({}, report.get('results', 0))])
+    metric('phase_seconds', 'gauge', 'Time spent per scan phase in the last run (summed over threads)',
+           [({'phase': name}, p['seconds']) for name, p in report['phases'].items()])
+    metric('rate_limiter_wait_seconds', 'gauge', 'Time requests waited on the rate limiter in the last run',
+           [({}, report['rate_limiter_wait']['seconds'])])
+    metric('last_run_events', 'gauge', 'Request and cache counters of the last run',
+           [({'counter': name}, value) for name, value in report['counters'].items()])
+    for name, h in report['histograms'].items():
+        samples = [({'le': le}, n) for le, n in h['buckets'].items()]
+        lines.append(f"# HELP speedscanner_{name} Per-realm {name[len('realm_'):].replace('_', ' ')} in the last run")
+        lines.append(f"# TYPE speedscanner_{name} histogram")
+        lines.extend(f'speedscanner_{name}_bucket{{le="{labels["le"]}"}} {n}' for labels, n in samples)
+        lines.append(f"speedscanner_{name}_sum {h['sum']}")
+        lines.append(f"speedscanner_{name}_count {h['count']}")
+    metric('runs_recorded', 'gauge', 'Scan runs kept in the scan history', [({}, len(history))])
+    return "\n".join(lines) + "\n"
+
+# === SCAN PROFILER ===
+class RealmProfiler:
+    """
+    CPU (cProfile) and allocation (tracemalloc) profiles of each realm scan for --profile.
+
+    Each realm gets <run dir>/realm_<id>.prof (pstats format, e.g. for snakeviz) and
+    realm_<id>.alloc.txt; the profiles are also combined into a hotspot summary. tracemalloc is
+    process-wide, so realms must be scanned one at a time for the allocation sites to be per realm.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, top_n=PROFILE_TOP_N):
+        self.directory = os.path.join(directory, datetime.now().strftime('%Y%m%d-%H%M%S'))
+        self.top_n = top_n
+        self.stats = None
+        self.allocations = {}  # (filename, lineno) -> [bytes, blocks] net growth, summed over realms
+        self.realms = []  # (realm_id, seconds, peak traced bytes)
+        os.makedirs(self.directory, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+
+    @contextmanager
+    def realm(self, realm_id):
+        import cProfile
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen *>'))
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        started = perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            seconds = perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            growth = tracemalloc.take_snapshot().filter_traces(ignore).compare_to(before, 'lineno')
+            self.record(realm_id, profiler, growth, seconds, peak)
+
+    def record(self, realm_id, profiler, growth, seconds, peak):
+        import pstats
+        profiler.dump_stats(os.path.join(self.directory, f"realm_{realm_id}.prof"))
+        if self.stats is None:
+            self.stats = pstats.Stats(profiler)
+        else:
+            self.stats.add(profiler)
+        with open(os.path.join(self.directory, f"realm_{realm_id}.alloc.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"Realm {realm_id}: {seconds:.2f}s, peak traced memory {peak / 1e6:.1f} MB\n")
+            f.writelines(f"{stat}\n" for stat in growth[:self.top_n * 4])
+        for stat in growth:
+            frame = stat.traceback[0]
+            entry = self.allocations.setdefault((frame.filename, frame.lineno), [0, 0])
+            entry[0] += stat.size_diff
+            entry[1] += stat.count_diff
+        self.realms.append((realm_id, seconds, peak))
+
+    def hotspots(self):
+        """The top functions by cumulative time: (cumulative s, own s, calls, 'function (file:line)')."""
+        if self.stats is None:
+            return []
+        rows = [
+            (ct, tt, nc, f"{func} ({os.path.basename(filename)}:{line})")
+            for (filename, line, func), (cc, nc, tt, ct, callers) in self.stats.stats.items()
+        ]
+        return sorted(rows, reverse=True)[:self.top_n]
+
+    def allocation_sites(self):
+        """The lines whose allocations grew the most during realm scans: (bytes, blocks, 'file:line')."""
+        rows = [(size, count, f"{os.path.basename(filename)}:{lineno}")
+                for (filename, lineno), (size, count) in self.allocations.items() if size > 0]
+        return sorted(rows, reverse=True)[:self.top_n]
+
+    def summary_lines(self):
+        lines = [f"🔥 === HOTSPOTS ({len(self.realms)} realm(s), profiles in {self.directory}) ===",
+                 "⏱️  Top functions by cumulative time:"]
+        lines += [f"    ├─ {ct:8.3f}s cum | {tt:8.3f}s own | {nc:>9} call(s) | {name}"
+                  for ct, tt, nc, name in self.hotspots()]
+        lines.append("🧠 Top allocation sites (net growth during realm scans):")
+        lines += [f"    ├─ {size / 1e6:8.2f} MB | {count:>9} block(s) | {name}"
+                  for size, count, name in self.allocation_sites()]
+        lines.append("🌐 Per realm:")
+        lines += [f"    ├─ {rid:<6}: {seconds:.2f}s, peak {peak / 1e6:.1f} MB" for rid, seconds, peak in self.realms]
+        return lines
+
+    def close(self):
+        """Write the combined hotspot summary next to the per-realm profiles and stop tracemalloc."""
+        with open(os.path.join(self.directory, 'summary.txt'), 'w', encoding='utf-8') as f:
+            f.writelines(line + "\n" for line in self.summary_lines())
+        if self.stats is not None:
+            self.stats.dump_stats(os.path.join(self.directory, 'combined.prof'))
+        tracemalloc.stop()
+
+
+# Active --profile profiler, or None
+active_profiler = None
+
+
+def profile_realm(realm_id):
+    """Context manager profiling one realm scan when --profile is on (a no-op otherwise)."""
+    return active_profiler.realm(realm_id) if active_profiler is not None else nullcontext()
+
+
+# === JSON DECODING ===
+# Use the fastest installed JSON library for large payloads, falling back to the stdlib
+try:
+    import orjson
+    JSON_DECODER = 'orjson'
+    _json_loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+        JSON_DECODER = 'ujson'
+        _json_loads = ujson.loads
+    except ImportError:
+        JSON_DECODER = 'json'
+        _json_loads = json.loads
+
+
+def decode_json(raw):
+    """
+    Decode a JSON document (bytes or str) with the configured JSON_DECODER.
+
+    Args:
+        raw (bytes | str): Encoded JSON document.
+
+    Returns:
+        The decoded object.
+    """
+    return _json_loads(raw)
+
+
+def load_json_file(path):
+    """Read and decode a JSON file from disk with the fast decoder."""
+    with open(path, 'rb') as f:
+        return decode_json(f.read())
+
+
+@lru_cache(maxsize=None)
+def accept_encoding():
+    """Accept-Encoding value advertising every compression the installed urllib3 can decode
+    (gzip/deflate, plus br/zstd when available)."""
+    from urllib3.util import make_headers
+    return make_headers(accept_encoding=True)['accept-encoding']
+
+
+# === DEBUG TRACE ===
+class TraceRecordFormatter(logging.Formatter):
+    """Formats a trace record as one JSON line (runs on the listener thread)."""
+
+    def format(self, record):
+        event = {'ts': round(record.created, 6), 'event': record.msg, 'thread': record.threadName}
+        event.update(record.trace)
+        return json.dumps(event, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that hands records over untouched and drops them when the queue is full,
+    so a slow disk never blocks a scan thread.
+    """
+
+    def __init__(self, event_queue):
+        super().__init__(event_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The listener lives in this process; formatting is left to its thread
+        return record
 
-# Load Blizzard API credentials from .env file
-load_dotenv()
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class TraceSink:
+    """
+    Sampled, selector-filtered JSONL debug trace.
+
+    Scan threads only build an event dict and enqueue it; a QueueListener thread serializes
+    and appends it to the trace file. Check wants() before building an event so untraced
+    listings cost a set lookup at most.
+    """
+
+    def __init__(self, path=TRACE_FILE, sample_rate=TRACE_SAMPLE_RATE, item_ids=(), realm_ids=(),
+                 queue_size=TRACE_QUEUE_SIZE):
+        self.path = path
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.item_ids = frozenset(item_ids)
+        self.realm_ids = frozenset(realm_ids)
+        self.emitted = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.FileHandler(path, mode='a', encoding='utf-8')
+        file_handler.setFormatter(TraceRecordFormatter())
+        event_queue = queue.Queue(maxsize=queue_size)
+        self.handler = DroppingQueueHandler(event_queue)
+        self.listener = QueueListener(event_queue, file_handler)
+        self.logger = logging.getLogger('speed_scanner.trace')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.handlers = [self.handler]
+        self.listener.start()
+
+    @property
+    def dropped(self):
+        return self.handler.dropped
+
+    def wants(self, realm_id=None, item_id=None):
+        """
+        True if an event for this realm/item should be traced.
+
+        With selectors set, an event is traced only if it carries a selected item or realm ID
+        (and no unselected one); otherwise it is sampled at sample_rate.
+        """
+        if self.item_ids or self.realm_ids:
+            matched = False
+            if item_id is not None and self.item_ids:
+                if item_id not in self.item_ids:
+                    return False
+                matched = True
+            if realm_id is not None and self.realm_ids:
+                if realm_id not in self.realm_ids:
+                    return False
+                matched = True
+            return matched
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def emit(self, event, **fields):
+        """Queue one event; fields must be JSON-serializable (anything else is written with str())."""
+        self.emitted += 1
+        self.logger.debug(event, extra={'trace': fields})
+
+    def close(self):
+        """Stop the writer thread after it has flushed every queued event."""
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        self.logger.handlers = []
+
+
+# Active trace sink, or None when tracing is off (the common case)
+active_trace = None
+
+
+def start_trace(path=TRACE_FILE, sample_rate=None, item_ids=None, realm_ids=None):
+    """
+    Start writing debug trace events to `path`, replacing any active trace.
+
+    Args:
+        path (str): JSONL file events are appended to.
+        sample_rate (float, optional): Fraction of unselected events kept (default TRACE_SAMPLE_RATE).
+        item_ids (iterable, optional): Only trace these item IDs (default TRACE_ITEM_IDS).
+        realm_ids (iterable, optional): Only trace these connected-realm IDs (default TRACE_REALM_IDS).
+
+    Returns:
+        TraceSink: The new active sink.
+    """
+    global active_trace
+    stop_trace()
+    active_trace = TraceSink(
+        path,
+        TRACE_SAMPLE_RATE if sample_rate is None else sample_rate,
+        TRACE_ITEM_IDS if item_ids is None else item_ids,
+        TRACE_REALM_IDS if realm_ids is None else realm_ids,
+    )
+    logging.info(f"🛰️  Writing debug trace to {path} (sample rate {active_trace.sample_rate:.0%})")
+    return active_trace
+
+
+def stop_trace():
+    """Flush and close the active trace sink, if any."""
+    global active_trace
+    sink, active_trace = active_trace, None
+    if sink is None:
+        return
+    sink.close()
+    dropped = f", {sink.dropped} dropped (queue full)" if sink.dropped else ""
+    logging.info(f"🛰️  Wrote {sink.emitted - sink.dropped} trace event(s) to {sink.path}{dropped}")
+
+
+def request_kind(url):
+    """Classify a Blizzard API URL for the trace ('auctions', 'item' or 'other')."""
+    if "connected-realm" in url and "auctions" in url:
+        return 'auctions'
+    if "item/" in url:
+        return 'item'
+    return 'other'
+
+
+# === Logging and credentials (applied by main(), never at import) ===
+def configure_logging():
+    """Send log records to stderr (DEBUG when PRINT_FULL_METADATA is on, INFO otherwise)."""
+    level = logging.DEBUG if PRINT_FULL_METADATA else logging.INFO
+    logging.basicConfig(
+        level=level,
+        format='[%(levelname)s] %(message)s',
+        stream=sys.stderr
+    )
+    logging.getLogger("urllib3").setLevel(level)
+
+
+def load_environment():
+    """
+    Load Blizzard API credentials and endpoint overrides from the environment and the .env file.
+
+    main() calls this before the first request; anything driving the scanner in-process
+    (e.g. app.py) must call it too.
+    """
+    global CLIENT_ID, CLIENT_SECRET, BASE_URL, TOKEN_URL
+    from dotenv import load_dotenv
+    load_dotenv()
+    CLIENT_ID = os.getenv('BLIZZARD_CLIENT_ID')
+    CLIENT_SECRET = os.getenv('BLIZZARD_CLIENT_SECRET')
+    BASE_URL = os.getenv('BLIZZARD_API_BASE_URL', 'https://{region}.api.blizzard.com')
+    TOKEN_URL = os.getenv('BLIZZARD_TOKEN_URL', 'https://oauth.battle.net/token')
+
+
+# Blizzard API credentials (from the process environment until load_environment() reads .env)
 CLIENT_ID = os.getenv('BLIZZARD_CLIENT_ID')
 CLIENT_SECRET = os.getenv('BLIZZARD_CLIENT_SECRET')
 
@@ -306,8 +1002,10 @@ REGION_NS = {
     'us': {'dynamic': 'dynamic-us', 'static': 'static-us'},
     'eu': {'dynamic': 'dynamic-eu', 'static': 'static-eu'}
 }
-# Base URL template for Blizzard API calls
-BASE_URL = 'https://{region}.api.blizzard.com'
+# Base URL template for Blizzard API calls and the OAuth token endpoint
+# (both overridable, e.g. to point the scanner at Mini_Programs/mock_blizzard_api.py; see load_environment)
+BASE_URL = os.getenv('BLIZZARD_API_BASE_URL', 'https://{region}.api.blizzard.com')
+TOKEN_URL = os.getenv('BLIZZARD_TOKEN_URL', 'https://oauth.battle.net/token')
 # In-memory map of realm slugs to their connected realm IDs and names
 realm_map = {}
 
@@ -346,6 +1044,26 @@ class ScanConfig:
         self.realm = profile_data.get("realm", None)
 
 
+SCAN_CONFIG_REQUIRED_KEYS = (
+    "MIN_ILVL", "MAX_ILVL", "MAX_BUYOUT",
+    "ALLOWED_ARMOR_SLOTS", "ALLOWED_WEAPON_SLOTS", "ALLOWED_ACCESSORY_SLOTS",
+    "ALLOWED_ARMOR_TYPES", "ALLOWED_WEAPON_TYPES"
+)
+
+
+def scan_config_from_dict(config):
+    """
+    Build a ScanConfig from a scan_config.json-style dict (as written by the web UI).
+
+    Raises:
+        ValueError: If a required key is missing.
+    """
+    missing = [k for k in SCAN_CONFIG_REQUIRED_KEYS if k not in config]
+    if missing:
+        raise ValueError(f"Missing required keys: {missing}")
+    return ScanConfig(config)
+
+
 def parse_filter_types(filter_list):
     """Separates normal and max-stat filters."""
     normal_filters = []
@@ -367,103 +1085,303 @@ def get_scan_config(profile_name):
 
 
 # === BONUS ID SYSTEM ===
-def fetch_raidbots_data(force_refresh=False):
+class RaidbotsDatasets(Mapping):
     """
-    Download or load multiple Raidbots JSON data files including bonuses, items, and metadata.
+    Read-only mapping of Raidbots dataset name -> parsed JSON, parsed on first access.
 
-    Args:
-        force_refresh (bool): When True, ignores cache and fetches fresh data.
+    A file is read from its pickled snapshot in RAIDBOTS_SNAPSHOT_DIR when the snapshot was
+    taken from the same dataset version (metadata.json wowBuild + contentHash) and the same
+    file mtime and size. Otherwise the JSON is parsed and the snapshot rewritten. Missing or
+    unreadable files load as empty dicts. Safe to share between worker threads.
+    """
+
+    def __init__(self, names, data_dir=None, snapshot_dir=RAIDBOTS_SNAPSHOT_DIR, preloaded=None):
+        self.names = list(names)
+        self.data_dir = data_dir or os.path.dirname(BONUS_DATA_FILE)
+        self.snapshot_dir = snapshot_dir
+        self.loaded = dict(preloaded or {})
+        self.lock = threading.Lock()
+        self._version = None
+
+    @property
+    def version(self):
+        """Dataset version from metadata.json ('unknown' if it cannot be read)."""
+        if self._version is None:
+            try:
+                self._version = dataset_version(load_json_file(os.path.join(self.data_dir, "metadata.json")))
+            except (OSError, ValueError):
+                self._version = 'unknown'
+        return self._version
+
+    def __getitem__(self, name):
+        if name not in self.names:
+            raise KeyError(name)
+        with self.lock:
+            if name not in self.loaded:
+                self.loaded[name] = self._load(name)
+            return self.loaded[name]
+
+    def __contains__(self, name):
+        # Membership must not trigger a parse (Mapping's default goes through __getitem__)
+        return name in self.names
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def is_loaded(self, name):
+        """True once a dataset has been parsed (or restored from its snapshot)."""
+        return name in self.loaded
+
+    def _load(self, name):
+        path = os.path.join(self.data_dir, f"{name}.json")
+        try:
+            st = os.stat(path)
+        except OSError:
+            logging.warning(f"⚠️ Raidbots dataset {name}.json not found")
+            return {}
+        key = (RAIDBOTS_SNAPSHOT_FORMAT, self.version, st.st_mtime_ns, st.st_size)
+        snapshot_path = os.path.join(self.snapshot_dir, f"{name}.pickle")
+
+        if os.path.exists(snapshot_path):
+            try:
+                with open(snapshot_path, 'rb') as f:
+                    # The key is pickled ahead of the data so a stale snapshot is rejected unread
+                    if pickle.load(f) == key:
+                        return pickle.load(f)
+            except Exception as e:
+                logging.debug(f"Ignoring unreadable Raidbots snapshot {snapshot_path}: {e}")
+
+        try:
+            data = load_json_file(path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠️ Failed to load cached {name}.json: {e}")
+            return {}
+        self._write_snapshot(snapshot_path, key, data)
+        return data
+
+    def _write_snapshot(self, snapshot_path, key, data):
+        tmp_path = f"{snapshot_path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, snapshot_path)
+        except OSError as e:
+            logging.warning(f"⚠️ Failed to write Raidbots snapshot {snapshot_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def dataset_version(metadata):
+    """Raidbots dataset version string (wowBuild + contentHash) from a parsed metadata.json."""
+    return f"{metadata.get('wowBuild')}:{metadata.get('contentHash')}"
+
+
+def load_raidbots_manifest(filename=RAIDBOTS_MANIFEST):
+    """
+    Load the record of the last Raidbots refresh.
 
     Returns:
-        dict: Mapping of each file key to its loaded JSON content.
+        dict: {'version', 'checked_at', 'etags': {name: etag}, 'unavailable': [names]}.
     """
-    logging.info("🔄 Loading Raidbots datasets...")
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    # List of Raidbots .json files to retrieve
-    filenames = [
-        "metadata",
-        "bonuses",
-        "equippable-items",
-        "equippable-items-full",
-        "item-names",
-        "talents",
-        "instances",
-        "enchantments",
-        "crafting",
-        "item-curves",
-        "item-conversions",
-        "item-sets",
-        "item-limit-categories",
-        "level-selector-sequences",
-        "bonus-crafted-stats",
-        "bonus-effects",
-        "bonus-id-base-levels",
-        "bonus-id-levels",
-        "bonus-level-deltas",
-        "bonus-sockets",
-        "bonus-upgrade-sets"
-    ]
 
-    base_url = "https://www.raidbots.com/static/data/live"
-    local_data = {}
-    modified = False
+def write_json_atomic(path, data):
+    """Write JSON compactly to a temporary file and rename it over `path`."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def invalidate_raidbots_caches():
+    """Delete every cache derived from the Raidbots datasets after the dataset version changes."""
+    global auction_snapshot_cache
+    for path in RAIDBOTS_DERIVED_CACHES:
+        if os.path.isdir(path):
+            for name in os.listdir(path):
+                os.remove(os.path.join(path, name))
+        elif os.path.exists(path):
+            os.remove(path)
+    # Stored realm results were evaluated against the old bonus data
+    with snapshot_cache_lock:
+        auction_snapshot_cache = None
+    logging.info("🧹 Cleared caches derived from the previous Raidbots dataset version")
+
+
+def download_raidbots_file(session, name, etag=None, save=True):
+    """
+    Conditionally download one Raidbots file and, if it changed, write it compactly to disk.
 
-    # Determine if we need to refresh any file
-    for name in filenames:
-        local_path = os.path.join(os.path.dirname(BONUS_DATA_FILE), f"{name}.json")
+    Args:
+        session (requests.Session): HTTP session.
+        name (str): Dataset name without the .json extension.
+        etag (str, optional): ETag of the local copy, sent as If-None-Match.
+        save (bool): When False, only return the parsed data (used for metadata.json, which is
+            written last so the local version only advances once every file is in place).
 
-        if not os.path.exists(local_path):
-            logging.info(f"🆕 Missing: {name}.json")
-            modified = True
-            break
+    Returns:
+        tuple: (status code (200, 304 or 404), parsed data or None if unchanged or missing,
+        new ETag or None).
+    """
+    headers = {'If-None-Match': etag} if etag else None
+    resp = session.get(f"{RAIDBOTS_BASE_URL}/{name}.json", headers=headers, timeout=REQUEST_TIMEOUT)
+    if resp.status_code == 304:
+        return 304, None, etag
+    if resp.status_code == 404:
+        return 404, None, None
+    resp.raise_for_status()
+    data = decode_json(resp.content)  # Never replace the last good copy with a body that doesn't parse
+    if save:
+        write_json_atomic(os.path.join(os.path.dirname(BONUS_DATA_FILE), f"{name}.json"), data)
+    return 200, data, resp.headers.get('ETag')
 
-        file_age = time.time() - os.path.getmtime(local_path)
-        if file_age > 30 * 86400:
-            logging.info(f"♻️  Refreshing {name}.json (older than 30 days)")
-            modified = True
-            break
 
-    if not force_refresh and not modified:
-        try:
-            for name in filenames:
-                path = os.path.join(os.path.dirname(BONUS_DATA_FILE), f"{name}.json")
-                with open(path, 'r', encoding='utf-8') as f:
-                    local_data[name] = json.load(f)
-            return local_data
-        except Exception as e:
-            logging.warning(f"⚠️ Failed to load cached Raidbots data: {e}")
-            force_refresh = True
+def fetch_raidbots_data(force_refresh=False, offline=False):
+    """
+    Refresh and load the Raidbots JSON data files including bonuses, items, and metadata.
 
-    # Fetch and cache all files
-    for name in filenames:
-        try:
-            url = f"{base_url}/{name}.json"
-            response = requests.get(url)
-            response.raise_for_status()
-            local_data[name] = response.json()
-            # Save to disk
-            path = os.path.join(os.path.dirname(BONUS_DATA_FILE), f"{name}.json")
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(local_data[name], f, indent=2)
-            logging.info(f"✅ Downloaded and cached: {name}.json")
-        except Exception as e:
-            logging.warning(f"⚠️ Failed to fetch {name}.json: {e}")
-            local_data[name] = {}
+    At most once every RAIDBOTS_CHECK_INTERVAL_HOURS (or whenever a file is missing) the
+    remote metadata.json is compared with the local one. Files are then fetched in parallel
+    with If-None-Match, so only missing or changed files are transferred. When Raidbots is
+    unreachable the last downloaded copies are used.
 
-    return local_data
+    Args:
+        force_refresh (bool): When True, skips the check interval and ignores stored ETags.
+        offline (bool): Only load files already on disk; missing files load as empty dicts.
 
+    Returns:
+        RaidbotsDatasets: Mapping of each file key to its JSON content, parsed on first access.
+    """
+    import requests
+    logging.info("🔄 Loading Raidbots datasets...")
+    if offline:
+        return RaidbotsDatasets(RAIDBOTS_DATASETS)
 
-def parse_ilevel_string(ilevel_str, player_level):
+    data_dir = os.path.dirname(BONUS_DATA_FILE)
+    local_meta_path = os.path.join(data_dir, "metadata.json")
+    try:
+        local_version = dataset_version(load_json_file(local_meta_path))
+    except (OSError, ValueError):
+        local_version = None
+
+    manifest = load_raidbots_manifest()
+    unavailable = set(manifest.get('unavailable', [])) if manifest.get('version') == local_version else set()
+    missing = [name for name in RAIDBOTS_DATASETS
+               if name not in unavailable and not os.path.exists(os.path.join(data_dir, f"{name}.json"))]
+    checked_recently = time.time() - manifest.get('checked_at', 0) < RAIDBOTS_CHECK_INTERVAL_HOURS * 3600
+    if not force_refresh and checked_recently and not missing:
+        return RaidbotsDatasets(RAIDBOTS_DATASETS)
+
+    etags = {} if force_refresh else dict(manifest.get('etags', {}))
+    if local_version is None:
+        etags.pop('metadata', None)
+    session = create_session({}, pool_size=RAIDBOTS_DOWNLOAD_WORKERS)
+    try:
+        status, remote_meta, meta_etag = download_raidbots_file(session, 'metadata', etags.get('metadata'), save=False)
+    except (requests.RequestException, ValueError) as e:
+        logging.warning(f"⚠️ Raidbots unreachable ({e}); using the last downloaded datasets")
+        return RaidbotsDatasets(RAIDBOTS_DATASETS)
+
+    if status == 304:
+        remote_meta = load_json_file(local_meta_path)
+    remote_version = dataset_version(remote_meta)
+    published = {f[:-len('.json')] for f in remote_meta.get('files', []) if f.endswith('.json')}
+    unavailable = [name for name in RAIDBOTS_DATASETS if name != 'metadata' and name not in published]
+    version_changed = remote_version != local_version
+
+    if version_changed or force_refresh:
+        logging.info(f"♻️  Raidbots dataset {local_version} -> {remote_version}; checking every file")
+        targets = [name for name in RAIDBOTS_DATASETS if name in published]
+    else:
+        targets = [name for name in missing if name in published]
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=RAIDBOTS_DOWNLOAD_WORKERS, thread_name_prefix='raidbots') as executor:
+        futures = {executor.submit(download_raidbots_file, session, name, etags.get(name)): name for name in targets}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                file_status, _, etag = future.result()
+            except Exception as e:
+                logging.warning(f"⚠️ Failed to fetch {name}.json: {e}")
+                failed.append(name)
+                continue
+            if file_status == 404:
+                # Listed but not served: don't retry until the dataset version changes
+                logging.info(f"❔ {name}.json is not available from Raidbots")
+                unavailable.append(name)
+                continue
+            if etag:
+                etags[name] = etag
+            if file_status == 200:
+                logging.info(f"✅ Downloaded and cached: {name}.json")
+            else:
+                logging.debug(f"{name}.json unchanged (304)")
+
+    if meta_etag and not version_changed:
+        etags['metadata'] = meta_etag
+    if version_changed and not failed:
+        # metadata.json goes last: the local version only advances once the whole dataset is in place
+        write_json_atomic(local_meta_path, remote_meta)
+        if meta_etag:
+            etags['metadata'] = meta_etag
+        invalidate_raidbots_caches()
+        local_version = remote_version
+    elif failed:
+        logging.warning(f"⚠️ {len(failed)} Raidbots file(s) failed to download; keeping the last good copies")
+
+    write_json_atomic(RAIDBOTS_MANIFEST, {
+        'version': local_version,
+        'checked_at': time.time() if not failed else manifest.get('checked_at', 0),
+        'etags': etags,
+        'unavailable': sorted(unavailable),
+    })
+    return RaidbotsDatasets(RAIDBOTS_DATASETS)
+
+
+def parse_ilevel_range(ilevel_str):
     """
-    Convert a string like '5 @plvl 1 - 357 @plvl 357' into an estimated ilvl using linear interpolation.
+    Parse a string like '5 @plvl 1 - 357 @plvl 357'.
+
+    Returns:
+        tuple: (ilvl_low, plvl_low, ilvl_high, plvl_high), or None if the format is unexpected.
     """
     pattern = r"(\d+)\s+@plvl\s+(\d+)\s*-\s*(\d+)\s+@plvl\s+(\d+)"
     match = re.match(pattern, ilevel_str)
     if not match:
         logging.warning(f"⚠️ Unexpected ilevel string format: '{ilevel_str}'")
+        return None
+    return tuple(map(int, match.groups()))
+
+
+def parse_ilevel_string(ilevel_str, player_level):
+    """
+    Convert a string like '5 @plvl 1 - 357 @plvl 357' into an estimated ilvl using linear interpolation.
+    """
+    return interpolate_ilevel(parse_ilevel_range(ilevel_str), player_level)
+
+
+def interpolate_ilevel(ilevel_range, player_level):
+    """Estimate the ilvl at player_level from a parsed ilevel range (0 if there is none)."""
+    if not ilevel_range:
         return 0
 
-    ilvl_low, plvl_low, ilvl_high, plvl_high = map(int, match.groups())
+    ilvl_low, plvl_low, ilvl_high, plvl_high = ilevel_range
 
     if player_level <= plvl_low:
         return ilvl_low
@@ -485,15 +1403,14 @@ def infer_ilvl_from_bonus_ids(base_ilvl, bonus_ids, raidbots_data, fallback_data
             if mod.get("type") == 9 and isinstance(mod.get("value"), int):
                 effective_player_level = mod["value"]
 
+    index = get_bonus_index(raidbots_data, fallback_data)
     for b in bonus_ids:
-        bid = str(b)
-        bonus = raidbots_data.get(bid) or fallback_data.get(bid)
-        if not bonus:
-            continue
-        if 'level' in bonus:
-            total_bonus += bonus['level']
-        elif 'ilevel' in bonus:
-            scaled = parse_ilevel_string(bonus['ilevel'], effective_player_level)
+        entry = index.get(b)
+        level = entry.level if entry is not None and entry.level is not None else BONUS_ID_LEVELS.get(b)
+        if level is not None:
+            total_bonus += level
+        elif entry is not None and entry.ilevel is not None:
+            scaled = interpolate_ilevel(entry.ilevel, effective_player_level)
             highest_scaled_ilvl = max(highest_scaled_ilvl, scaled)
 
     return highest_scaled_ilvl or (base_ilvl + total_bonus)
@@ -508,125 +1425,603 @@ def infer_player_level_from_ilvl(observed_ilvl, curve_points):
     return closest["playerLevel"], closest["itemLevel"]
 
 
-# === AUTHENTICATION AND TOKEN MANAGEMENT ===
-def load_cached_token():
-    """
-    Load a previously saved OAuth token and its expiry time.
+def walk_curve(curve_points, player_level):
+    """Legacy scaling: the itemLevel of the last point reached before one exceeds player_level (None if none)."""
+    final_ilvl = None
+    for pt in curve_points:
+        if pt["playerLevel"] <= player_level:
+            final_ilvl = pt["itemLevel"]
+        else:
+            break
+    return final_ilvl
 
-    Returns:
-        tuple: (access_token (str) or None, expires_at (int timestamp)).
-    """
-    if not os.path.isfile(TOKEN_CACHE):
-        return None, 0
-    try:
-        with open(TOKEN_CACHE, 'r') as f:
-            data = json.load(f)
-        return data.get('access_token'), data.get('expires_at', 0)
-    except Exception:
-        return None, 0
 
+# === ITEM LEVEL TABLES ===
+# Dense per-curve lookups that replace the scans over curve points, built the first time a curve is
+# used, plus per-bonus ilvl deltas and upgrade tracks from their dedicated Raidbots tables.
+NO_LEVEL = -1  # Empty slot of a dense CurveTable column
+# One step of an upgrade track (bonus-upgrade-sets.json) and the itemLevel at the track's last step
+UpgradeStep = namedtuple('UpgradeStep', ['group', 'level', 'max_level', 'item_level', 'max_item_level'])
 
-def save_token(token: str, expires_in: int):
+# Filled by refresh_ilvl_tables() when the datasets load: bonus ID -> ilvl delta, bonus ID -> UpgradeStep
+BONUS_ID_LEVELS = {}
+UPGRADE_TRACKS = {}
+
+# id(curve_data) -> (curve_data, {curve ID (str): CurveTable, or None if the points are unusable})
+curve_table_memo = {}
+
+
+class CurveTable:
     """
-    Save a fresh OAuth token to disk with its calculated expiry.
+    Dense lookups over one item curve, exact equivalents of walk_curve() and
+    infer_player_level_from_ilvl() for int levels.
 
-    Args:
-        token (str): OAuth access token.
-        expires_in (int): Seconds until the token expires.
+    legacy[p]         : walk_curve() result at player level p (NO_LEVEL when no point is reached);
+                        levels past the end read the last slot
+    nearest[i - low]  : index of the point infer_player_level_from_ilvl() picks for observed ilvl i;
+                        ilvls outside low..high read the nearest end
     """
-    expires_at = int(time.time()) + expires_in
-    with open(TOKEN_CACHE, 'w', encoding='utf-8') as f:
-        json.dump({'access_token': token, 'expires_at': expires_at}, f)
-    logging.info("✅ Cached new token (expires in %ds)", expires_in)
+    __slots__ = ('points', 'legacy', 'low', 'nearest')
+
+    def __init__(self, points):
+        if not points or not all(type(pt["playerLevel"]) is int and type(pt["itemLevel"]) is int for pt in points):
+            raise ValueError("curve points must be non-empty with int playerLevel/itemLevel")
+        self.points = points
+
+        # The walk stops at the first point above the player level, so it reaches point i
+        # exactly when the running maximum of playerLevel up to i is <= the player level
+        reach, running_max = [], None
+        for pt in points:
+            running_max = pt["playerLevel"] if running_max is None else max(running_max, pt["playerLevel"])
+            reach.append(running_max)
+        self.legacy = array('i')
+        i = 0
+        for player_level in range(max(reach[-1], -1) + 1):
+            while i < len(points) and reach[i] <= player_level:
+                i += 1
+            self.legacy.append(points[i - 1]["itemLevel"] if i else NO_LEVEL)
+
+        # min() keeps the first of equally close points: the lower or upper neighbouring
+        # itemLevel, whichever appears earlier in the list
+        first = {}
+        for idx, pt in enumerate(points):
+            first.setdefault(pt["itemLevel"], idx)
+        levels = sorted(first)
+        self.low = levels[0]
+        self.nearest = array('i')
+        j = 0
+        for ilvl in range(levels[0], levels[-1] + 1):
+            while j + 1 < len(levels) and levels[j + 1] <= ilvl:
+                j += 1
+            lower = levels[j]
+            if lower == ilvl:
+                self.nearest.append(first[lower])
+                continue
+            upper = levels[j + 1]
+            if ilvl - lower == upper - ilvl:
+                self.nearest.append(min(first[lower], first[upper]))
+            else:
+                self.nearest.append(first[lower] if ilvl - lower < upper - ilvl else first[upper])
 
+    def legacy_ilvl(self, player_level):
+        """walk_curve() as a table lookup."""
+        if type(player_level) is not int or player_level < 0 or not self.legacy:
+            return walk_curve(self.points, player_level)
+        level = self.legacy[min(player_level, len(self.legacy) - 1)]
+        return None if level == NO_LEVEL else level
 
-def get_token() -> str:
+    def nearest_point(self, observed_ilvl):
+        """infer_player_level_from_ilvl() as a table lookup."""
+        if type(observed_ilvl) is not int:
+            return infer_player_level_from_ilvl(observed_ilvl, self.points)
+        pt = self.points[self.nearest[min(max(observed_ilvl - self.low, 0), len(self.nearest) - 1)]]
+        return pt["playerLevel"], pt["itemLevel"]
+
+
+def get_curve_table(curve_data, curve_id):
     """
-    Retrieve a valid OAuth token, reusing cache or requesting a new one.
+    The CurveTable of a curve ID (int or str), built on first use.
 
     Returns:
-        str: A valid OAuth Bearer token.
-
-    Raises:
-        HTTPError: If the request to Blizzard's token URL fails.
+        CurveTable: or None when the curve is missing or its points are not plain ints
+        (callers then scan the points as before).
     """
-    token, expires_at = load_cached_token()
-    now = int(time.time())
-    # Reuse cached token if still valid for at least 60 seconds
-    if token and now < (expires_at - 60):
-        logging.info("✅ Reusing cached token (valid for %ds)", expires_at - now)
-        return token
-    # Otherwise request a new token via client_credentials grant
-    url = 'https://oauth.battle.net/token'
-    data = {'grant_type': 'client_credentials'}
-    resp = requests.post(url, data=data, auth=(CLIENT_ID, CLIENT_SECRET))
-    resp.raise_for_status()
-    j = resp.json()
-    token = j['access_token']
-    expires_in = j.get('expires_in', 86399)
-    save_token(token, expires_in)
-    return token
+    memo = curve_table_memo.get(id(curve_data))
+    if memo is None or memo[0] is not curve_data:
+        memo = curve_table_memo[id(curve_data)] = (curve_data, {})
+    tables = memo[1]
+    key = str(curve_id)
+    if key in tables:
+        return tables[key]
+    try:
+        table = CurveTable(curve_data.get(key, {}).get("points", []))
+    except (AttributeError, KeyError, TypeError, ValueError):
+        table = None
+    tables[key] = table
+    return table
 
 
-def request_with_retry(session, method, url, params=None, retries=3):
-    """
-    Perform an HTTP request with retry logic and dynamic rate-limiting.
+def curve_legacy_ilvl(curve_data, curve_id, player_level):
+    """walk_curve() over a curve by ID, through its CurveTable when it has one."""
+    table = get_curve_table(curve_data, curve_id)
+    if table is not None:
+        return table.legacy_ilvl(player_level)
+    return walk_curve(curve_data.get(str(curve_id), {}).get("points", []), player_level)
 
-    Throttles global request rate to stay below MAX_REQUESTS_PER_SEC.
 
-    Args:
-        session (requests.Session): HTTP session with headers set.
-        method (str): HTTP method ('GET', 'POST', etc.).
-        url (str): Full request URL.
-        params (dict, optional): Query parameters.
-        retries (int): Number of retry attempts on failure.
+def curve_nearest_point(curve_data, curve_id, observed_ilvl):
+    """infer_player_level_from_ilvl() over a curve by ID, through its CurveTable when it has one."""
+    table = get_curve_table(curve_data, curve_id)
+    if table is not None:
+        return table.nearest_point(observed_ilvl)
+    return infer_player_level_from_ilvl(observed_ilvl, curve_data.get(str(curve_id), {}).get("points", []))
 
-    Returns:
-        dict: Parsed JSON response.
 
-    Raises:
-        RuntimeError: If unauthorized or retries are exhausted.
+def build_bonus_id_levels(level_data=None, delta_data=None):
     """
-    # === Throttle to max 3.5 requests/sec ===
-    now = time.time()
-    if throttle_tracker['start_time'] is None:
-        throttle_tracker['start_time'] = now
-        throttle_tracker['request_count'] = 0
-
-    throttle_tracker['request_count'] += 1
-    debug_stats['blizzard_requests'] += 1
-    elapsed = now - throttle_tracker['start_time']
-    actual_rps = throttle_tracker['request_count'] / elapsed if elapsed > 0 else 0
-    
-    if PRINT_FULL_METADATA:
-        print(f"[Throttle] Requests: {throttle_tracker['request_count']}, Elapsed: {elapsed:.2f}s, RPS: {actual_rps:.2f}")
+    bonus ID -> ilvl delta from bonus-id-levels.json (bonus ID -> delta) and
+    bonus-level-deltas.json (delta -> bonus ID); the former wins on conflicts.
+    """
+    levels = {}
+    for delta, bid in (delta_data or {}).items():
+        try:
+            levels[int(bid)] = int(delta)
+        except (TypeError, ValueError):
+            continue
+    for bid, delta in (level_data or {}).items():
+        try:
+            levels[int(bid)] = int(delta)
+        except (TypeError, ValueError):
+            continue
+    return levels
+
+
+def build_upgrade_tracks(upgrade_sets=None):
+    """bonus ID -> UpgradeStep for every step of every track in bonus-upgrade-sets.json."""
+    tracks = {}
+    for steps in (upgrade_sets or {}).values():
+        if not isinstance(steps, list):
+            continue
+        steps = [st for st in steps if isinstance(st, dict) and isinstance(st.get('itemLevel'), int)]
+        if not steps:
+            continue
+        top = max(steps, key=lambda st: st.get('level', 0))
+        for st in steps:
+            if isinstance(st.get('bonusId'), int):
+                tracks[st['bonusId']] = UpgradeStep(
+                    st.get('group'), st.get('level'), st.get('max'), st['itemLevel'], top['itemLevel'])
+    return tracks
+
+
+def refresh_ilvl_tables(level_data=None, delta_data=None, upgrade_sets=None):
+    """Rebuild BONUS_ID_LEVELS and UPGRADE_TRACKS from the Raidbots tables (called by load_scan_datasets)."""
+    global BONUS_ID_LEVELS, UPGRADE_TRACKS
+    BONUS_ID_LEVELS = build_bonus_id_levels(level_data, delta_data)
+    UPGRADE_TRACKS = build_upgrade_tracks(upgrade_sets)
+
+
+def upgrade_max_ilvl(bonus_ids, final_ilvl):
+    """The ilvl an item reaches at the end of its upgrade track (final_ilvl if it has no track)."""
+    for b in bonus_ids:
+        step = UPGRADE_TRACKS.get(b)
+        if step is not None:
+            return max(step.max_item_level, final_ilvl)
+    return final_ilvl
+
+
+# === BONUS ID INDEX ===
+# One pre-parsed row per bonus ID in bonuses.json, so per-auction checks never touch the raw strings.
+#   stats         : ((stat_str, short_stat, pct), ...) e.g. ('71% Crit', 'Crit', 71), for filter_stat_bonuses()
+#   display_parts : cleaned stat strings, Haste first, when the bonus shows a secondary stat
+#   max_stats     : stats at 71% (Max-{Stat} filters)
+#   in_stat_lists : bonus ID is in HASTE_IDS/CRIT_IDS/VERS_IDS/MASTERY_IDS or has a secondary rawStat
+#   filters       : filter types the bonus satisfies by its own data (FILTER_STAT_IDS rawStats, socket flag)
+#   ilevel        : parsed 'ilevel' range (only consulted when 'level' is absent)
+#   primary       : row came from raidbots_data itself rather than fallback_data
+BonusInfo = namedtuple('BonusInfo', [
+    'stats', 'display_parts', 'max_stats', 'in_stat_lists', 'filters',
+    'curve_id', 'level', 'ilevel', 'primary',
+])
+
+# (id(raidbots_data), id(fallback_data)) -> (raidbots_data, fallback_data, index)
+bonus_index_memo = {}
+bonus_index_lock = threading.Lock()
+
+
+def compile_bonus(bid, bonus, primary=True):
+    """Pre-parse one bonuses.json entry into a BonusInfo row."""
+    stats, display_parts, max_stats = [], (), set()
+    stat_string = bonus.get('stats')
+    if stat_string is not None:
+        parts = [p.strip().split(" [")[0] for p in stat_string.split(",")]
+        for stat in parts:
+            if stat.startswith("71% "):
+                max_stats.add(stat[4:])
+            if "%" not in stat:
+                continue
+            try:
+                pct_val = int(stat.split("%")[0])
+            except ValueError:
+                continue
+            stat_name_full = stat.split("%")[1].strip()
+            stats.append((stat, STAT_NAME_MAP.get(stat_name_full, stat_name_full), pct_val))
+        if any(stat_name in stat_string for stat_name in ("Haste", "Crit", "Vers", "Mastery")):
+            display_parts = tuple(sorted(parts, key=lambda s: 0 if "Haste" in s else 1))
+
+    ilevel = None
+    if 'level' not in bonus and 'ilevel' in bonus:
+        ilevel = parse_ilevel_range(bonus['ilevel'])
+
+    raw_stat_ids = set()
+    raw_stats = bonus.get('rawStats')
+    if isinstance(raw_stats, list):
+        raw_stat_ids = {s.get('stat') for s in raw_stats if isinstance(s, dict)}
+    filters = {name for name, stat_ids in FILTER_STAT_IDS.items() if not stat_ids.isdisjoint(raw_stat_ids)}
+    if bonus.get('socket'):
+        filters.add(SOCKET_FILTER)
+
+    return BonusInfo(
+        stats=tuple(stats),
+        display_parts=display_parts,
+        max_stats=frozenset(max_stats),
+        in_stat_lists=bid in ALL_STAT_IDS or not filters.isdisjoint(SECONDARY_FILTERS),
+        filters=frozenset(filters),
+        curve_id=bonus.get('curveId'),
+        level=bonus.get('level'),
+        ilevel=ilevel,
+        primary=primary,
+    )
+
+
+def build_bonus_index(raidbots_data, fallback_data):
+    """
+    Compile every bonus in raidbots_data/fallback_data (raidbots_data wins) into BonusInfo rows.
+
+    Returns:
+        dict: bonus ID (int) -> BonusInfo.
+    """
+    index = {}
+    keys = raidbots_data.keys() if fallback_data is raidbots_data else set(raidbots_data) | set(fallback_data)
+    for key in keys:
+        bonus = raidbots_data.get(key) or fallback_data.get(key)
+        if not bonus:
+            continue
+        try:
+            bid = int(key)
+        except ValueError:
+            continue
+        index[bid] = compile_bonus(bid, bonus, primary=bool(raidbots_data.get(key)))
+    return index
+
+
+def bonus_index_cache_key(raidbots_data, fallback_data):
+    """Identifies the inputs of a cached index: bonuses.json on disk plus the hand-maintained ID lists."""
+    st = os.stat(os.path.join(os.path.dirname(BONUS_DATA_FILE), "bonuses.json"))
+    id_lists = repr((sorted(set(HASTE_IDS + CRIT_IDS + VERS_IDS + MASTERY_IDS)), sorted((k, sorted(v)) for k, v in FILTER_STAT_IDS.items()))).encode('utf-8')
+    return (BONUS_INDEX_FORMAT, st.st_mtime_ns, st.st_size, len(raidbots_data),
+            fallback_data is raidbots_data, hashlib.sha1(id_lists).hexdigest())
+
+
+def load_bonus_index(raidbots_data, fallback_data, filename=BONUS_INDEX_CACHE):
+    """
+    Load the compiled index from disk, rebuilding and saving it when bonuses.json or the ID lists changed.
+
+    Only for data that was loaded from RaidBots_APIs/bonuses.json; the cache key is taken from that file.
+    """
+    try:
+        key = bonus_index_cache_key(raidbots_data, fallback_data)
+    except OSError:
+        return build_bonus_index(raidbots_data, fallback_data)
+
+    if os.path.exists(filename):
+        try:
+            with open(filename, 'rb') as f:
+                if pickle.load(f) == key:
+                    # Rows are stored as plain tuples so the file doesn't depend on the module name
+                    return {bid: BonusInfo._make(row) for bid, row in pickle.load(f).items()}
+        except Exception as e:
+            logging.debug(f"Ignoring unreadable bonus index {filename}: {e}")
+
+    index = build_bonus_index(raidbots_data, fallback_data)
+    tmp_path = f"{filename}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump({bid: tuple(row) for bid, row in index.items()}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, filename)
+    except OSError as e:
+        logging.warning(f"⚠️ Failed to write bonus index cache: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return index
+
+
+def get_bonus_index(raidbots_data, fallback_data=None, use_disk_cache=False):
+    """
+    Return the compiled bonus index for these data objects, building it once per object pair.
+
+    Args:
+        raidbots_data (dict): Raidbots bonuses.
+        fallback_data (dict, optional): Fallback bonuses; defaults to raidbots_data.
+        use_disk_cache (bool): Load/save the index via BONUS_INDEX_CACHE (set by load_scan_datasets).
+
+    Returns:
+        dict: bonus ID (int) -> BonusInfo.
+    """
+    if fallback_data is None:
+        fallback_data = raidbots_data
+    memo = bonus_index_memo.get((id(raidbots_data), id(fallback_data)))
+    if memo is not None and memo[0] is raidbots_data and memo[1] is fallback_data:
+        return memo[2]
+
+    with bonus_index_lock:
+        memo = bonus_index_memo.get((id(raidbots_data), id(fallback_data)))
+        if memo is not None and memo[0] is raidbots_data and memo[1] is fallback_data:
+            return memo[2]
+        if use_disk_cache:
+            index = load_bonus_index(raidbots_data, fallback_data)
+        else:
+            index = build_bonus_index(raidbots_data, fallback_data)
+        bonus_index_memo[(id(raidbots_data), id(fallback_data))] = (raidbots_data, fallback_data, index)
+        return index
+
+
+def build_filter_id_sets(index, socket_data=None):
+    """
+    Bonus ID sets for every filter type: the hand-maintained FILTER_ID_MAP lists unioned with the
+    IDs derived from the compiled bonus index and bonus-sockets.json.
+
+    Args:
+        index (dict): Output of get_bonus_index().
+        socket_data (dict, optional): bonus-sockets.json (bonus ID -> socket count).
+
+    Returns:
+        dict: filter type -> frozenset of bonus IDs.
+    """
+    sets = {name: set(ids) for name, ids in FILTER_ID_MAP.items()}
+    for name in [*FILTER_STAT_IDS, SOCKET_FILTER]:
+        sets.setdefault(name, set())
+    for bid, entry in index.items():
+        for name in entry.filters:
+            sets[name].add(bid)
+    for key in socket_data or {}:
+        try:
+            sets[SOCKET_FILTER].add(int(key))
+        except ValueError:
+            continue
+    return {name: frozenset(ids) for name, ids in sets.items()}
+
+
+def refresh_filter_id_sets(index, socket_data=None):
+    """Replace FILTER_ID_SETS, ALL_STAT_IDS and STAT_ID_SOURCES with the sets derived from loaded data."""
+    global ALL_STAT_IDS, STAT_ID_SOURCES
+    FILTER_ID_SETS.update(build_filter_id_sets(index, socket_data))
+    stat_lists = {f"{name.upper()}_IDS": FILTER_ID_SETS[name] for name in SECONDARY_FILTERS}
+    ALL_STAT_IDS = frozenset().union(*stat_lists.values())
+    STAT_ID_SOURCES = {bid: [name for name, ids in stat_lists.items() if bid in ids] for bid in ALL_STAT_IDS}
+
+
+# === AUTHENTICATION AND TOKEN MANAGEMENT ===
+def load_cached_token():
+    """
+    Load a previously saved OAuth token and its expiry time.
+
+    Tokens issued by a different TOKEN_URL (e.g. a local mock server) are ignored.
+
+    Returns:
+        tuple: (access_token (str) or None, expires_at (int timestamp)).
+    """
+    if not os.path.isfile(TOKEN_CACHE):
+        return None, 0
+    try:
+        with open(TOKEN_CACHE, 'r') as f:
+            data = json.load(f)
+        if data.get('token_url', 'https://oauth.battle.net/token') != TOKEN_URL:
+            return None, 0
+        return data.get('access_token'), data.get('expires_at', 0)
+    except Exception:
+        return None, 0
+
+
+def save_token(token: str, expires_in: int):
+    """
+    Save a fresh OAuth token to disk with its calculated expiry.
+
+    Args:
+        token (str): OAuth access token.
+        expires_in (int): Seconds until the token expires.
+    """
+    expires_at = int(time.time()) + expires_in
+    with open(TOKEN_CACHE, 'w', encoding='utf-8') as f:
+        json.dump({'access_token': token, 'expires_at': expires_at, 'token_url': TOKEN_URL}, f)
+    logging.info("✅ Cached new token (expires in %ds)", expires_in)
+
+
+def get_token() -> str:
+    """
+    Retrieve a valid OAuth token, reusing cache or requesting a new one.
+
+    Returns:
+        str: A valid OAuth Bearer token.
+
+    Raises:
+        HTTPError: If the request to Blizzard's token URL fails.
+    """
+    import requests
+    token, expires_at = load_cached_token()
+    now = int(time.time())
+    # Reuse cached token if still valid for at least 60 seconds
+    if token and now < (expires_at - 60):
+        logging.info("✅ Reusing cached token (valid for %ds)", expires_at - now)
+        return token
+    # Otherwise request a new token via client_credentials grant
+    data = {'grant_type': 'client_credentials'}
+    resp = requests.post(TOKEN_URL, data=data, auth=(CLIENT_ID, CLIENT_SECRET), timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    j = resp.json()
+    token = j['access_token']
+    expires_in = j.get('expires_in', 86399)
+    save_token(token, expires_in)
+    return token
+
+
+# === RATE LIMITING ===
+class TokenBucketRateLimiter:
+    """
+    Token-bucket limiter shared by every Blizzard API caller.
+
+    Holds one bucket per quota (per-second and per-hour). A request needs a token from
+    every bucket; buckets refill continuously at capacity / period. Permits are computed
+    under a lock, but callers sleep outside it.
+    """
+
+    def __init__(self, per_second, per_hour, clock=time.monotonic):
+        self.clock = clock
+        self.lock = threading.Lock()
+        now = clock()
+        # name -> [capacity, refill per second, tokens available]
+        self.buckets = {
+            'second': [float(per_second), float(per_second), float(per_second)],
+            'hour': [float(per_hour), per_hour / 3600.0, float(per_hour)],
+        }
+        self.last_refill = now
+        self.paused_until = now
+        self.total_wait = 0.0
+        self.permits_granted = 0
+
+    def _refill(self, now):
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            for bucket in self.buckets.values():
+                bucket[2] = min(bucket[0], bucket[2] + elapsed * bucket[1])
+            self.last_refill = now
+
+    def try_acquire(self):
+        """
+        Take one permit if every bucket has a token available.
+
+        Returns:
+            float: 0 if the permit was granted, otherwise seconds to wait before retrying.
+        """
+        with self.lock:
+            now = self.clock()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self._refill(now)
+            wait = 0.0
+            for capacity, rate, tokens in self.buckets.values():
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate)
+            if wait > 0:
+                return wait
+            for bucket in self.buckets.values():
+                bucket[2] -= 1
+            self.permits_granted += 1
+            return 0.0
+
+    def acquire(self):
+        """
+        Block until a permit is available.
+
+        Returns:
+            float: Seconds spent waiting for this permit.
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+        if waited:
+            with self.lock:
+                self.total_wait += waited
+        return waited
+
+    def pause(self, seconds):
+        """Stop handing out permits for the given number of seconds (e.g. after a 429 Retry-After)."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+            # Drop any saved-up burst so requests resume at the steady rate
+            second = self.buckets['second']
+            second[2] = min(second[2], 0.0)
+
+    def fill_levels(self):
+        """
+        Report how full each bucket currently is.
+
+        Returns:
+            dict: Bucket name -> fraction of capacity available (0.0-1.0).
+        """
+        with self.lock:
+            self._refill(self.clock())
+            return {name: max(b[2], 0.0) / b[0] for name, b in self.buckets.items()}
+
+
+# Shared limiter for every Blizzard API request in this process
+rate_limiter = TokenBucketRateLimiter(MAX_REQUESTS_PER_SEC, MAX_REQUESTS_PER_HOUR)
+
+
+def send_with_retry(session, method, url, params=None, headers=None, retries=3, stream=False):
+    """
+    Perform an HTTP request with retry logic and dynamic rate-limiting.
+
+    Every attempt takes a permit from the shared rate_limiter, so the global request rate
+    stays within MAX_REQUESTS_PER_SEC and MAX_REQUESTS_PER_HOUR.
+
+    Args:
+        session (requests.Session): HTTP session with headers set.
+        method (str): HTTP method ('GET', 'POST', etc.).
+        url (str): Full request URL.
+        params (dict, optional): Query parameters.
+        headers (dict, optional): Extra per-request headers (e.g. If-Modified-Since).
+        retries (int): Number of retry attempts on failure.
+        stream (bool): Leave the body unread so it can be consumed incrementally.
 
-    if actual_rps > MAX_REQUESTS_PER_SEC:
-        ideal_delay = (throttle_tracker['request_count'] / MAX_REQUESTS_PER_SEC) - elapsed
-        if ideal_delay > 0:
-            time.sleep(ideal_delay)
+    Returns:
+        requests.Response: The 200 or 304 response.
 
-    # === Retry logic ===
+    Raises:
+        RuntimeError: If unauthorized or retries are exhausted (429s and timeouts are retried).
+        ScanCancelled: If the ScanEngine job being scanned has been cancelled.
+    """
+    import requests
     for attempt in range(1, retries + 1):
-        
-        # Prints full metadata for debugging
-        if PRINT_FULL_METADATA:
-            if "connected-realm" in url and "auctions" in url:
-                logging.debug("📡 Auction House request\n")
-                debug_stats['auction_calls'] += 1
-            elif "item/" in url:
-                logging.debug("📦 Item metadata request")
-            else:
-                logging.debug(f"🔍 Other Blizzard API request: {url}")
+        # A cancelled ScanEngine job stops at its next request, not after the realm finishes
+        job_checkpoint()
+        waited = rate_limiter.acquire()
+        if waited:
+            scan_metrics.add_wait(waited)
+        increment_stat('blizzard_requests')
+
+        kind = request_kind(url)
+        if kind == 'auctions':
+            increment_stat('auction_calls')
+        tracing = active_trace
+        if tracing is not None and tracing.wants():
+            levels = rate_limiter.fill_levels()
+            tracing.emit('request', kind=kind, url=url, attempt=attempt,
+                         requests=debug_stats['blizzard_requests'],
+                         bucket_second=round(levels['second'], 3), bucket_hour=round(levels['hour'], 3))
 
         # Get a new token if expired
-        resp = session.request(method, url, params=params)
-        if resp.status_code == 200:
-            return resp.json()
+        try:
+            resp = session.request(method, url, params=params, headers=headers, stream=stream, timeout=REQUEST_TIMEOUT)
+        except (requests.Timeout, requests.ConnectionError) as e:
+            increment_stat('request_timeouts')
+            logging.warning("⚠️ Request to %s failed (%s); retrying (attempt %d/%d)", url, type(e).__name__, attempt, retries)
+            continue
+        if resp.status_code in (200, 304):
+            return resp
+        if stream:
+            resp.close()
         if resp.status_code == 429:
+            increment_stat('rate_limited')
             retry_after = int(resp.headers.get('Retry-After', '1'))
-            logging.warning("⚠️ Rate limited; sleeping %ds (attempt %d/%d)", retry_after, attempt, retries)
-            time.sleep(retry_after)
+            logging.warning("⚠️ Rate limited; pausing all requests for %ds (attempt %d/%d)", retry_after, attempt, retries)
+            # Pause every caller, not just this one; the next acquire() waits it out
+            rate_limiter.pause(retry_after)
             continue
         if resp.status_code == 401:
             if os.path.isfile(TOKEN_CACHE):
@@ -637,6 +2032,18 @@ def request_with_retry(session, method, url, params=None, retries=3):
     raise RuntimeError(f"Failed {method} {url} after {retries} attempts")
 
 
+def request_with_retry(session, method, url, params=None, retries=3):
+    """
+    Perform a rate-limited HTTP request with retries and return its parsed JSON body.
+
+    See send_with_retry() for throttling, retry and error behaviour.
+
+    Returns:
+        dict: Parsed JSON response.
+    """
+    return decode_json(send_with_retry(session, method, url, params, retries=retries).content)
+
+
 # === REALM MAPPING ===
 def load_realm_map_from_csv(filename=REALM_CSV) -> bool:
     """
@@ -874,6 +2281,149 @@ def update_single_scan_timestamp(realm_id, realm_name, filename=LOADED_SERVERS_C
         logging.warning(f"❌ Failed to update scan cache for realm {realm_id}: {e}")
 
 
+# === ITEM METADATA STORE ===
+SECONDARY_STAT_NAMES = ("Haste", "Critical Strike", "Versatility", "Mastery")
+
+
+def summarize_secondary_stats(raw_stats):
+    """
+    Reduce an item's preview stats to its secondary-stat distribution.
+
+    Args:
+        raw_stats (list): `preview_item.stats` entries from the item endpoint.
+
+    Returns:
+        list: [full stat name, percentage of total secondary stats] pairs in original order.
+        Percentages are unrounded; callers round once for display, as before the store existed.
+    """
+    secondary = [
+        (s["type"]["name"], s.get("value") or s.get("amount", 0) or 0)
+        for s in raw_stats
+        if not s.get("is_negated") and s.get("type", {}).get("name") in SECONDARY_STAT_NAMES
+    ]
+    total = sum(val for _, val in secondary)
+    if total <= 0:
+        return []
+    return [[name, val / total * 100] for name, val in secondary]
+
+
+class ItemMetadataStore:
+    """
+    Two-tier item metadata cache: an in-memory LRU in front of a SQLite table.
+
+    Entries expire after ITEM_CACHE_TTL_DAYS; items that returned 404 are stored as
+    missing for ITEM_NEGATIVE_TTL_HOURS. Safe to share between worker threads.
+    """
+
+    def __init__(self, path=ITEM_METADATA_DB, memory_size=ITEM_CACHE_MEMORY_SIZE,
+                 ttl=ITEM_CACHE_TTL_DAYS * 86400, negative_ttl=ITEM_NEGATIVE_TTL_HOURS * 3600):
+        self.path = path
+        self.memory_size = memory_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()  # item_id -> (info or None, expires_at)
+        self.pending_writes = 0
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "item_id INTEGER PRIMARY KEY, payload TEXT, expires_at REAL NOT NULL)"
+        )
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != ITEM_METADATA_FORMAT:
+            # Format 1 stored percentages rounded to 4 places, which re-rounded differently on display
+            self.conn.execute("DELETE FROM items")
+            self.conn.execute(f"PRAGMA user_version = {ITEM_METADATA_FORMAT}")
+        self.conn.commit()
+
+    def _remember(self, item_id, info, expires_at):
+        self.memory[item_id] = (info, expires_at)
+        self.memory.move_to_end(item_id)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def lookup(self, item_id):
+        """
+        Look an item up in memory, then on disk.
+
+        Returns:
+            tuple: (found (bool), info (dict, or None for a cached 404)).
+        """
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(item_id)
+            if entry is not None:
+                if entry[1] > now:
+                    self.memory.move_to_end(item_id)
+                    return True, entry[0]
+                del self.memory[item_id]
+
+            row = self.conn.execute(
+                "SELECT payload, expires_at FROM items WHERE item_id = ?", (item_id,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return False, None
+            info = json.loads(row[0]) if row[0] is not None else None
+            self._remember(item_id, info, row[1])
+            return True, info
+
+    def _write(self, item_id, info, lifetime):
+        expires_at = time.time() + lifetime
+        payload = json.dumps(info, separators=(',', ':')) if info is not None else None
+        with self.lock:
+            self._remember(item_id, info, expires_at)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO items (item_id, payload, expires_at) VALUES (?, ?, ?)",
+                (item_id, payload, expires_at)
+            )
+            self.pending_writes += 1
+            if self.pending_writes >= 100:
+                self.conn.commit()
+                self.pending_writes = 0
+
+    def put(self, item_id, info):
+        """Store metadata for an item."""
+        self._write(item_id, info, self.ttl)
+
+    def put_missing(self, item_id):
+        """Remember that an item does not exist (404) so it is not requested again."""
+        self._write(item_id, None, self.negative_ttl)
+
+    def flush(self):
+        """Commit any buffered writes to disk."""
+        with self.lock:
+            self.conn.commit()
+            self.pending_writes = 0
+
+    def close(self):
+        """Commit buffered writes and close the database."""
+        self.flush()
+        self.conn.close()
+
+    def get(self, item_id, default=None):
+        found, info = self.lookup(item_id)
+        return info if found and info is not None else default
+
+    def __contains__(self, item_id):
+        return self.lookup(item_id)[0]
+
+
+# Process-wide item metadata store, opened on first use
+item_store = None
+
+
+def get_item_store():
+    """Return the shared ItemMetadataStore, opening it on first use."""
+    global item_store
+    if item_store is None:
+        item_store = ItemMetadataStore()
+    return item_store
+
+
 # === ITEM AND AUCTION LOGIC ===
 def fetch_item_info(session, headers, item_id, cache):
     """
@@ -883,22 +2433,37 @@ def fetch_item_info(session, headers, item_id, cache):
         session (requests.Session): Active HTTP session.
         headers (dict): Authorization headers.
         item_id (int): Unique Blizzard item ID.
-        cache (dict): Local cache mapping IDs to metadata.
+        cache (ItemMetadataStore): Persistent item metadata store.
 
     Returns:
-        dict: Cached metadata including item_type, item_category, slot_type, and required_level.
+        dict: Cached metadata including item_type, item_category, slot_type, and required_level,
+        or None if the item does not exist (or is not cached and session is None, as in replay).
     """
-    if item_id in cache:
-        debug_stats['item_metadata_hits'] += 1
-        if PRINT_FULL_METADATA and not globals().get('suppress_inline_debug', False):
-            print(f"[DEBUG] 📦 [Cache Hit] Item {item_id}", file=sys.stderr)
-        return cache[item_id]
-
-    debug_stats['item_metadata_misses'] += 1
+    import requests
+    found, cached_info = cache.lookup(item_id)
+    if found:
+        increment_stat('item_metadata_hits')
+        tracing = active_trace
+        if tracing is not None and tracing.wants(item_id=item_id):
+            tracing.emit('item_cache_hit', item_id=item_id, missing=cached_info is None)
+        return cached_info
+
+    increment_stat('item_metadata_misses')
+    if session is None:
+        # Offline replay: only items already in the metadata store can be evaluated
+        return None
 
     url = f"{BASE_URL.format(region=REGION)}/data/wow/item/{item_id}"
     params = {'namespace': REGION_NS[REGION]['static'], 'locale': 'en_US'}
-    data = request_with_retry(session, 'GET', url, params)
+    try:
+        with scan_metrics.phase('metadata_fetch'):
+            data = request_with_retry(session, 'GET', url, params)
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            logging.debug(f"❔ Item {item_id} not found (404); caching as missing")
+            cache.put_missing(item_id)
+            return None
+        raise
 
     # Extract item fields
     name_field = data.get('name')
@@ -926,20 +2491,24 @@ def fetch_item_info(session, headers, item_id, cache):
     slot_type = INVENTORY_TYPE_MAP.get(slot_id)
     if not slot_type:
         slot_type = inv_data.get("name") or inv_data.get("type") or "Unknown"
-    print(f"DEBUG: Slot ID {slot_id}, mapped to slot_type: {slot_type}")
-
-    # Save to cache
-    cache[item_id] = {
-        'name': name, 
-        'ilvl': ilvl, 
+    tracing = active_trace
+    if tracing is not None and tracing.wants(item_id=item_id):
+        tracing.emit('item_fetched', item_id=item_id, name=name, slot_id=slot_id, slot_type=slot_type,
+                     item_type=item_type, item_category=item_category)
+
+    # Save to cache (secondary stats are stored as percentages, not the full stats list)
+    info = {
+        'name': name,
+        'ilvl': ilvl,
         'required_level': required_level,
         'item_category': item_category,
         'item_type': item_type,
         'slot_type': slot_type,
-        'raw_stats': data.get('preview_item', {}).get('stats', [])
+        'secondary_stats': summarize_secondary_stats(data.get('preview_item', {}).get('stats', []))
     }
+    cache.put(item_id, info)
 
-    return cache[item_id]
+    return info
 
 
 def get_observed_ilvl(auc, info):
@@ -977,20 +2546,11 @@ def filter_stat_bonuses(bonuses, raidbots_data, fallback_data, scan_config, info
         raidbots_data (dict): Data from Raidbots API.
         fallback_data (dict): Fallback data for stat bonuses.
         scan_config (ScanConfig): The current scan configuration.
-        info (dict): Item metadata with raw stats (for fallback).
+        info (dict): Item metadata with secondary stat percentages (for fallback).
 
     Returns:
         tuple: (bool passed, list of stat check lines, reason string)
     """
-
-    # Mapping long stat names to filter keys
-    STAT_NAME_MAP = {
-        "Critical Strike": "Crit",
-        "Versatility": "Vers",
-        "Mastery": "Mastery",
-        "Haste": "Haste"
-    }
-
     thresholds = scan_config.STAT_DISTRIBUTION_THRESHOLDS or {}
     appended_stats = set()
     stat_check_details = []
@@ -1010,52 +2570,30 @@ def filter_stat_bonuses(bonuses, raidbots_data, fallback_data, scan_config, info
         return False
 
     # === Check Raidbots bonuses first ===
-    all_stat_ids = set(HASTE_IDS + CRIT_IDS + VERS_IDS + MASTERY_IDS)
+    index = get_bonus_index(raidbots_data, fallback_data)
     for bid in bonuses:
-        if bid not in all_stat_ids:
-            continue
-        bonus = raidbots_data.get(str(bid)) or fallback_data.get(str(bid))
-        if not bonus or 'stats' not in bonus:
+        entry = index.get(bid)
+        if entry is None or not entry.in_stat_lists:
             continue
 
-        # Clean stats and extract percentages
-        stat_entries = [p.strip().split(" [")[0] for p in bonus['stats'].split(",")]
-        for stat in stat_entries:
-            if "%" not in stat:
-                continue
-            try:
-                pct_val = int(stat.split("%")[0])
-                stat_name_full = stat.split("%")[1].strip()
-                short_stat = STAT_NAME_MAP.get(stat_name_full, stat_name_full)
-                passed = process_stat(stat, short_stat, pct_val)
-                if passed and not stat_above_threshold:
-                    stat_above_threshold = True
-                    stat_threshold_reason = f"(✅ {short_stat} ≥ {pct_val}%)"
-            except Exception:
-                continue
+        # Percentages were parsed from the stats string when the index was compiled
+        for stat, short_stat, pct_val in entry.stats:
+            passed = process_stat(stat, short_stat, pct_val)
+            if passed and not stat_above_threshold:
+                stat_above_threshold = True
+                stat_threshold_reason = f"(✅ {short_stat} ≥ {pct_val}%)"
         if stat_above_threshold:
             break
 
-    # === Fallback to raw_stats if needed ===
+    # === Fallback to the item's secondary stat distribution if needed ===
     if not stat_above_threshold and info:
-        raw_stats = info.get("raw_stats", [])
-        secondary_stats = [
-            s for s in raw_stats
-            if not s.get("is_negated") and s.get("type", {}).get("name") in STAT_NAME_MAP
-        ]
-        total = sum(s.get("amount", 0) or s.get("value", 0) for s in secondary_stats)
-
-        if total > 0:
-            for s in secondary_stats:
-                val = s.get("amount", 0) or s.get("value", 0)
-                pct = (val / total) * 100
-                full_name = s['type']['name']
-                short_stat = STAT_NAME_MAP.get(full_name, full_name)
-                stat_str = f"{round(pct)}% {full_name}"
-                if process_stat(stat_str, short_stat, pct):
-                    stat_above_threshold = True
-                    stat_threshold_reason = f"(✅ {round(pct)}% {full_name})"
-                    break
+        for full_name, pct in info.get("secondary_stats", []):
+            short_stat = STAT_NAME_MAP.get(full_name, full_name)
+            stat_str = f"{round(pct)}% {full_name}"
+            if process_stat(stat_str, short_stat, pct):
+                stat_above_threshold = True
+                stat_threshold_reason = f"(✅ {round(pct)}% {full_name})"
+                break
 
     return stat_above_threshold, stat_check_details, stat_threshold_reason
 
@@ -1082,17 +2620,13 @@ def extract_stat_display_strings(item_id, bonuses, raidbots_data, item_cache, co
         return f"\033[90m{s}\033[0m" if color else s
 
     # === Bonus-based stats ===
+    index = get_bonus_index(raidbots_data)
     for bid in bonuses:
-        bonus = raidbots_data.get(str(bid))
-        if not bonus or 'stats' not in bonus:
-            continue
-
-        stat_string = bonus['stats']
-        if not any(stat_name in stat_string for stat_name in ("Haste", "Crit", "Vers", "Mastery")):
+        entry = index.get(bid)
+        if entry is None or not entry.primary or not entry.display_parts:
             continue
 
-        parts = [p.strip().split(' [')[0] for p in stat_string.split(',')]
-        parts.sort(key=lambda s: 0 if "Haste" in s else 1)
+        parts = entry.display_parts
 
         if len(parts) > 0:
             stat1 = color_max_stat(parts[0]) if color else parts[0]
@@ -1105,18 +2639,8 @@ def extract_stat_display_strings(item_id, bonuses, raidbots_data, item_cache, co
     # === Fallback metadata ===
     if not bonus_found:
         item_info = item_cache.get(item_id, {})
-        raw_stats = item_info.get("raw_stats", [])
-        secondary_stats = []
-        for s in raw_stats:
-            if s.get("is_negated"):
-                continue
-            stat_name = s.get("type", {}).get("name", "")
-            stat_value = s.get("value") or s.get("amount", 0)
-            if stat_name in ("Haste", "Critical Strike", "Versatility", "Mastery") and stat_value > 0:
-                secondary_stats.append({"name": stat_name, "amount": stat_value})
-
-        total = sum(s["amount"] for s in secondary_stats)
-        if total > 0:
+        secondary_stats = [(name, pct) for name, pct in item_info.get("secondary_stats", []) if pct > 0]
+        if secondary_stats:
             def short(s):
                 return (
                     "Crit" if s == "Critical Strike" else
@@ -1124,9 +2648,9 @@ def extract_stat_display_strings(item_id, bonuses, raidbots_data, item_cache, co
                 )
             sorted_stats = sorted(
                 secondary_stats,
-                key=lambda s: (0 if s["name"] == "Haste" else 1, -s["amount"])
+                key=lambda s: (0 if s[0] == "Haste" else 1, -s[1])
             )
-            pct_parts = [f"{round(s['amount'] / total * 100)}% {short(s['name'])}" for s in sorted_stats[:2]]
+            pct_parts = [f"{round(pct)}% {short(name)}" for name, pct in sorted_stats[:2]]
             if len(pct_parts) > 0:
                 stat1 = grey_text(pct_parts[0])
             if len(pct_parts) > 1:
@@ -1135,204 +2659,1747 @@ def extract_stat_display_strings(item_id, bonuses, raidbots_data, item_cache, co
     return stat1, stat2
 
 
-def scan_realm_with_bonus_analysis(session, headers, realm_id, realm_name, item_cache, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters):
-    logging.info(f"🔍 Scanning realm ID {realm_id}: {realm_name}")
-    url = f"{BASE_URL.format(region=REGION)}/data/wow/connected-realm/{realm_id}/auctions"
-    params = {'namespace': REGION_NS[REGION]['dynamic'], 'locale': 'en_US'}
-    data = request_with_retry(session, 'GET', url, params)
-
-    results = []
+# === COLUMNAR AUCTION TABLE ===
+# One typed array per auction field instead of one dict per auction. Bonus and modifier lists are
+# interned: each distinct list is stored once in an InternPool and rows hold its integer key.
+# Fields the columns cannot represent exactly go to an interned JSON 'extras' blob, so every
+# row converts back to the original auction dict.
+MISSING = -1  # Column value for an absent field
+TIME_LEFT_CODES = ['SHORT', 'MEDIUM', 'LONG', 'VERY_LONG']
+TIME_LEFT_INDEX = {name: i for i, name in enumerate(TIME_LEFT_CODES)}
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+AUCTION_COLUMN_KEYS = frozenset(['id', 'item', 'buyout', 'bid', 'quantity', 'time_left'])
+ITEM_COLUMN_KEYS = frozenset(['id', 'context', 'bonus_lists', 'modifiers'])
 
-    for auc in data.get('auctions', []):
-        item = auc.get('item')
-        if not item or not isinstance(item, dict):
-            continue
 
-        modifiers = auc.get("modifiers") or auc.get("item_modifiers") or auc.get("item", {}).get("modifiers", [])
-        if not isinstance(modifiers, list):
-            modifiers = []
-        mod_str = ", ".join([f"{m['type']}→{m['value']}" for m in modifiers]) if modifiers else "None"
+class InternPool:
+    """Assigns a stable integer key to each distinct hashable value. Safe to share between threads."""
 
-        bonuses = list(set(auc.get('bonus_lists', []) + item.get('bonus_lists', [])))
-        if not all(set(bonuses) & active_filters[f] for f in active_filters):
-            continue
+    def __init__(self):
+        self.keys = {}
+        self.values = []
+        self.lock = threading.Lock()
 
-        if max_stat_filters:
-            found_max = False
-            for bid in bonuses:
-                bonus = raidbots_data.get(str(bid)) or fallback_data.get(str(bid))
-                if bonus and 'stats' in bonus:
-                    stats_cleaned = [p.strip().split(" [")[0] for p in bonus['stats'].split(",")]
-                    for s in stats_cleaned:
-                        if s.startswith("71% "):
-                            stat_name = s[4:]
-                            if stat_name in max_stat_filters:
-                                found_max = True
-                                break
-                if found_max:
-                    break
-            if not found_max:
-                continue
+    def intern(self, value):
+        key = self.keys.get(value)
+        if key is None:
+            with self.lock:
+                key = self.keys.get(value)
+                if key is None:
+                    key = len(self.values)
+                    self.values.append(value)
+                    self.keys[value] = key
+        return key
 
-        info = fetch_item_info(session, headers, item['id'], item_cache)
+    def __getitem__(self, key):
+        return self.values[key]
 
-        # In main(), ensure scan_config is passed as the full ScanConfig object
-        stat_above_threshold, stat_check_details, stat_threshold_reason = filter_stat_bonuses(bonuses, raidbots_data, fallback_data, scan_config, info)
-   
-        observed_ilvl = get_observed_ilvl(auc, info)
-        base_ilvl = observed_ilvl
-        final_ilvl = None
-        level_reason = ""
+    def __len__(self):
+        return len(self.values)
 
-        is_legacy = any(b in LEGACY_BONUS_IDS for b in bonuses)
+    def nbytes(self):
+        """Rough size of the interned values, for memory reports."""
+        return sum(sys.getsizeof(v) + (8 * len(v) if isinstance(v, tuple) else 0) for v in self.values)
 
-        if is_legacy:
-            try:
-                player_level = next((m["value"] for m in modifiers if m["type"] == 9), None)
-                if player_level:
-                    curve_id = next((str(bonus["curveId"]) for b in bonuses
-                                     if (bonus := raidbots_data.get(str(b)) or fallback_data.get(str(b))) and "curveId" in bonus), None)
-                    if curve_id:
-                        points = curve_data.get(curve_id, {}).get("points", [])
-                        for pt in points:
-                            if pt["playerLevel"] <= player_level:
-                                final_ilvl = pt["itemLevel"]
-                            else:
-                                break
-                        level_reason = f"✅ Legacy curve {curve_id} @ level {player_level}"
-                    else:
-                        level_reason = "⛔ No curveId in legacy bonus IDs"
-                else:
-                    level_reason = "⛔ No modifier type 9 (player level)"
-            except Exception as e:
-                level_reason = f"⛔ Curve logic error: {e}"
 
-            if not final_ilvl:
-                final_ilvl = observed_ilvl
-                level_reason += " | fallback to observed"
-        else:
-            curve_id = next((bonus.get("curveId") for b in bonuses
-                             if (bonus := raidbots_data.get(str(b)) or fallback_data.get(str(b))) and "curveId" in bonus), None)
-            if curve_id:
-                points = curve_data.get(str(curve_id), {}).get("points", [])
-                _, corrected_ilvl = infer_player_level_from_ilvl(base_ilvl, points)
-                final_ilvl = corrected_ilvl or observed_ilvl
-                level_reason = f"✅ Retail curve {curve_id} inferred"
-            else:
-                final_ilvl = infer_ilvl_from_bonus_ids(
-                    base_ilvl, bonuses, raidbots_data, fallback_data,
-                    player_level=info.get('required_level', 60)
-                ) or observed_ilvl
-                level_reason = "✅ Fallback bonus-based ilvl"
+def column_int(value, low=INT64_MIN, high=INT64_MAX):
+    """True if value can be stored in an integer column (bools and out-of-range ints cannot)."""
+    return type(value) is int and low <= value <= high and value != MISSING
 
-        stat_match_ids = []
-        match_sources = {}
-        for bid in bonuses:
-            matched = []
-            if bid in HASTE_IDS: matched.append("HASTE_IDS")
-            if bid in CRIT_IDS: matched.append("CRIT_IDS")
-            if bid in VERS_IDS: matched.append("VERS_IDS")
-            if bid in MASTERY_IDS: matched.append("MASTERY_IDS")
-            if matched:
-                stat_match_ids.append(bid)
-                match_sources[bid] = matched
-
-        # === Stat1/Stat2 extraction ===
-        stat1, stat2 = extract_stat_display_strings(item['id'], bonuses, raidbots_data, item_cache, color=False)
-
-        fallback_reason = (
-            f"❌ No usable stat info found for item {item['id']}"
-            if stat1.strip() == "—"
-            else f"♻️  Stats: {stat1}, {stat2}"
-        )
 
-        result = {
-            'realm_id': realm_id,
-            'item_id': item['id'],
-            'name': info['name'],
-            'ilvl': final_ilvl,
-            'quantity': auc.get('quantity'),
-            'buyout': auc.get('buyout'),
-            'type': info.get('item_type'),
-            'slot': info.get('slot_type'),
-            'bonus_lists': bonuses,
-            'stat1': stat1,
-            'stat2': stat2
-        }
+class AuctionTable:
+    """
+    Array-backed auction snapshot of one connected realm.
 
-        # === Print Full Metadata ===
-        if PRINT_FULL_METADATA:
-            sys.stderr.flush()
-            print(f"📦 Full Metadata for '{info['name']}'")
-            print(f"🧾 Item ID       : {item['id']}")
-            print(f"📏 Observed ilvl : {observed_ilvl}")
-            print(f"📈 Final ilvl    : {final_ilvl} ({level_reason})")
-            print(f"🎚️  Required Level: {info.get('required_level', '—')}")
-            print(f"⛓️  Item Type     : {info.get('item_type', 'Unknown')}")
-            print(f"🎯 Slot Type     : {info.get('slot_type', 'Unknown')}")
-            print(f"🎫 Bonus IDs     : {bonuses}")
-            if stat_match_ids:
-                summary = ', '.join(f"{bid} ({'/'.join(match_sources[bid])})" for bid in stat_match_ids)
-                print(f"🧬 Stat Info     : [{', '.join(map(str, stat_match_ids))}] (✅ Bonus ID match: {summary})")
-            else:
-                print("🧬 Stat Info     : No stat bonus IDs found | Using fallback method")
-            print(f"🧪 Stat Check    : {'| '.join(stat_check_details)}")
-            print(f"🔧 Modifiers     : {mod_str}")
-            print(f"💰 Buyout        : {auc.get('buyout')}")
-            print("-" * 60)
+    Iterating yields auction dicts equal to the decoded ones, so every function that takes a
+    list of auctions also accepts a table. The filter path reads the columns directly and only
+    rebuilds dicts for the rows it keeps.
+    """
 
-        # === Filtering by buyout price ===
-        buyout = auc.get('buyout')
-        if buyout is not None and buyout > scan_config.MAX_BUYOUT:
-            if PRINT_FULL_METADATA:
-                g_price = buyout // 10000
-                print(f"⛔ Rejected: Buyout {g_price}g exceeds max {scan_config.MAX_BUYOUT // 10000}g\n")
+    def __init__(self, pool=None):
+        self.pool = pool if pool is not None else region_intern_pool
+        self.auction_ids = array('q')
+        self.item_ids = array('q')
+        self.buyouts = array('q')
+        self.bids = array('q')
+        self.quantities = array('q')
+        self.time_left = array('b')
+        self.contexts = array('i')
+        self.bonus_keys = array('i')  # Interned tuple of item.bonus_lists
+        self.modifier_keys = array('i')  # Interned tuple of (type, value) pairs from item.modifiers
+        self.extra_keys = array('i')  # Interned JSON of any remaining fields
+        self.own_bonus_rows = set()  # Rows whose auction carries its own 'bonus_lists'
+
+    @classmethod
+    def from_auctions(cls, auctions, pool=None):
+        """Build a table from auction dicts; a generator is consumed as it yields."""
+        table = cls(pool)
+        table.extend(auctions)
+        return table
+
+    def extend(self, auctions):
+        for auc in auctions:
+            self.append(auc)
+
+    def append(self, auc):
+        """Add one decoded auction dict as a new row."""
+        if not self._append_plain(auc):
+            self._append_general(auc)
+
+    def _append_plain(self, auc):
+        """
+        Fast path for auctions made only of column fields with ordinary values (almost all of
+        them). Returns False without touching the table when anything needs the general path.
+        """
+        item = auc.get('item')
+        if type(item) is not dict or not (auc.keys() <= AUCTION_COLUMN_KEYS and item.keys() <= ITEM_COLUMN_KEYS):
+            return False
+        values = (item.get('id'), auc.get('id', MISSING), auc.get('buyout', MISSING), auc.get('bid', MISSING),
+                  auc.get('quantity', MISSING), item.get('context', MISSING))
+        for value in values:
+            if type(value) is not int:
+                return False
+        if values[0] == MISSING or (MISSING in values and MISSING in (
+                auc.get('id'), auc.get('buyout'), auc.get('bid'), auc.get('quantity'), item.get('context'))):
+            return False
+        if min(values) < INT64_MIN or max(values) > INT64_MAX or not INT32_MIN <= values[5] <= INT32_MAX:
+            return False
+        time_left = auc.get('time_left')
+        time_code = TIME_LEFT_INDEX.get(time_left, MISSING)
+        if time_code == MISSING and time_left is not None:
+            return False
+
+        pool = self.pool
+        interned = pool.keys
+        bonus_key = modifier_key = MISSING
+        bonus_lists = item.get('bonus_lists')
+        if bonus_lists is not None:
+            if type(bonus_lists) is not list:
+                return False
+            for bid in bonus_lists:
+                if type(bid) is not int:
+                    return False
+            bonus_lists = tuple(bonus_lists)
+            bonus_key = interned.get(bonus_lists)
+            if bonus_key is None:
+                bonus_key = pool.intern(bonus_lists)
+        modifiers = item.get('modifiers')
+        if modifiers is not None:
+            if type(modifiers) is not list:
+                return False
+            pairs = []
+            for m in modifiers:
+                if type(m) is not dict or len(m) != 2:
+                    return False
+                mod_type, mod_value = m.get('type'), m.get('value')
+                if type(mod_type) is not int or type(mod_value) is not int:
+                    return False
+                pairs.append((mod_type, mod_value))
+            pairs = tuple(pairs)
+            modifier_key = interned.get(pairs)
+            if modifier_key is None:
+                modifier_key = pool.intern(pairs)
+
+        self.item_ids.append(values[0])
+        self.auction_ids.append(values[1])
+        self.buyouts.append(values[2])
+        self.bids.append(values[3])
+        self.quantities.append(values[4])
+        self.contexts.append(values[5])
+        self.time_left.append(time_code)
+        self.bonus_keys.append(bonus_key)
+        self.modifier_keys.append(modifier_key)
+        self.extra_keys.append(MISSING)
+        return True
+
+    def _append_general(self, auc):
+        """Column fields that fit, everything else into the interned extras blob."""
+        extra = dict(auc)
+        item = extra.pop('item', None)
+        item_extra = None
+        if isinstance(item, dict) and item and column_int(item.get('id')):
+            item_extra = dict(item)
+            item_id = item_extra.pop('id')
+        else:
+            item_id = MISSING
+            if 'item' in auc:
+                extra['item'] = item
+
+        pool = self.pool
+        self.auction_ids.append(self._pop_int(extra, 'id'))
+        self.item_ids.append(item_id)
+        self.buyouts.append(self._pop_int(extra, 'buyout'))
+        self.bids.append(self._pop_int(extra, 'bid'))
+        self.quantities.append(self._pop_int(extra, 'quantity'))
+        time_left = extra.get('time_left')
+        if time_left in TIME_LEFT_INDEX:
+            del extra['time_left']
+            self.time_left.append(TIME_LEFT_INDEX[time_left])
+        else:
+            self.time_left.append(MISSING)
+
+        bonus_key = modifier_key = context = MISSING
+        if item_extra is not None:
+            context = self._pop_int(item_extra, 'context', INT32_MIN, INT32_MAX)
+            bonus_lists = item_extra.get('bonus_lists')
+            if isinstance(bonus_lists, list) and all(type(b) is int for b in bonus_lists):
+                bonus_key = pool.intern(tuple(item_extra.pop('bonus_lists')))
+            modifiers = item_extra.get('modifiers')
+            if isinstance(modifiers, list) and all(
+                    isinstance(m, dict) and m.keys() == {'type', 'value'}
+                    and type(m['type']) is int and type(m['value']) is int for m in modifiers):
+                modifier_key = pool.intern(tuple((m['type'], m['value']) for m in item_extra.pop('modifiers')))
+            if item_extra:
+                extra['item'] = item_extra
+        self.contexts.append(context)
+        self.bonus_keys.append(bonus_key)
+        self.modifier_keys.append(modifier_key)
+
+        if 'bonus_lists' in extra:
+            self.own_bonus_rows.add(len(self.auction_ids) - 1)
+        self.extra_keys.append(pool.intern(json.dumps(extra, sort_keys=True)) if extra else MISSING)
+
+    @staticmethod
+    def _pop_int(fields, key, low=INT64_MIN, high=INT64_MAX):
+        value = fields.get(key)
+        if column_int(value, low, high):
+            del fields[key]
+            return value
+        return MISSING
+
+    def __len__(self):
+        return len(self.auction_ids)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.auction(row)
+
+    def auction(self, row):
+        """Rebuild the auction dict stored in a row."""
+        pool = self.pool
+        extra = json.loads(pool[self.extra_keys[row]]) if self.extra_keys[row] != MISSING else {}
+        auc = {}
+        if self.auction_ids[row] != MISSING:
+            auc['id'] = self.auction_ids[row]
+        if self.item_ids[row] != MISSING:
+            item = {'id': self.item_ids[row]}
+            if self.contexts[row] != MISSING:
+                item['context'] = self.contexts[row]
+            if self.bonus_keys[row] != MISSING:
+                item['bonus_lists'] = list(pool[self.bonus_keys[row]])
+            if self.modifier_keys[row] != MISSING:
+                item['modifiers'] = [{'type': t, 'value': v} for t, v in pool[self.modifier_keys[row]]]
+            item.update(extra.pop('item', {}))
+            auc['item'] = item
+        for key, column in (('buyout', self.buyouts), ('bid', self.bids), ('quantity', self.quantities)):
+            if column[row] != MISSING:
+                auc[key] = column[row]
+        if self.time_left[row] != MISSING:
+            auc['time_left'] = TIME_LEFT_CODES[self.time_left[row]]
+        auc.update(extra)
+        return auc
+
+    def auctions_at(self, rows):
+        """Auction dicts for the given row numbers, in that order."""
+        return [self.auction(row) for row in rows]
+
+    def bonus_list(self, row):
+        """Item-level bonus IDs of a row as a tuple (empty if absent)."""
+        key = self.bonus_keys[row]
+        return self.pool[key] if key != MISSING else ()
+
+    def rows_for_item(self, item_id):
+        """Row numbers of every auction for the given item ID."""
+        return [row for row, iid in enumerate(self.item_ids) if iid == item_id]
+
+    def column(self, name):
+        """A column as a numpy array sharing the table's memory."""
+        load_numpy()
+        values = getattr(self, name)
+        return np.frombuffer(values, dtype=np.dtype(values.typecode)) if len(values) else np.zeros(0, dtype=np.int64)
+
+    def nbytes(self):
+        """Memory held by the columns (the shared intern pool is reported separately)."""
+        columns = (self.auction_ids, self.item_ids, self.buyouts, self.bids, self.quantities,
+                   self.time_left, self.contexts, self.bonus_keys, self.modifier_keys, self.extra_keys)
+        return sum(c.itemsize * len(c) for c in columns)
+
+
+class RegionAuctionStore:
+    """
+    The latest AuctionTable of every connected realm, sharing one intern pool.
+
+    Identical bonus and modifier lists are stored once for the whole region, which is what
+    lets all realms' snapshots stay in memory together.
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool if pool is not None else region_intern_pool
+        self.tables = {}
+        self.last_modified = {}
+        self.lock = threading.Lock()
+
+    def put(self, realm_id, table, last_modified=None):
+        with self.lock:
+            self.tables[int(realm_id)] = table
+            self.last_modified[int(realm_id)] = last_modified
+
+    def get(self, realm_id):
+        return self.tables.get(int(realm_id))
+
+    def realms(self):
+        return sorted(self.tables)
+
+    def total_auctions(self):
+        return sum(len(t) for t in self.tables.values())
+
+    def nbytes(self):
+        return sum(t.nbytes() for t in self.tables.values()) + self.pool.nbytes()
+
+    def find_item(self, item_id, bonus_id=None):
+        """
+        Every listing of an item across the region.
+
+        Returns:
+            list: (realm_id, auction dict) pairs, cheapest buyout first (bid-only listings last).
+        """
+        matches = []
+        for realm_id, table in sorted(self.tables.items()):
+            for row in table.rows_for_item(item_id):
+                if bonus_id is None or bonus_id in table.bonus_list(row):
+                    matches.append((realm_id, table.auction(row)))
+        matches.sort(key=lambda m: (m[1].get('buyout') is None, m[1].get('buyout') or 0))
+        return matches
+
+
+region_intern_pool = InternPool()
+region_auctions = RegionAuctionStore()
+
+
+def as_auction_table(realm_id, auctions, last_modified=None):
+    """
+    Convert decoded auctions to an AuctionTable (when AUCTION_TABLES is on) and keep it region-wide if asked.
+
+    The realm's auction count is recorded in scan_metrics (unless the auctions are still a stream).
+    """
+    if not (AUCTION_TABLES or HOLD_REGION_AUCTIONS) or auctions is None or isinstance(auctions, AuctionTable):
+        if isinstance(auctions, list):
+            scan_metrics.observe_realm(realm_id, auctions=len(auctions))
+        return auctions
+    table = AuctionTable.from_auctions(auctions)
+    scan_metrics.observe_realm(realm_id, auctions=len(table))
+    if HOLD_REGION_AUCTIONS:
+        region_auctions.put(realm_id, table, last_modified)
+    return table
+
+
+def write_region_auctions_csv(store=None, filename=REGION_AUCTIONS_CSV):
+    """Write every auction held in a RegionAuctionStore to a CSV file, one row per listing."""
+    store = store if store is not None else region_auctions
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['realm_id', 'auction_id', 'item_id', 'bonus_lists', 'buyout_gold', 'bid_gold', 'quantity', 'time_left'])
+        for realm_id in store.realms():
+            table = store.get(realm_id)
+            for row in range(len(table)):
+                buyout, bid = table.buyouts[row], table.bids[row]
+                writer.writerow([
+                    realm_id,
+                    table.auction_ids[row],
+                    table.item_ids[row],
+                    ':'.join(map(str, table.bonus_list(row))),
+                    buyout // 10000 if buyout != MISSING else '',
+                    bid // 10000 if bid != MISSING else '',
+                    table.quantities[row] if table.quantities[row] != MISSING else '',
+                    TIME_LEFT_CODES[table.time_left[row]] if table.time_left[row] != MISSING else '',
+                ])
+
+
+# === AUCTION SNAPSHOT CACHE ===
+# realm_id (str) -> {'last_modified', 'config_key', 'results'}; loaded lazily, shared by worker threads
+auction_snapshot_cache = None
+snapshot_cache_lock = threading.Lock()
+
+
+def scan_config_fingerprint(scan_config):
+    """Stable hash of a ScanConfig, used to decide whether stored realm results are still valid."""
+    payload = json.dumps(vars(scan_config), sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def load_auction_snapshot_cache(filename=AUCTION_SNAPSHOT_CACHE):
+    """
+    Load the per-realm Last-Modified values and results from the previous scan.
+
+    Returns:
+        dict: realm_id (str) -> cached snapshot entry.
+    """
+    global auction_snapshot_cache
+    with snapshot_cache_lock:
+        if auction_snapshot_cache is None:
+            auction_snapshot_cache = {}
+            if os.path.exists(filename):
+                try:
+                    with open(filename, 'r', encoding='utf-8') as f:
+                        auction_snapshot_cache = json.load(f)
+                except Exception as e:
+                    logging.warning(f"⚠️ Failed to load auction snapshot cache: {e}")
+        return auction_snapshot_cache
+
+
+def save_auction_snapshot_cache(filename=AUCTION_SNAPSHOT_CACHE):
+    """Persist the per-realm snapshot cache so the next run can send conditional requests."""
+    if auction_snapshot_cache is None:
+        return
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with snapshot_cache_lock:
+        payload = json.dumps(auction_snapshot_cache)
+    tmp_path = f"{filename}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(payload)
+    os.replace(tmp_path, filename)
+
+
+# === AUCTION SNAPSHOT ARCHIVE ===
+# Cache/snapshots/<realm_id>/<last_modified_epoch>.json.gz, the raw body exactly as downloaded
+def snapshot_archive_key(last_modified):
+    """Epoch seconds of a Last-Modified header (or now, if it is missing or malformed)."""
+    if last_modified:
+        try:
+            return int(parsedate_to_datetime(last_modified).timestamp())
+        except (TypeError, ValueError):
+            pass
+    return int(time.time())
+
+
+def snapshot_archive_path(realm_id, last_modified, archive_dir=SNAPSHOT_ARCHIVE_DIR):
+    """Archive file for one realm snapshot, keyed by realm ID and Last-Modified."""
+    return os.path.join(archive_dir, str(realm_id), f"{snapshot_archive_key(last_modified)}.json.gz")
+
+
+def archive_raw_snapshot(realm_id, last_modified, raw):
+    """
+    Write a downloaded auction snapshot body into the archive (gzip, atomic rename).
+
+    Snapshots already archived under the same Last-Modified are left alone. Archive failures
+    are logged and never interrupt the scan.
+    """
+    if not ARCHIVE_AUCTION_SNAPSHOTS or REPLAY_TIMESTAMP is not None:
+        return
+    path = snapshot_archive_path(realm_id, last_modified)
+    if os.path.exists(path):
+        return
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(tmp_path, 'wb', compresslevel=ARCHIVE_COMPRESS_LEVEL) as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"⚠️ Failed to archive snapshot for realm {realm_id}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def tee_snapshot_chunks(chunks, realm_id, last_modified):
+    """
+    Yield streamed body chunks unchanged while writing them into the archive.
+
+    The archive file only appears once every chunk has been written, so an aborted download
+    never leaves a truncated snapshot behind.
+    """
+    if not ARCHIVE_AUCTION_SNAPSHOTS or REPLAY_TIMESTAMP is not None:
+        yield from chunks
+        return
+    path = snapshot_archive_path(realm_id, last_modified)
+    if os.path.exists(path):
+        yield from chunks
+        return
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    archive = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        archive = gzip.open(tmp_path, 'wb', compresslevel=ARCHIVE_COMPRESS_LEVEL)
+    except OSError as e:
+        logging.warning(f"⚠️ Failed to archive snapshot for realm {realm_id}: {e}")
+
+    complete = False
+    try:
+        for chunk in chunks:
+            if archive is not None:
+                try:
+                    archive.write(chunk)
+                except OSError as e:
+                    logging.warning(f"⚠️ Failed to archive snapshot for realm {realm_id}: {e}")
+                    archive.close()
+                    archive = None
+            yield chunk
+        complete = True
+    finally:
+        if archive is not None:
+            archive.close()
+            if complete:
+                os.replace(tmp_path, path)
+        if not complete or archive is None:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def list_archived_snapshots(realm_id, archive_dir=SNAPSHOT_ARCHIVE_DIR):
+    """
+    List a realm's archived snapshots.
+
+    Returns:
+        list: (epoch (int), path (str)) tuples, oldest first.
+    """
+    realm_dir = os.path.join(archive_dir, str(realm_id))
+    if not os.path.isdir(realm_dir):
+        return []
+    snapshots = []
+    for name in os.listdir(realm_dir):
+        stem = name[:-len('.json.gz')]
+        if name.endswith('.json.gz') and stem.isdigit():
+            snapshots.append((int(stem), os.path.join(realm_dir, name)))
+    return sorted(snapshots)
+
+
+def list_archived_realms(archive_dir=SNAPSHOT_ARCHIVE_DIR):
+    """Return the connected realm IDs that have at least one archived snapshot."""
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(int(name) for name in os.listdir(archive_dir)
+                  if name.isdigit() and list_archived_snapshots(name, archive_dir))
+
+
+def find_archived_snapshot(realm_id, at=None, archive_dir=SNAPSHOT_ARCHIVE_DIR):
+    """
+    Pick the newest archived snapshot of a realm taken at or before `at`.
+
+    Args:
+        realm_id (int): Connected realm ID.
+        at (float, optional): Epoch seconds; None selects the newest snapshot.
+
+    Returns:
+        tuple: (epoch, path), or None if the realm has no snapshot that old.
+    """
+    candidates = [s for s in list_archived_snapshots(realm_id, archive_dir) if at is None or s[0] <= at]
+    return candidates[-1] if candidates else None
+
+
+def iter_archived_snapshot_chunks(path, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield the decompressed body of an archived snapshot in chunks."""
+    with gzip.open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def load_archived_auctions(realm_id, at=None, stream=None, decode=True):
+    """
+    Read a realm's auctions from the archive instead of the API (used by --replay).
+
+    Args:
+        realm_id (int): Connected realm ID.
+        at (float, optional): Replay time in epoch seconds; None uses the newest snapshot.
+        stream (bool, optional): Parse incrementally; defaults to STREAM_AUCTIONS.
+        decode (bool): When False, return the raw body instead of the auctions.
+
+    Returns:
+        tuple: (auctions (list, generator or bytes), last_modified (str or None)).
+    """
+    if stream is None:
+        stream = STREAM_AUCTIONS and decode
+    snapshot = find_archived_snapshot(realm_id, at)
+    if snapshot is None:
+        logging.warning(f"⚠️ No archived snapshot for realm {realm_id} at or before {at}; skipping")
+        return ([] if decode else b'{"auctions": []}'), None
+    epoch, path = snapshot
+    logging.info(f"📼 Replaying realm {realm_id} from snapshot {time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(epoch))}")
+    if stream:
+        return iter_json_array_items(iter_archived_snapshot_chunks(path), 'auctions'), None
+    with gzip.open(path, 'rb') as f:
+        raw = f.read()
+    if not decode:
+        return raw, None
+    return decode_json(raw).get('auctions', []), None
+
+
+def prune_snapshot_archive(archive_dir=SNAPSHOT_ARCHIVE_DIR, max_per_realm=ARCHIVE_MAX_SNAPSHOTS_PER_REALM,
+                           max_age_days=ARCHIVE_MAX_AGE_DAYS, max_total_mb=ARCHIVE_MAX_TOTAL_MB):
+    """
+    Apply the archive retention limits: per-realm count, maximum age and total size.
+
+    Returns:
+        int: Number of snapshots removed.
+    """
+    if not os.path.isdir(archive_dir):
+        return 0
+    cutoff = time.time() - max_age_days * 86400
+    expired, kept = [], []
+    for realm_id in list_archived_realms(archive_dir):
+        snapshots = list_archived_snapshots(realm_id, archive_dir)
+        excess = max(len(snapshots) - max_per_realm, 0)
+        for idx, (epoch, path) in enumerate(snapshots):
+            (expired if idx < excess or epoch < cutoff else kept).append((epoch, path))
+
+    # Region-wide size cap: drop the oldest remaining snapshots until the archive fits
+    sizes = {path: os.path.getsize(path) for _, path in kept}
+    total = sum(sizes.values())
+    budget = max_total_mb * 1024 * 1024
+    for epoch, path in sorted(kept):
+        if total <= budget:
+            break
+        expired.append((epoch, path))
+        total -= sizes[path]
+
+    for _, path in expired:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logging.warning(f"⚠️ Failed to prune archived snapshot {path}: {e}")
+    if expired:
+        logging.info(f"🧹 Pruned {len(expired)} archived auction snapshot(s)")
+    return len(expired)
+
+
+def parse_replay_timestamp(value):
+    """
+    Parse the --replay argument: 'latest', epoch seconds, or a local ISO time (YYYY-MM-DDTHH:MM:SS).
+
+    Returns:
+        float: Epoch seconds ('latest' is infinity, i.e. each realm's newest snapshot).
+
+    Raises:
+        ValueError: If the value cannot be parsed.
+    """
+    value = value.strip()
+    if value.lower() == 'latest':
+        return float('inf')
+    if value.isdigit():
+        return float(value)
+    return datetime.fromisoformat(value).timestamp()
+
+
+# === STREAMING JSON ===
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def iter_json_array_items(chunks, key='auctions'):
+    """
+    Incrementally parse a JSON object from byte chunks, yielding the items of one top-level array.
+
+    Only the array's current item and the unparsed tail of the buffer are held in memory, so
+    peak usage stays flat regardless of how many items the array contains. Other top-level
+    values are parsed and discarded.
+
+    Args:
+        chunks (iterable): Byte chunks of the JSON document (e.g. resp.iter_content()).
+        key (str): Name of the top-level array to stream.
+
+    Yields:
+        The decoded array items, one at a time.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            eof = True
+            chunk = None
+        text = text_decoder.decode(chunk or b'', final=chunk is None)
+        buf = buf[pos:] + text
+        pos = 0
+        return True
+
+    def peek():
+        # Skip whitespace and return the next significant character ('' at end of input)
+        nonlocal pos
+        while True:
+            pos = _JSON_WHITESPACE.match(buf, pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ''
+
+    def expect(char):
+        nonlocal pos
+        found = peek()
+        if found != char:
+            raise ValueError(f"Malformed JSON stream: expected '{char}', found '{found or 'EOF'}'")
+        pos += 1
+
+    def read_value():
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if not fill():
+                    raise
+                continue
+            # A number cut off by the end of the buffer may continue in the next chunk
+            at_boundary = end == len(buf) or (
+                type(value) in (int, float) and buf[end] in '0123456789.eE+-'
+            )
+            if at_boundary and not eof:
+                fill()
+                continue
+            pos = end
+            return value
+
+    expect('{')
+    if peek() == '}':
+        return
+    while True:
+        name = read_value()
+        expect(':')
+        if name == key:
+            expect('[')
+            if peek() == ']':
+                pos += 1
+            else:
+                while True:
+                    yield read_value()
+                    sep = peek()
+                    pos += 1
+                    if sep == ']':
+                        break
+                    if sep != ',':
+                        raise ValueError(f"Malformed JSON stream: unexpected '{sep or 'EOF'}' in '{key}' array")
+        else:
+            read_value()
+        sep = peek()
+        pos += 1
+        if sep == '}':
+            return
+        if sep != ',':
+            raise ValueError(f"Malformed JSON stream: unexpected '{sep or 'EOF'}' in object")
+
+
+def stream_response_auctions(resp, realm_id=None, last_modified=None):
+    """
+    Yield auctions from a streamed response body, closing the connection when done.
+
+    When realm_id is given, the raw body is archived as it streams past and its size is
+    recorded in scan_metrics.
+    """
+    received = [0]
+
+    def counted(chunks):
+        for chunk in chunks:
+            received[0] += len(chunk)
+            yield chunk
+
+    chunks = counted(resp.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+    if realm_id is not None:
+        chunks = tee_snapshot_chunks(chunks, realm_id, last_modified)
+    try:
+        yield from iter_json_array_items(chunks, 'auctions')
+        # Drain trailing bytes so the archive copy is complete
+        for _ in chunks:
+            pass
+    finally:
+        if realm_id is not None:
+            chunks.close()
+            scan_metrics.observe_realm(realm_id, bytes=received[0])
+        resp.close()
+
+
+def fetch_realm_auctions(session, realm_id, if_modified_since=None, stream=None, decode=True):
+    """
+    Download a connected realm's auction snapshot, optionally as a conditional request.
+
+    Args:
+        session (requests.Session): Active HTTP session.
+        realm_id (int): Connected realm ID.
+        if_modified_since (str, optional): Last-Modified value from a previous download.
+        stream (bool, optional): Parse auctions incrementally; defaults to STREAM_AUCTIONS.
+        decode (bool): When False, return the raw response body instead of the auctions.
+
+    Returns:
+        tuple: (auctions (list, a generator when streaming, or bytes when not decoding) or None
+        if the snapshot is unchanged, last_modified (str or None)).
+
+    Every downloaded body is also written to the snapshot archive (see archive_raw_snapshot).
+    The request is timed as the 'download' phase; its latency (until the body is read, or until
+    the headers arrive when streaming) and body size are recorded per realm in scan_metrics.
+    """
+    if stream is None:
+        stream = STREAM_AUCTIONS and decode
+    url = f"{BASE_URL.format(region=REGION)}/data/wow/connected-realm/{realm_id}/auctions"
+    params = {'namespace': REGION_NS[REGION]['dynamic'], 'locale': 'en_US'}
+    request_headers = {'If-Modified-Since': if_modified_since} if if_modified_since else None
+    with scan_metrics.phase('download'):
+        started = perf_counter()
+        resp = send_with_retry(session, 'GET', url, params, headers=request_headers, stream=stream)
+        raw = None if stream or resp.status_code == 304 else resp.content
+        latency = perf_counter() - started
+    last_modified = resp.headers.get('Last-Modified') or if_modified_since
+    if resp.status_code == 304:
+        scan_metrics.observe_realm(realm_id, latency_seconds=latency)
+        resp.close()
+        return None, last_modified
+    if stream:
+        scan_metrics.observe_realm(realm_id, latency_seconds=latency)
+        return stream_response_auctions(resp, realm_id, last_modified), last_modified
+    scan_metrics.observe_realm(realm_id, bytes=len(raw), latency_seconds=latency)
+    archive_raw_snapshot(realm_id, last_modified, raw)
+    if not decode:
+        return raw, last_modified
+    with scan_metrics.phase('decode'):
+        return decode_json(raw).get('auctions', []), last_modified
+
+
+def fetch_realm_snapshot(session, realm_id, realm_name, scan_config, decode=True):
+    """
+    Download a realm's auction snapshot unless it is unchanged since the last scan with this config.
+
+    Returns:
+        tuple: (auctions (iterable) or None, last_modified (str or None), cached_results (list or None)).
+        When auctions is None, cached_results holds the stored results to reuse. With
+        decode=False, auctions is the raw response body. Decoded auctions come back as an
+        AuctionTable when AUCTION_TABLES is on.
+
+    In replay mode the snapshot comes from the archive and the API is never contacted; reading
+    it counts as the 'download' phase.
+    """
+    logging.info(f"🔍 Scanning realm ID {realm_id}: {realm_name}")
+    if REPLAY_TIMESTAMP is not None:
+        with scan_metrics.phase('download'):
+            auctions, last_modified = load_archived_auctions(realm_id, REPLAY_TIMESTAMP, decode=decode)
+        if decode:
+            with scan_metrics.phase('decode'):
+                auctions = as_auction_table(realm_id, auctions, last_modified)
+        return auctions, last_modified, None
+
+    snapshot_cache = load_auction_snapshot_cache() if CONDITIONAL_AUCTION_REQUESTS else {}
+    cached = snapshot_cache.get(str(realm_id))
+    if_modified_since = None
+    if cached and cached.get('config_key') == scan_config_fingerprint(scan_config):
+        if_modified_since = cached.get('last_modified')
+
+    auctions, last_modified = fetch_realm_auctions(session, realm_id, if_modified_since, decode=decode)
+    if auctions is None:
+        logging.info(f"♻️  Realm {realm_name} ({realm_id}) unchanged since {last_modified}; reusing {len(cached['results'])} result(s)")
+        increment_stat('auctions_not_modified')
+        return None, last_modified, [dict(r) for r in cached['results']]
+    if decode:
+        with scan_metrics.phase('decode'):
+            auctions = as_auction_table(realm_id, auctions, last_modified)
+    return auctions, last_modified, None
+
+
+def remember_realm_results(realm_id, last_modified, scan_config, results):
+    """Store a realm's results against its snapshot Last-Modified for later conditional requests."""
+    if not CONDITIONAL_AUCTION_REQUESTS or not last_modified:
+        return
+    snapshot_cache = load_auction_snapshot_cache()
+    with snapshot_cache_lock:
+        snapshot_cache[str(realm_id)] = {
+            'last_modified': last_modified,
+            'config_key': scan_config_fingerprint(scan_config),
+            'results': results,
+        }
+
+
+def scan_realm_with_bonus_analysis(session, headers, realm_id, realm_name, item_cache, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters):
+    """
+    Download one realm's auctions and return the listings that pass every filter.
+
+    When CONDITIONAL_AUCTION_REQUESTS is on and the snapshot has not changed since the last
+    scan with the same config, the stored results are reused instead of re-parsing the payload.
+    """
+    auctions, last_modified, cached_results = fetch_realm_snapshot(session, realm_id, realm_name, scan_config)
+    if auctions is None:
+        return cached_results
+
+    results = evaluate_realm_auctions(
+        session, headers, realm_id, auctions,
+        item_cache, raidbots_data, fallback_data, curve_data,
+        scan_config, active_filters, max_stat_filters
+    )
+    remember_realm_results(realm_id, last_modified, scan_config, results)
+    return results
+
+
+def bonus_signature(auc, item):
+    """Canonical form of an auction's bonus IDs: auction-level and item-level IDs, de-duplicated and sorted."""
+    return tuple(sorted(set(auc.get('bonus_lists', []) + item.get('bonus_lists', []))))
+
+
+def merged_bonus_ids(auc, item):
+    """Combine auction-level and item-level bonus IDs into one de-duplicated, sorted list."""
+    return list(bonus_signature(auc, item))
+
+
+def passes_bonus_prefilter(bonuses, raidbots_data, fallback_data, active_filters, max_stat_filters):
+    """
+    Cheap bonus-ID checks that need no item metadata: required filter types and Max-{Stat}.
+
+    Returns:
+        bool: True if the bonus list satisfies every active filter.
+    """
+    if not all(set(bonuses) & active_filters[f] for f in active_filters):
+        return False
+
+    if max_stat_filters:
+        index = get_bonus_index(raidbots_data, fallback_data)
+        for bid in bonuses:
+            entry = index.get(bid)
+            if entry is not None and not entry.max_stats.isdisjoint(max_stat_filters):
+                return True
+        return False
+
+    return True
+
+
+def collect_candidate_auctions(auctions, raidbots_data, fallback_data, active_filters, max_stat_filters):
+    """
+    First pass of a two-phase scan: keep only auctions whose bonus IDs pass the cheap filters.
+
+    Returns:
+        list: Auction entries worth a full evaluation.
+    """
+    if isinstance(auctions, AuctionTable):
+        return collect_table_candidates(auctions, raidbots_data, fallback_data, active_filters, max_stat_filters)
+
+    candidates = []
+    for auc in auctions:
+        item = auc.get('item')
+        if not item or not isinstance(item, dict):
+            continue
+        if passes_bonus_prefilter(merged_bonus_ids(auc, item), raidbots_data, fallback_data, active_filters, max_stat_filters):
+            candidates.append(auc)
+    return candidates
+
+
+def collect_table_candidates(table, raidbots_data, fallback_data, active_filters, max_stat_filters):
+    """
+    collect_candidate_auctions() for an AuctionTable: the bonus checks run once per distinct
+    interned bonus list, and dicts are only rebuilt for the rows that pass.
+    """
+    verdicts = {}
+    rows = []
+    for row, (item_id, key) in enumerate(zip(table.item_ids, table.bonus_keys)):
+        if item_id == MISSING:
+            continue
+        if row in table.own_bonus_rows:
+            auc = table.auction(row)
+            if passes_bonus_prefilter(merged_bonus_ids(auc, auc['item']), raidbots_data, fallback_data, active_filters, max_stat_filters):
+                rows.append(row)
             continue
+        passed = verdicts.get(key)
+        if passed is None:
+            passed = verdicts[key] = passes_bonus_prefilter(
+                list(set(table.bonus_list(row))), raidbots_data, fallback_data, active_filters, max_stat_filters)
+        if passed:
+            rows.append(row)
+    return table.auctions_at(rows)
+
+
+def prefetch_item_metadata(session, headers, item_ids, item_cache, workers=SCAN_WORKERS):
+    """
+    Fill the item metadata store for every uncached item ID using a thread pool.
+
+    Requests share the global rate_limiter, so the batch runs at the API ceiling.
+
+    Returns:
+        int: Number of item IDs that had to be fetched.
+    """
+    from tqdm import tqdm
+    missing = [item_id for item_id in item_ids if item_id not in item_cache]
+    if not missing:
+        return 0
+
+    logging.info(f"📦 Prefetching metadata for {len(missing)} item(s) with {workers} worker(s)...")
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='item-prefetch') as executor:
+        futures = [executor.submit(fetch_item_info, session, headers, item_id, item_cache) for item_id in missing]
+        for future in tqdm(as_completed(futures), total=len(futures), desc='Metadata', unit='item'):
+            future.result()
+    item_cache.flush()
+    return len(missing)
+
+
+# === SCAN PLAN ===
+# A ScanConfig compiled into ordered predicates. 'auction' predicates read only the listing and run
+# for every auction; 'metadata' predicates need the item endpoint and run once per memo key. Every
+# predicate counts how often it passes, and reorder() moves cheap, selective predicates to the front.
+PLAN_MIN_REJECT_RATE = 0.01  # Floor on the reject rate when ranking, so never-rejecting predicates sort by cost
+OFF_HAND_SLOTS = frozenset({"Held In Off-hand", "Off-Hand", "Off Hand", "Holdable"})
+# Interned bonus lists: the canonical signature plus everything the plan derives from it
+SignatureInfo = namedtuple('SignatureInfo', ['signature', 'passed', 'is_legacy', 'curve_id'])
+
+
+class Predicate:
+    """
+    One filter of a ScanPlan. check() returns None when the listing passes, otherwise the
+    rejection message. The counters are updated without a lock, so with realm worker threads
+    they are approximate; they only steer the ordering.
+    """
+    __slots__ = ('name', 'cost', 'check', 'evaluated', 'passed')
+
+    def __init__(self, name, cost, check):
+        self.name = name
+        self.cost = cost
+        self.check = check
+        self.evaluated = 0
+        self.passed = 0
+
+    @property
+    def pass_rate(self):
+        return self.passed / self.evaluated if self.evaluated else 1.0
+
+    def rank(self):
+        """Expected cost per rejected listing; lower ranks run first."""
+        return self.cost / max(1.0 - self.pass_rate, PLAN_MIN_REJECT_RATE)
+
+
+class ListingContext:
+    """One listing under the metadata predicates; derived values are computed on first use."""
+
+    def __init__(self, plan, auc, item, bonuses, info):
+        self.plan = plan
+        self.auc = auc
+        self.item = item
+        self.bonuses = bonuses
+        self.info = info
+
+    @cached_property
+    def observed_ilvl(self):
+        return get_observed_ilvl(self.auc, self.info)
+
+    @cached_property
+    def stat_check(self):
+        """filter_stat_bonuses() result: (passed, stat check lines, reason)."""
+        plan = self.plan
+        return filter_stat_bonuses(self.bonuses, plan.raidbots_data, plan.fallback_data, plan.scan_config, self.info)
+
+    @cached_property
+    def level(self):
+        """(final ilvl, reason) from the legacy or retail curve, or the bonus-based fallback."""
+        plan = self.plan
+        bonuses = self.bonuses
+        bonus_index = plan.bonus_index
+        observed_ilvl = self.observed_ilvl
+        final_ilvl = None
+        level_reason = ""
+
+        modifiers = self.auc.get("modifiers") or self.auc.get("item_modifiers") or self.item.get("modifiers", [])
+        if not isinstance(modifiers, list):
+            modifiers = []
+
+        if any(b in LEGACY_BONUS_IDS for b in bonuses):
+            try:
+                player_level = next((m["value"] for m in modifiers if m["type"] == 9), None)
+                if player_level:
+                    curve_id = next((str(entry.curve_id) for b in bonuses
+                                     if (entry := bonus_index.get(b)) and entry.curve_id is not None), None)
+                    if curve_id:
+                        final_ilvl = curve_legacy_ilvl(plan.curve_data, curve_id, player_level)
+                        level_reason = f"✅ Legacy curve {curve_id} @ level {player_level}"
+                    else:
+                        level_reason = "⛔ No curveId in legacy bonus IDs"
+                else:
+                    level_reason = "⛔ No modifier type 9 (player level)"
+            except Exception as e:
+                level_reason = f"⛔ Curve logic error: {e}"
+
+            if not final_ilvl:
+                final_ilvl = observed_ilvl
+                level_reason += " | fallback to observed"
+        else:
+            curve_id = next((entry.curve_id for b in bonuses
+                             if (entry := bonus_index.get(b)) and entry.curve_id is not None), None)
+            if curve_id:
+                _, corrected_ilvl = curve_nearest_point(plan.curve_data, curve_id, observed_ilvl)
+                final_ilvl = corrected_ilvl or observed_ilvl
+                level_reason = f"✅ Retail curve {curve_id} inferred"
+            else:
+                final_ilvl = infer_ilvl_from_bonus_ids(
+                    observed_ilvl, bonuses, plan.raidbots_data, plan.fallback_data,
+                    player_level=self.info.get('required_level', 60)
+                ) or observed_ilvl
+                level_reason = "✅ Fallback bonus-based ilvl"
+        return final_ilvl, level_reason
+
+    @property
+    def final_ilvl(self):
+        return self.level[0]
+
+
+class ScanPlan:
+    """
+    A ScanConfig and its filters compiled into staged, cost-ordered predicates.
+
+    The slot and type lists are turned into sets once here instead of for every auction.
+    """
+
+    def __init__(self, scan_config, active_filters, max_stat_filters, raidbots_data, fallback_data, curve_data):
+        self.scan_config = scan_config
+        self.active_filters = active_filters
+        self.max_stat_filters = max_stat_filters
+        self.raidbots_data = raidbots_data
+        self.fallback_data = fallback_data
+        self.curve_data = curve_data
+        self.bonus_index = get_bonus_index(raidbots_data, fallback_data)
+
+        self.allowed_slots = frozenset(s.strip().lower() for s in scan_config.allowed_slots)
+        self.armor_slots = frozenset(scan_config.allowed_armor_slots)
+        self.weapon_slots = frozenset(scan_config.allowed_weapon_slots)
+        self.accessory_slots = frozenset(scan_config.allowed_accessory_slots)
+        self.armor_types = frozenset(scan_config.allowed_armor_types)
+        self.weapon_types = frozenset(scan_config.allowed_weapon_types)
+        self.all_types = frozenset(scan_config.allowed_types)
+        self.curve_levels = {}  # (curve_id, level, legacy) -> final ilvl, for check_modifier_ilvl
+
+        # Always first: its verdict is memoized per bonus signature, so analyse_realm_auctions()
+        # reads it inline and only adds up the counts
+        self.bonus_filters = Predicate('bonus_filters', 0, None)
+        # Listed in their initial order; costs are rough relative CPU costs per call
+        self.stages = {
+            'auction': [
+                Predicate('buyout', 1, self.check_buyout),
+                Predicate('modifier_ilvl', 3, self.check_modifier_ilvl),
+            ],
+            'metadata': [
+                Predicate('slot', 1, self.check_slot),
+                Predicate('armor_type', 1, self.check_armor_type),
+                Predicate('weapon_type', 1, self.check_weapon_type),
+                Predicate('accessory_type', 1, self.check_accessory_type),
+                Predicate('stat_distribution', 4, self.check_stat_distribution),
+                Predicate('ilvl_range', 6, self.check_ilvl_range),
+            ],
+        }
+
+    def first_rejection(self, stage, *args):
+        """Run a stage's predicates in order; returns the first rejection message, or None."""
+        for predicate in self.stages[stage]:
+            predicate.evaluated += 1
+            rejection = predicate.check(*args)
+            if rejection is not None:
+                return rejection
+            predicate.passed += 1
+        return None
+
+    def reorder(self):
+        """Sort every stage by observed cost per rejection (called after each realm)."""
+        for stage, predicates in self.stages.items():
+            self.stages[stage] = sorted(predicates, key=Predicate.rank)
+
+    def report(self):
+        """The predicates in their current order with their observed selectivity."""
+        ordered = [('auction', self.bonus_filters)]
+        ordered += [(stage, p) for stage, predicates in self.stages.items() for p in predicates]
+        return [
+            {'stage': stage, 'name': p.name, 'cost': p.cost, 'evaluated': p.evaluated,
+             'passed': p.passed, 'pass_rate': round(p.pass_rate, 4)}
+            for stage, p in ordered
+        ]
+
+    # === Auction stage: (auc, item, SignatureInfo) ===
+    def check_buyout(self, auc, item, sig):
+        buyout = auc.get('buyout')
+        if buyout is not None and buyout > self.scan_config.MAX_BUYOUT:
+            return f"⛔ Rejected: Buyout {buyout // 10000}g exceeds max {self.scan_config.MAX_BUYOUT // 10000}g\n"
+        return None
+
+    def check_modifier_ilvl(self, auc, item, sig):
+        """The ilvl range check for listings whose final ilvl follows from the curve and modifiers alone."""
+        curve_id = sig.curve_id
+        if type(curve_id) is not int or curve_id <= 0:
+            return None
+        level = modifier_level(auc, item) if sig.is_legacy else auction_observed_ilvl(auc, item)
+        if level == UNKNOWN_LEVEL:
+            return None
+        key = (curve_id, level, sig.is_legacy)
+        final_ilvl = self.curve_levels.get(key)
+        if final_ilvl is None:
+            final_ilvl = self.curve_levels[key] = curve_final_ilvl(self.curve_data, curve_id, level, sig.is_legacy)
+        if final_ilvl == UNKNOWN_LEVEL or self.scan_config.MIN_ILVL <= final_ilvl <= self.scan_config.MAX_ILVL:
+            return None
+        return f"⛔ Rejected: Item level {final_ilvl} is outside allowed range {self.scan_config.MIN_ILVL}–{self.scan_config.MAX_ILVL}\n"
+
+    # === Metadata stage: (ListingContext) ===
+    def check_stat_distribution(self, listing):
+        passed, _, reason = listing.stat_check
+        if not passed:
+            return f"⛔ Rejected: Stat distribution below threshold {reason}\n"
+        return None
+
+    def check_ilvl_range(self, listing):
+        final_ilvl = listing.final_ilvl
+        if not (self.scan_config.MIN_ILVL <= final_ilvl <= self.scan_config.MAX_ILVL):
+            return f"⛔ Rejected: Item level {final_ilvl} is outside allowed range {self.scan_config.MIN_ILVL}–{self.scan_config.MAX_ILVL}\n"
+        return None
+
+    def check_slot(self, listing):
+        slot = listing.info['slot_type']
+        if slot.strip().lower() not in self.allowed_slots:
+            return f"⛔ Rejected: Slot '{slot}' is not in allowed slot list (ALLOWED_ARMOR_SLOTS + ALLOWED_WEAPON_SLOTS + ALLOWED_ACCESSORY_SLOTS)\n"
+        return None
+
+    def check_armor_type(self, listing):
+        slot, item_type = listing.info['slot_type'], listing.info['item_type']
+        if slot in self.armor_slots and item_type not in self.armor_types:
+            return f"⛔ Rejected: Armor type '{item_type}' is not in ALLOWED_ARMOR_TYPES\n"
+        return None
+
+    def check_weapon_type(self, listing):
+        slot, item_type = listing.info['slot_type'], listing.info['item_type']
+        if slot in self.weapon_slots and not (
+                item_type in self.weapon_types or (item_type == "Miscellaneous" and slot in OFF_HAND_SLOTS)):
+            return f"⛔ Rejected: Weapon type '{item_type}' is not in ALLOWED_WEAPON_TYPES (or not a valid off-hand type)\n"
+        return None
+
+    def check_accessory_type(self, listing):
+        slot, item_type = listing.info['slot_type'], listing.info['item_type']
+        if slot in self.accessory_slots and item_type not in self.all_types:
+            return f"⛔ Rejected: Item type '{item_type}' is not in ALLOWED_ARMOR_TYPES + ALLOWED_WEAPON_TYPES\n"
+        return None
+
+
+# === EVALUATION MEMO ===
+# The metadata stage of a listing depends only on the item, its bonus signature and the levels read
+# from its modifiers, so it is evaluated once per (item_id, signature, player level, observed ilvl)
+# and reused across every realm of a scan. Only the auction-stage predicates run per auction.
+ListingVerdict = namedtuple('ListingVerdict', ['listing', 'rejection', 'stat1', 'stat2', 'max_ilvl'])
+SIGNATURE_MEMO_SIZE = 500000  # Distinct raw bonus lists remembered before the signature memo is cleared
+MEMO_MISS = object()  # verdicts.get() default; a memoized None means the item has no metadata
+ITEM_ILVL = object()  # Observed-ilvl key when the level comes from item metadata
+
+
+class EvaluationMemo:
+    """
+    Per-scan ScanPlan with its memo of bonus signatures and listing verdicts.
+
+    signatures maps the raw (auction, item) bonus lists to a SignatureInfo; verdicts maps
+    evaluation keys to a ListingVerdict, or None when the item has no metadata. Plain dict reads
+    and writes are safe to share between realm worker threads; a race only means the same
+    verdict is computed twice.
+    """
+
+    def __init__(self, plan, key=None):
+        self.plan = plan
+        self.key = key
+        self.signatures = {}
+        self.verdicts = {}
+
+    def signature(self, auc, item):
+        """
+        The interned SignatureInfo of an auction's bonus lists.
+
+        Returns:
+            tuple: (SignatureInfo, was_cached)
+        """
+        auction_bonuses = auc.get('bonus_lists')
+        item_bonuses = tuple(item.get('bonus_lists', ()))
+        raw = item_bonuses if auction_bonuses is None else (tuple(auction_bonuses), item_bonuses)
+        entry = self.signatures.get(raw)
+        if entry is not None:
+            return entry, True
+        if len(self.signatures) >= SIGNATURE_MEMO_SIZE:
+            self.signatures.clear()
+        plan = self.plan
+        signature = bonus_signature(auc, item)
+        if not passes_bonus_prefilter(signature, plan.raidbots_data, plan.fallback_data,
+                                      plan.active_filters, plan.max_stat_filters):
+            # Rejected lists never reach the other predicates, so skip deriving anything else
+            entry = self.signatures[raw] = SignatureInfo(signature, False, False, None)
+            return entry, False
+        entry = self.signatures[raw] = SignatureInfo(
+            signature,
+            True,
+            any(b in LEGACY_BONUS_IDS for b in signature),
+            next((e.curve_id for b in signature if (e := plan.bonus_index.get(b)) and e.curve_id is not None), None),
+        )
+        return entry, False
+
+
+evaluation_memo = None
+evaluation_memo_lock = threading.Lock()
+
+
+def get_evaluation_memo(item_cache, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters):
+    """
+    The shared EvaluationMemo, replaced (with a freshly compiled ScanPlan) whenever the config,
+    filters, datasets or metadata store differ from the ones it was built for.
+    """
+    global evaluation_memo
+    key = (
+        scan_config_fingerprint(scan_config),
+        tuple(sorted((name, id(ids)) for name, ids in active_filters.items())),
+        frozenset(max_stat_filters or ()),
+        id(item_cache), id(raidbots_data), id(fallback_data), id(curve_data),
+    )
+    with evaluation_memo_lock:
+        if evaluation_memo is None or evaluation_memo.key != key:
+            plan = ScanPlan(scan_config, active_filters, max_stat_filters, raidbots_data, fallback_data, curve_data)
+            evaluation_memo = EvaluationMemo(plan, key)
+        return evaluation_memo
+
+
+def reset_evaluation_memo():
+    """Drop every memoized verdict and the plan statistics (called at the start of each scan)."""
+    global evaluation_memo
+    with evaluation_memo_lock:
+        evaluation_memo = None
+
+
+def evaluation_key(auc, item, signature, is_legacy):
+    """
+    Memo key of one listing: (item_id, signature, player level, observed ilvl).
+
+    The player level only matters for legacy items; the observed ilvl is the part of
+    get_observed_ilvl() read from the auction itself (ITEM_ILVL when it falls back to metadata).
+
+    Returns:
+        tuple: The key, or None when the modifiers cannot be read (evaluate without the memo).
+    """
+    try:
+        player_level = None
+        if is_legacy:
+            modifiers = auc.get("modifiers") or auc.get("item_modifiers") or item.get("modifiers", [])
+            if isinstance(modifiers, list):
+                player_level = next((m["value"] for m in modifiers if m["type"] == 9), None)
+        observed = next((mod.get("value") for mod in auc.get("item_modifiers", []) if mod.get("type") == 9), ITEM_ILVL)
+        if observed is ITEM_ILVL:
+            observed = item.get("level") or ITEM_ILVL
+        key = (item['id'], signature, player_level, observed)
+        hash(key)
+    except (KeyError, TypeError, AttributeError):
+        return None
+    return key
 
-        # === Filtering by stat distribution ===
-        if not stat_above_threshold:
-            if PRINT_FULL_METADATA:
-                print(f"⛔ Rejected: Stat distribution below threshold {stat_threshold_reason}\n")
+
+def evaluate_listing(session, headers, auc, item, bonuses, item_cache, plan):
+    """
+    Fetch the item's metadata and run the plan's metadata stage; the stat display strings
+    are only built for listings that pass.
+
+    Returns:
+        ListingVerdict: rejection is None when the listing passes, or the reason it does not.
+        None if the item has no metadata.
+    """
+    info = fetch_item_info(session, headers, item['id'], item_cache)
+    if info is None:
+        return None
+
+    listing = ListingContext(plan, auc, item, bonuses, info)
+    rejection = plan.first_rejection('metadata', listing)
+    if rejection is not None:
+        return ListingVerdict(listing, rejection, None, None, None)
+
+    # === Stat1/Stat2 extraction ===
+    stat1, stat2 = extract_stat_display_strings(item['id'], bonuses, plan.raidbots_data, item_cache, color=False)
+    return ListingVerdict(listing, None, stat1, stat2, upgrade_max_ilvl(bonuses, listing.final_ilvl))
+
+
+def listing_trace_fields(auc, item, bonuses, verdict):
+    """The full debug metadata of one evaluated listing, as trace event fields."""
+    listing = verdict.listing
+    info = listing.info
+    final_ilvl, level_reason = listing.level
+    _, stat_check_details, _ = listing.stat_check
+    modifiers = auc.get("modifiers") or auc.get("item_modifiers") or auc.get("item", {}).get("modifiers", [])
+    if not isinstance(modifiers, list):
+        modifiers = []
+
+    return {
+        'name': info['name'],
+        'observed_ilvl': listing.observed_ilvl,
+        'final_ilvl': final_ilvl,
+        'level_reason': level_reason,
+        'required_level': info.get('required_level'),
+        'item_type': info.get('item_type', 'Unknown'),
+        'slot_type': info.get('slot_type', 'Unknown'),
+        'bonus_ids': bonuses,
+        'stat_matches': {bid: STAT_ID_SOURCES[bid] for bid in bonuses if STAT_ID_SOURCES.get(bid)},
+        'stat_check': stat_check_details,
+        'modifiers': [[m.get('type'), m.get('value')] for m in modifiers if isinstance(m, dict)],
+        'buyout': auc.get('buyout'),
+    }
+
+
+def analyse_realm_auctions(session, headers, realm_id, auctions, item_cache, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters):
+    """
+    Apply bonus, stat, ilvl, price, slot and type filters to a realm's auction listings.
+
+    The filters run as the compiled ScanPlan: the auction stage (bonus IDs, buyout, curve ilvl)
+    for every listing, then the metadata stage once per memo key (see EvaluationMemo). The plan
+    is re-ordered from the observed selectivity after each realm. Listings past the bonus check
+    are reported to the debug trace when one is active.
+    """
+    results = []
+    memo = get_evaluation_memo(item_cache, raidbots_data, fallback_data, curve_data,
+                               scan_config, active_filters, max_stat_filters)
+    plan = memo.plan
+    hits = misses = signature_hits = bonus_rejected = 0
+    evaluated = 0
+    tracing = active_trace
+
+    for auc in auctions:
+        item = auc.get('item')
+        if not item or not isinstance(item, dict):
             continue
 
-        # === Filtering by slot and type ===
-        slot = info['slot_type']
-        item_type = info['item_type']
+        sig, cached = memo.signature(auc, item)
+        evaluated += 1
+        signature_hits += cached
 
-        if not (scan_config.MIN_ILVL <= final_ilvl <= scan_config.MAX_ILVL):
-            if PRINT_FULL_METADATA:
-                print(f"⛔ Rejected: Item level {final_ilvl} is outside allowed range {scan_config.MIN_ILVL}–{scan_config.MAX_ILVL}\n")
+        # === Checks on the listing itself (no item metadata) ===
+        if not sig.passed:
+            bonus_rejected += 1
+            continue
+        rejection = plan.first_rejection('auction', auc, item, sig)
+        if rejection is not None:
+            if tracing is not None and tracing.wants(realm_id, item['id']):
+                tracing.emit('listing', realm_id=realm_id, item_id=item['id'], stage='auction',
+                             accepted=False, reason=rejection, buyout=auc.get('buyout'))
             continue
 
-        if slot.strip().lower() not in {s.strip().lower() for s in scan_config.allowed_slots}:
-            if PRINT_FULL_METADATA:
-                print(f"⛔ Rejected: Slot '{slot}' is not in allowed slot list (ALLOWED_ARMOR_SLOTS + ALLOWED_WEAPON_SLOTS + ALLOWED_ACCESSORY_SLOTS)\n")
+        bonuses = list(sig.signature)
+        key = evaluation_key(auc, item, sig.signature, sig.is_legacy)
+        verdict = memo.verdicts.get(key, MEMO_MISS) if key is not None else MEMO_MISS
+        if verdict is MEMO_MISS:
+            misses += 1
+            job_checkpoint()
+            verdict = evaluate_listing(session, headers, auc, item, bonuses, item_cache, plan)
+            if key is not None:
+                memo.verdicts[key] = verdict
+        else:
+            hits += 1
+        if verdict is None:
             continue
 
-        if slot in scan_config.allowed_armor_slots and item_type not in scan_config.allowed_armor_types:
-            if PRINT_FULL_METADATA:
-                print(f"⛔ Rejected: Armor type '{item_type}' is not in ALLOWED_ARMOR_TYPES\n")
+        if tracing is not None and tracing.wants(realm_id, item['id']):
+            tracing.emit('listing', realm_id=realm_id, item_id=item['id'], stage='metadata',
+                         accepted=verdict.rejection is None, reason=verdict.rejection,
+                         **listing_trace_fields(auc, item, bonuses, verdict))
+        if verdict.rejection:
             continue
 
-        if slot in scan_config.allowed_weapon_slots:
-            if not (item_type in scan_config.allowed_weapon_types or
-                    (item_type == "Miscellaneous" and slot in {"Held In Off-hand", "Off-Hand", "Off Hand", "Holdable"})):
-                if PRINT_FULL_METADATA:
-                    print(f"⛔ Rejected: Weapon type '{item_type}' is not in ALLOWED_WEAPON_TYPES (or not a valid off-hand type)\n")
-                continue
+        info = verdict.listing.info
+        results.append({
+            'realm_id': realm_id,
+            'item_id': item['id'],
+            'name': info['name'],
+            'ilvl': verdict.listing.final_ilvl,
+            'max_ilvl': verdict.max_ilvl,
+            'quantity': auc.get('quantity'),
+            'buyout': auc.get('buyout'),
+            'type': info.get('item_type'),
+            'slot': info.get('slot_type'),
+            'bonus_lists': bonuses,
+            'stat1': verdict.stat1,
+            'stat2': verdict.stat2
+        })
+
+    plan.bonus_filters.evaluated += evaluated
+    plan.bonus_filters.passed += evaluated - bonus_rejected
+    plan.reorder()
+    with stats_lock:
+        debug_stats['evaluation_memo_hits'] += hits
+        debug_stats['evaluation_memo_misses'] += misses
+        debug_stats['signature_hits'] += signature_hits
+        debug_stats['signature_misses'] += evaluated - signature_hits
+    return results
+
+
+# === VECTORIZED FILTER ENGINE ===
+# Bonus lists stored CSR-style: the bonus IDs of list i are values[offsets[i]:offsets[i + 1]]
+# (item and auction-level IDs, possibly repeated); rows maps every entry back to its list.
+BonusCSR = namedtuple('BonusCSR', ['offsets', 'values', 'rows'])
+# Column layout of one batch of auction dicts; bonuses holds one list per auction
+AuctionArrays = namedtuple('AuctionArrays', ['auctions', 'item_ids', 'buyouts', 'bonuses'])
+UNKNOWN_LEVEL = -1  # Missing/unusable modifier level or auction-level ilvl
+
+
+@lru_cache(maxsize=None)
+def load_numpy():
+    """Import numpy on first use and bind it to `np`; returns None when numpy is not installed."""
+    global np
+    try:
+        import numpy
+    except ImportError:
+        return None
+    np = numpy
+    return np
+
+
+def scan_engine():
+    """The filter engine in effect: SCAN_ENGINE, or 'python' when numpy is not installed."""
+    return 'numpy' if SCAN_ENGINE == 'numpy' and load_numpy() is not None else 'python'
+
+
+def evaluate_realm_auctions(session, headers, realm_id, auctions, item_cache, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters):
+    """
+    Run analyse_realm_auctions() through the configured filter engine; both return identical results.
+
+    Timed as the 'filter' phase (less any metadata_fetch inside it).
+    """
+    with scan_metrics.phase('filter'):
+        if scan_engine() == 'numpy' or isinstance(auctions, AuctionTable):
+            auctions = metadata_free_candidates(auctions, raidbots_data, fallback_data, curve_data,
+                                                scan_config, active_filters, max_stat_filters)
+        return analyse_realm_auctions(
+            session, headers, realm_id, auctions,
+            item_cache, raidbots_data, fallback_data, curve_data,
+            scan_config, active_filters, max_stat_filters
+        )
+
+
+def metadata_free_candidates(auctions, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters):
+    """
+    The auctions that pass every check needing no item metadata, in their original order.
+
+    The numpy engine applies all of those checks; the python engine only the bonus-ID ones.
+    """
+    if scan_engine() != 'numpy':
+        return collect_candidate_auctions(auctions, raidbots_data, fallback_data, active_filters, max_stat_filters)
+    return [
+        auc for batch in iter_auction_batches(auctions)
+        for auc in vectorized_survivors(batch, raidbots_data, fallback_data, curve_data,
+                                        scan_config, active_filters, max_stat_filters)
+    ]
+
+
+def iter_auction_batches(auctions, batch_size=VECTOR_BATCH_SIZE):
+    """Yield lists of at most batch_size auctions; streamed snapshots stay bounded in memory."""
+    if isinstance(auctions, AuctionTable) or (isinstance(auctions, list) and len(auctions) <= batch_size):
+        yield auctions
+        return
+    batch = []
+    for auc in auctions:
+        batch.append(auc)
+        if len(batch) >= batch_size:
+            job_checkpoint()
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def modifier_level(auc, item):
+    """
+    Player level from the first type-9 modifier, read exactly as analyse_realm_auctions() does.
+
+    Returns:
+        int: The level, or UNKNOWN_LEVEL if it is missing, not a positive int, or unreadable.
+    """
+    modifiers = auc.get("modifiers") or auc.get("item_modifiers") or item.get("modifiers", [])
+    if not isinstance(modifiers, list):
+        return UNKNOWN_LEVEL
+    try:
+        level = next((m["value"] for m in modifiers if m["type"] == 9), None)
+    except (KeyError, TypeError):
+        return UNKNOWN_LEVEL
+    return level if type(level) is int and level > 0 else UNKNOWN_LEVEL
+
+
+def auction_observed_ilvl(auc, item):
+    """The part of get_observed_ilvl() that needs no item metadata (UNKNOWN_LEVEL otherwise)."""
+    for mod in auc.get("item_modifiers", []):
+        if mod.get("type") == 9:
+            level = mod.get("value")
+            return level if type(level) is int and level >= 0 else UNKNOWN_LEVEL
+    level = item.get("level")
+    return level if type(level) is int and level > 0 else UNKNOWN_LEVEL
+
+
+def build_auction_arrays(auctions):
+    """
+    Convert a list of auction dicts into AuctionArrays, skipping entries without an item dict.
 
-        if slot in scan_config.allowed_accessory_slots and item_type not in scan_config.allowed_types:
-            if PRINT_FULL_METADATA:
-                print(f"⛔ Rejected: Item type '{item_type}' is not in ALLOWED_ARMOR_TYPES + ALLOWED_WEAPON_TYPES\n")
+    One Python pass collects the per-auction values; everything after it is numpy.
+    """
+    kept, item_ids, buyouts, bonus_lists = [], [], [], []
+    for auc in auctions:
+        item = auc.get('item')
+        if not item or not isinstance(item, dict):
             continue
+        kept.append(auc)
+        item_ids.append(item.get('id', 0))
+        buyout = auc.get('buyout')
+        buyouts.append(MISSING if buyout is None else buyout)
+        if 'bonus_lists' in auc:
+            bonus_lists.append(auc['bonus_lists'] + item.get('bonus_lists', []))
+        else:
+            bonus_lists.append(item.get('bonus_lists', []))
 
-        if PRINT_FULL_METADATA:
-            print(f"✅ Accepted | item_type: '{item_type}' in allowed list\n              "
-                  f"slot_type: '{slot}' in allowed slots\n")
+    return AuctionArrays(
+        auctions=kept,
+        item_ids=np.array(item_ids, dtype=np.int64),
+        buyouts=np.array(buyouts, dtype=np.float64),
+        bonuses=bonus_csr(bonus_lists),
+    )
 
-        results.append(result)
 
-    return results
+def bonus_csr(bonus_lists):
+    """Pack a sequence of bonus ID lists into a BonusCSR."""
+    lengths = np.fromiter(map(len, bonus_lists), dtype=np.int64, count=len(bonus_lists))
+    offsets = np.zeros(len(bonus_lists) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return BonusCSR(
+        offsets=offsets,
+        values=np.fromiter(chain.from_iterable(bonus_lists), dtype=np.int64, count=int(offsets[-1])),
+        rows=np.repeat(np.arange(len(bonus_lists)), lengths),
+    )
+
+
+def ilvl_keys(auctions, index):
+    """
+    Per-auction inputs of the curve-based final ilvl, read exactly as analyse_realm_auctions() does.
+
+    Returns:
+        tuple: (curve_ids, levels, legacy) arrays; curve ID -1 or level UNKNOWN_LEVEL means the
+        final ilvl depends on item metadata.
+    """
+    curve_ids, levels, legacy = [], [], []
+    for auc in auctions:
+        item = auc['item']
+        bonuses = merged_bonus_ids(auc, item)
+        is_legacy = any(b in LEGACY_BONUS_IDS for b in bonuses)
+        curve_id = next((entry.curve_id for b in bonuses
+                         if (entry := index.get(b)) and entry.curve_id is not None), None)
+        # Curve 0 and non-int curve IDs take other branches in the Python path
+        curve_ids.append(curve_id if type(curve_id) is int and curve_id > 0 else -1)
+        levels.append(modifier_level(auc, item) if is_legacy else auction_observed_ilvl(auc, item))
+        legacy.append(is_legacy)
+    return (np.array(curve_ids, dtype=np.int64), np.array(levels, dtype=np.int64),
+            np.array(legacy, dtype=bool))
+
+
+def bonus_lookup(table, values, default=0):
+    """table[values] for a dense per-bonus-ID table; IDs outside the table read as default."""
+    result = np.full(len(values), default, dtype=table.dtype)
+    in_range = (values >= 0) & (values < len(table))
+    result[in_range] = table[values[in_range]]
+    return result
+
+
+def any_per_list(csr, flags):
+    """Reduce a per-bonus-entry boolean array to 'any bonus of this list is flagged'."""
+    hit = np.zeros(len(csr.offsets) - 1, dtype=bool)
+    hit[csr.rows[flags]] = True
+    return hit
+
+
+def id_table(ids, size):
+    """Dense boolean table over bonus IDs 0..size-1 with the given IDs set."""
+    table = np.zeros(size, dtype=bool)
+    ids = np.fromiter((i for i in ids if isinstance(i, int) and 0 <= i < size), dtype=np.int64)
+    table[ids] = True
+    return table
+
+
+def curve_final_ilvl(curve_data, curve_id, level, legacy):
+    """
+    Final ilvl from a curve, exactly as analyse_realm_auctions() computes it.
+
+    Legacy items walk the curve up to the modifier player level; retail items snap the
+    auction-level ilvl to the closest curve point. Returns UNKNOWN_LEVEL when the result
+    would fall back to item metadata or is not a plain int.
+    """
+    try:
+        if legacy:
+            final_ilvl = curve_legacy_ilvl(curve_data, curve_id, level)
+        else:
+            _, corrected_ilvl = curve_nearest_point(curve_data, curve_id, level)
+            final_ilvl = corrected_ilvl or level
+    except Exception:
+        return UNKNOWN_LEVEL
+    return final_ilvl if type(final_ilvl) is int and final_ilvl else UNKNOWN_LEVEL
+
+
+def bonus_filter_mask(csr, index, active_filters, max_stat_filters):
+    """Which bonus lists of a BonusCSR satisfy every required bonus filter and Max-{Stat}."""
+    values = csr.values
+    table_size = max([max(index, default=0)] + [max(ids, default=0) for ids in active_filters.values()]) + 1
+    mask = np.ones(len(csr.offsets) - 1, dtype=bool)
+    for ids in active_filters.values():
+        mask &= any_per_list(csr, bonus_lookup(id_table(ids, table_size), values))
+    if max_stat_filters:
+        max_ids = [bid for bid, entry in index.items() if not entry.max_stats.isdisjoint(max_stat_filters)]
+        mask &= any_per_list(csr, bonus_lookup(id_table(max_ids, table_size), values))
+    return mask
+
+
+def ilvl_range_mask(auctions, index, curve_data, scan_config):
+    """
+    False for the auctions whose final ilvl is known without item metadata and falls outside
+    MIN_ILVL..MAX_ILVL (legacy curve items, and curve items with an auction-level ilvl).
+    """
+    curve_ids, levels, legacy = ilvl_keys(auctions, index)
+    keep = np.ones(len(auctions), dtype=bool)
+    known = (curve_ids >= 0) & (levels != UNKNOWN_LEVEL)
+    if known.any():
+        keys = np.stack([curve_ids[known], levels[known], legacy[known]], axis=1)
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        finals = np.array([curve_final_ilvl(curve_data, int(c), int(lvl), bool(leg))
+                           for c, lvl, leg in unique_keys], dtype=np.int64)
+        final_ilvl = finals[inverse.reshape(-1)]
+        in_range = (final_ilvl == UNKNOWN_LEVEL) | (
+            (final_ilvl >= scan_config.MIN_ILVL) & (final_ilvl <= scan_config.MAX_ILVL))
+        keep[np.flatnonzero(known)[~in_range]] = False
+    return keep
+
+
+def vectorized_survivors(auctions, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters):
+    """
+    Apply every filter that needs no item metadata as array masks over one batch of auctions.
+
+    Masks: required bonus filters, Max-{Stat} and buyout over the whole batch, then the ilvl
+    range for the remaining auctions whose final ilvl is fully determined by their bonus IDs and
+    modifiers. Everything else is left for the Python path. An AuctionTable is read column-wise,
+    with the bonus checks done once per distinct interned bonus list.
+
+    Returns:
+        list: The auctions that can still match, in their original order.
+    """
+    if not len(auctions):
+        return []
+    index = get_bonus_index(raidbots_data, fallback_data)
+
+    # === Bonus filters and Max-{Stat} ===
+    if isinstance(auctions, AuctionTable):
+        table = auctions
+        keys, key_rows = np.unique(table.column('bonus_keys'), return_inverse=True)
+        groups = bonus_csr([table.pool[k] if k != MISSING else () for k in keys.tolist()])
+        mask = bonus_filter_mask(groups, index, active_filters, max_stat_filters)[key_rows.reshape(-1)]
+        # Auction-level bonus lists are merged with the item's; leave those rows to the Python path
+        mask[sorted(table.own_bonus_rows)] = True
+        mask &= table.column('item_ids') != MISSING
+        buyouts = table.column('buyouts')
+        auctions_at = table.auctions_at
+    else:
+        arrays = build_auction_arrays(auctions)
+        mask = bonus_filter_mask(arrays.bonuses, index, active_filters, max_stat_filters)
+        buyouts = arrays.buyouts
+        auctions_at = lambda rows: [arrays.auctions[i] for i in rows]
+
+    # === Buyout ===
+    mask &= ~((buyouts != MISSING) & (buyouts > scan_config.MAX_BUYOUT))
+
+    # === Item level, where it is known without metadata ===
+    survivors = auctions_at(np.flatnonzero(mask).tolist())
+    if not survivors:
+        return []
+    keep = ilvl_range_mask(survivors, index, curve_data, scan_config)
+    return [auc for auc, kept in zip(survivors, keep) if kept]
 
 
 def write_csv(results, filename=CSV_FILENAME):
@@ -1355,7 +4422,7 @@ def write_csv(results, filename=CSV_FILENAME):
 
     with open(filename, 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=[
-            'realm', 'item_id', 'type', 'slot', 'stat1', 'stat2', 'name', 'ilvl', 'buyout_gold'
+            'realm', 'item_id', 'type', 'slot', 'stat1', 'stat2', 'name', 'ilvl', 'max_ilvl', 'buyout_gold'
         ])
         writer.writeheader()
         for r in results:
@@ -1368,6 +4435,8 @@ def write_csv(results, filename=CSV_FILENAME):
                 'stat2': plain_max_label(r.get('stat2', '—')),
                 'name': r['name'],
                 'ilvl': r['ilvl'],
+                # Results stored by older scans have no max_ilvl
+                'max_ilvl': r.get('max_ilvl', r['ilvl']),
                 'buyout_gold': (int(r['buyout']) // 10000) if r['buyout'] else 0
             })
 
@@ -1402,6 +4471,7 @@ def print_item_row(r, realms, raidbots_data, item_cache, color=True):
     item_id = r['item_id']
     name = r['name']
     ilvl = r['ilvl']
+    max_ilvl = r.get('max_ilvl', ilvl)
     gold = int(r['buyout']) // 10000 if r['buyout'] else 0
     item_type = r.get('type', 'Unknown')
     item_slot = r.get('slot', 'Unknown')
@@ -1414,6 +4484,10 @@ def print_item_row(r, realms, raidbots_data, item_cache, color=True):
     # === Use extracted display function ===
     stat1, stat2 = extract_stat_display_strings(item_id, bonus_ids, raidbots_data, item_cache, color=color)
 
+    # Results reused from an unchanged snapshot have no item metadata cached this run
+    if stat1 == "—" and r.get('stat1', "—") != "—":
+        stat1, stat2 = r['stat1'], r.get('stat2', "—")
+
     # === Align ANSI-colored stat columns ===
     raw1 = strip_ansi(stat1)
     raw2 = strip_ansi(stat2)
@@ -1427,36 +4501,83 @@ def print_item_row(r, realms, raidbots_data, item_cache, color=True):
     slot_str = f"{item_slot:<17}"
     name_str = f"{name:<36}"
     ilvl_str = f"{ilvl:>8}"
+    max_ilvl_str = f"{max_ilvl:>8}"
     gold_str = f"{gold:>13,}".replace(",", "'")
 
     if color:
         ilvl_str = f"\033[94m{ilvl_str}\033[0m"
+        max_ilvl_str = f"\033[94m{max_ilvl_str}\033[0m"
         gold_str = f"{gold_str}\033[33mg\033[0m"
 
-    print(f"{realm_str}{item_id_str}{type_str}{slot_str}{stat1_str}{stat2_str}{name_str}{ilvl_str} {gold_str}")
+    print(f"{realm_str}{item_id_str}{type_str}{slot_str}{stat1_str}{stat2_str}{name_str}{ilvl_str} {max_ilvl_str} {gold_str}")
 
 # === Helper functions for Main() ===
-def prepare_session_and_data():
-    """Authenticates, loads realm map, Raidbots, fallback and curve data, and returns session + data packages."""
-    token = get_token()
-    headers = {'Authorization': f'Bearer {token}'}
+def create_session(headers, pool_size=SCAN_WORKERS):
+    """
+    Build the shared HTTP session used by every worker thread.
+
+    Args:
+        headers (dict): Authorization headers for Blizzard API.
+        pool_size (int): Connections kept open per host; should cover the number of workers.
+
+    Returns:
+        requests.Session: Session with a connection pool sized for concurrent scans.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
     session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max(pool_size, 1), pool_maxsize=max(pool_size, 1) * 2)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = accept_encoding()
     session.headers.update(headers)
+    return session
 
-    load_realm_map(session, headers)
-    raidbots_bundle = fetch_raidbots_data()
-    raidbots_data = raidbots_bundle.get('bonuses', {})
 
-    fallback_data_path = os.path.join(os.path.dirname(BONUS_DATA_FILE), "bonuses.json")
-    with open(fallback_data_path, 'r', encoding='utf-8') as f:
-        fallback_data = json.load(f)
+def prepare_session_and_data(workers=SCAN_WORKERS):
+    """Authenticates, loads realm map, Raidbots, fallback and curve data, and returns session + data packages."""
+    with scan_metrics.phase('token'):
+        token = get_token()
+    headers = {'Authorization': f'Bearer {token}'}
+    session = create_session(headers, pool_size=workers)
+    logging.info(f"🧩 JSON decoder: {JSON_DECODER} | Accept-Encoding: {accept_encoding()}")
 
-    with open(Path(os.path.dirname(BONUS_DATA_FILE)) / "item-curves.json", 'r', encoding='utf-8') as f:
-        curve_data = json.load(f)
+    with scan_metrics.phase('realm_map'):
+        load_realm_map(session, headers)
+    with scan_metrics.phase('dataset_load'):
+        raidbots_data, fallback_data, curve_data = load_scan_datasets()
 
     return session, headers, raidbots_data, fallback_data, curve_data
 
 
+def load_scan_datasets(offline=False):
+    """Loads the Raidbots bonus, fallback and curve data used by the filters."""
+    raidbots_bundle = fetch_raidbots_data(offline=offline)
+    raidbots_data = raidbots_bundle['bonuses']
+
+    # The fallback table is bonuses.json as well; share the parsed copy rather than reading it twice
+    fallback_data = raidbots_data
+    index = get_bonus_index(raidbots_data, fallback_data, use_disk_cache=True)
+    refresh_filter_id_sets(index, raidbots_bundle['bonus-sockets'])
+    refresh_ilvl_tables(raidbots_bundle['bonus-id-levels'], raidbots_bundle['bonus-level-deltas'],
+                        raidbots_bundle['bonus-upgrade-sets'])
+
+    curve_data = raidbots_bundle['item-curves']
+
+    return raidbots_data, fallback_data, curve_data
+
+
+def prepare_replay_data():
+    """Offline counterpart of prepare_session_and_data(): no token, no session, local files only."""
+    with scan_metrics.phase('realm_map'):
+        found = load_realm_map_from_csv()
+    if not found:
+        logging.warning(f"⚠️ {REALM_CSV} not found; replayed realms will be shown by ID")
+    with scan_metrics.phase('dataset_load'):
+        raidbots_data, fallback_data, curve_data = load_scan_datasets(offline=True)
+    return None, {}, raidbots_data, fallback_data, curve_data
+
+
 def determine_realms(test_mode, test_realm):
     """Returns a list of (realm_id, display_name) tuples based on scan type."""
     if test_mode:
@@ -1469,35 +4590,375 @@ def determine_realms(test_mode, test_realm):
         return [(info['id'], info['name']) for info in realm_map.values()][:MAX_REALMS]
 
 
-def scan_realms(realms, session, headers, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters, test_mode):
-    """Performs the full realm scanning loop and returns all matching results."""
-    all_results = []
-    item_cache = {}
+def determine_replay_realms(test_mode, test_realm, replay_at):
+    """Returns (realm_id, display_name) tuples for realms with an archived snapshot at replay_at."""
+    if test_mode:
+        realm_ids = [resolve_realm_input(test_realm)[0]]
+    else:
+        realm_ids = list_archived_realms()
+    names = {info['id']: info['name'] for info in realm_map.values()}
+    realms = [(rid, names.get(rid, str(rid))) for rid in realm_ids
+              if find_archived_snapshot(rid, replay_at) is not None]
+    return realms[:MAX_REALMS]
+
+
+# === STAGED SCAN PIPELINE ===
+class PipelineStage:
+    """
+    Time accounting for one pipeline stage (shared by its threads).
+
+    busy = doing work, idle = waiting for input, blocked = waiting for space downstream.
+    """
+
+    def __init__(self, name, threads=1):
+        self.name = name
+        self.threads = threads
+        self.lock = threading.Lock()
+        self.busy = 0.0
+        self.idle = 0.0
+        self.blocked = 0.0
+        self.items = 0
+
+    def record(self, busy, idle, blocked=0.0):
+        with self.lock:
+            self.busy += busy
+            self.idle += idle
+            self.blocked += blocked
+            self.items += 1
+
+    def summary(self):
+        with self.lock:
+            total = self.busy + self.idle + self.blocked
+            return {
+                'threads': self.threads,
+                'items': self.items,
+                'busy_s': round(self.busy, 3),
+                'idle_s': round(self.idle, 3),
+                'blocked_s': round(self.blocked, 3),
+                'utilisation': round(self.busy / total, 3) if total else 0.0,
+            }
+
+
+class StageQueue(queue.Queue):
+    """Bounded queue between two pipeline stages that tracks its depth over time."""
+
+    def __init__(self, name, maxsize):
+        super().__init__(maxsize=maxsize)
+        self.name = name
+        self.max_depth = 0
+        self.depth_total = 0
+        self.depth_samples = 0
+
+    def _put(self, item):
+        super()._put(item)
+        depth = len(self.queue)
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_total += depth
+        self.depth_samples += 1
+
+    def put_unless_stopped(self, item, stop_event):
+        """Block while the queue is full (backpressure), giving up if the pipeline is stopping."""
+        while not stop_event.is_set():
+            try:
+                self.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def summary(self):
+        with self.mutex:
+            return {
+                'capacity': self.maxsize,
+                'depth': len(self.queue),
+                'max_depth': self.max_depth,
+                'avg_depth': round(self.depth_total / self.depth_samples, 2) if self.depth_samples else 0.0,
+            }
+
+
+# Stage and queue statistics from the most recent pipeline scan (empty if none ran)
+pipeline_stats = {}
+
+
+def scan_realms_pipeline(realms, session, headers, item_cache, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters, test_mode, workers=SCAN_WORKERS, max_buffered=PIPELINE_MAX_BUFFERED):
+    """
+    Pipelined variant of scan_realms(): fetch -> decode -> filter, connected by bounded queues.
+
+    `workers` threads download raw snapshots, one thread decodes them and the calling thread
+    runs the filter loop, so downloading realm N+1 overlaps with analysing realm N. Each queue
+    holds at most `max_buffered` snapshots; when the filter stage falls behind, decoding and
+    then downloading block instead of piling decoded snapshots up in memory.
+    """
+    from tqdm import tqdm
+    fetch_stage = PipelineStage('fetch', threads=max(workers, 1))
+    decode_stage = PipelineStage('decode')
+    filter_stage = PipelineStage('filter')
+    raw_queue = StageQueue('fetch→decode', max_buffered)
+    decoded_queue = StageQueue('decode→filter', max_buffered)
+    realm_queue = queue.Queue()
+    for idx, realm in enumerate(realms):
+        realm_queue.put((idx, realm))
+
+    stop_event = threading.Event()
+    fetchers_left = [fetch_stage.threads]
+    fetchers_lock = threading.Lock()
+    done = object()
+
+    def fetch_worker():
+        idle_since = perf_counter()
+        try:
+            while not stop_event.is_set():
+                try:
+                    idx, (rid, display_name) = realm_queue.get_nowait()
+                except queue.Empty:
+                    break
+                started = perf_counter()
+                try:
+                    payload, last_modified, cached_results = fetch_realm_snapshot(
+                        session, rid, display_name, scan_config, decode=False
+                    )
+                    item = (idx, payload, last_modified, cached_results, None)
+                except Exception as e:
+                    item = (idx, None, None, None, e)
+                finished = perf_counter()
+                raw_queue.put_unless_stopped(item, stop_event)
+                fetch_stage.record(finished - started, started - idle_since, perf_counter() - finished)
+                idle_since = perf_counter()
+        finally:
+            with fetchers_lock:
+                fetchers_left[0] -= 1
+                last = fetchers_left[0] == 0
+            if last:
+                raw_queue.put_unless_stopped(done, stop_event)
+
+    def decode_worker():
+        idle_since = perf_counter()
+        while not stop_event.is_set():
+            try:
+                item = raw_queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if item is done:
+                decoded_queue.put_unless_stopped(done, stop_event)
+                return
+            started = perf_counter()
+            idx, payload, last_modified, cached_results, error = item
+            auctions = None
+            if payload is not None and error is None:
+                try:
+                    with scan_metrics.phase('decode'):
+                        auctions = as_auction_table(realms[idx][0], decode_json(payload).get('auctions', []), last_modified)
+                except Exception as e:
+                    error = e
+            del payload
+            finished = perf_counter()
+            decoded_queue.put_unless_stopped((idx, auctions, last_modified, cached_results, error), stop_event)
+            decode_stage.record(finished - started, started - idle_since, perf_counter() - finished)
+            idle_since = perf_counter()
+
+    threads = [
+        threading.Thread(target=fetch_worker, name=f'pipeline-fetch-{i}', daemon=True)
+        for i in range(fetch_stage.threads)
+    ]
+    threads.append(threading.Thread(target=decode_worker, name='pipeline-decode', daemon=True))
+    for t in threads:
+        t.start()
+
+    per_realm_results = [None] * len(realms)
+    try:
+        with tqdm(total=len(realms), desc='Scanning', unit='realm') as progress:
+            idle_since = perf_counter()
+            while True:
+                item = decoded_queue.get()
+                if item is done:
+                    break
+                started = perf_counter()
+                idx, auctions, last_modified, cached_results, error = item
+                if error is not None:
+                    raise error
+                rid, display_name = realms[idx]
+                if auctions is None:
+                    results = cached_results
+                else:
+                    results = evaluate_realm_auctions(
+                        session, headers, rid, auctions,
+                        item_cache, raidbots_data, fallback_data, curve_data,
+                        scan_config, active_filters, max_stat_filters
+                    )
+                    remember_realm_results(rid, last_modified, scan_config, results)
+                del auctions
+                per_realm_results[idx] = results
+                mark_realm_scanned(rid, display_name, test_mode)
+                filter_stage.record(perf_counter() - started, started - idle_since)
+                progress.update(1)
+                idle_since = perf_counter()
+    finally:
+        stop_event.set()
+        for t in threads:
+            t.join()
+        pipeline_stats.clear()
+        pipeline_stats.update({
+            'stages': {stage.name: stage.summary() for stage in (fetch_stage, decode_stage, filter_stage)},
+            'queues': {q.name: q.summary() for q in (raw_queue, decoded_queue)},
+        })
+
+    return [r for realm_results in per_realm_results for r in realm_results]
+
+
+def mark_realm_scanned(rid, display_name, test_mode):
+    """Count a finished realm and record its scan timestamp (skipped for single-realm test scans)."""
+    increment_stat('realms_scanned')
+    job = active_job
+    if job is not None:
+        job.realms_done += 1
+    if not test_mode:
+        try:
+            update_single_scan_timestamp(rid, display_name)
+        except Exception as e:
+            logging.warning(f"⚠️ Failed to write scan cache for realm {display_name} ({rid}): {e}")
+
 
-    for rid, display_name in tqdm(realms, desc='Scanning', unit='realm'):
-        all_results.extend(
-            scan_realm_with_bonus_analysis(
+def finish_scan_caches(item_cache):
+    """Persist the snapshot cache and item store, and apply the archive retention limits."""
+    save_auction_snapshot_cache()
+    if ARCHIVE_AUCTION_SNAPSHOTS and REPLAY_TIMESTAMP is None:
+        prune_snapshot_archive()
+    item_cache.flush()
+
+
+def scan_mode_label(two_phase, pipeline):
+    """The scan loop scan_realms() runs for these flags ('two-phase' wins over 'pipeline')."""
+    if two_phase:
+        return 'two-phase'
+    return 'pipeline' if pipeline else 'concurrent'
+
+
+def scan_realms(realms, session, headers, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters, test_mode, workers=SCAN_WORKERS, two_phase=TWO_PHASE_SCAN, pipeline=PIPELINE_SCAN):
+    """
+    Performs the full realm scanning loop and returns all matching results.
+
+    With workers > 1, up to that many realm auction downloads are kept in flight on the
+    shared session. Results are still returned in the order of `realms`, and each realm's
+    scan timestamp is written as soon as that realm finishes.
+    """
+    from tqdm import tqdm
+    item_cache = get_item_store()
+    reset_evaluation_memo()
+
+    mode = scan_mode_label(two_phase, pipeline)
+    if mode != 'concurrent':
+        scan_mode = scan_realms_two_phase if mode == 'two-phase' else scan_realms_pipeline
+        all_results = scan_mode(
+            realms, session, headers, item_cache,
+            raidbots_data, fallback_data, curve_data,
+            scan_config, active_filters, max_stat_filters, test_mode, workers
+        )
+        finish_scan_caches(item_cache)
+        return all_results, item_cache
+
+    def scan_one(rid, display_name):
+        job_checkpoint()
+        with profile_realm(rid):
+            return scan_realm_with_bonus_analysis(
                 session, headers, rid, display_name,
                 item_cache, raidbots_data, fallback_data, curve_data,
                 scan_config, active_filters, max_stat_filters
             )
-        )
-        if not test_mode:
-            try:
-                update_single_scan_timestamp(rid, display_name)
-            except Exception as e:
-                logging.warning(f"⚠️ Failed to write scan cache for realm {display_name} ({rid}): {e}")
-    
+
+    if workers <= 1 or len(realms) <= 1:
+        all_results = []
+        for rid, display_name in tqdm(realms, desc='Scanning', unit='realm'):
+            all_results.extend(scan_one(rid, display_name))
+            mark_realm_scanned(rid, display_name, test_mode)
+        finish_scan_caches(item_cache)
+        return all_results, item_cache
+
+    # Keep per-realm results in input order regardless of completion order
+    per_realm_results = [None] * len(realms)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='realm-scan') as executor:
+        futures = {
+            executor.submit(scan_one, rid, display_name): idx
+            for idx, (rid, display_name) in enumerate(realms)
+        }
+        with tqdm(total=len(realms), desc='Scanning', unit='realm') as progress:
+            for future in as_completed(futures):
+                idx = futures[future]
+                rid, display_name = realms[idx]
+                per_realm_results[idx] = future.result()
+                # Timestamp files are only ever written from this thread
+                mark_realm_scanned(rid, display_name, test_mode)
+                progress.update(1)
+
+    finish_scan_caches(item_cache)
+    all_results = [r for realm_results in per_realm_results for r in realm_results]
     return all_results, item_cache
 
 
+def scan_realms_two_phase(realms, session, headers, item_cache, raidbots_data, fallback_data, curve_data, scan_config, active_filters, max_stat_filters, test_mode, workers=SCAN_WORKERS):
+    """
+    Two-phase variant of scan_realms().
+
+    Phase 1 downloads every snapshot (up to `workers` at once) and keeps only the auctions that
+    pass the cheap bonus-ID filters. Phase 2 prefetches metadata for all distinct candidate item
+    IDs in parallel. Phase 3 runs the full evaluation, which then only hits the warm cache.
+    """
+    from tqdm import tqdm
+
+    def collect(rid, display_name):
+        auctions, last_modified, cached_results = fetch_realm_snapshot(session, rid, display_name, scan_config)
+        if auctions is None:
+            return None, last_modified, cached_results
+        with scan_metrics.phase('filter'):
+            candidates = metadata_free_candidates(
+                auctions, raidbots_data, fallback_data, curve_data,
+                scan_config, active_filters, max_stat_filters
+            )
+        return candidates, last_modified, None
+
+    # === Phase 1: download and pre-filter ===
+    collected = [None] * len(realms)
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='realm-fetch') as executor:
+        futures = {
+            executor.submit(collect, rid, display_name): idx
+            for idx, (rid, display_name) in enumerate(realms)
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc='Downloading', unit='realm'):
+            collected[futures[future]] = future.result()
+
+    # === Phase 2: bulk metadata prefetch ===
+    candidate_ids = {
+        auc['item']['id']
+        for candidates, _, _ in collected if candidates
+        for auc in candidates
+    }
+    logging.info(f"🧮 {sum(len(c) for c, _, _ in collected if c)} candidate auction(s) across {len(candidate_ids)} distinct item(s)")
+    prefetch_item_metadata(session, headers, candidate_ids, item_cache, workers)
+
+    # === Phase 3: full evaluation, in realm order ===
+    all_results = []
+    for (rid, display_name), (candidates, last_modified, cached_results) in zip(realms, collected):
+        if candidates is None:
+            results = cached_results
+        else:
+            results = evaluate_realm_auctions(
+                session, headers, rid, candidates,
+                item_cache, raidbots_data, fallback_data, curve_data,
+                scan_config, active_filters, max_stat_filters
+            )
+            remember_realm_results(rid, last_modified, scan_config, results)
+        all_results.extend(results)
+        mark_realm_scanned(rid, display_name, test_mode)
+
+    return all_results
+
+
 def display_results(results, realms, raidbots_data, item_cache, filter_str):
     """Writes CSV and prints output if results exist."""
     if results:
         write_csv(results)
         results.sort(key=lambda x: x['ilvl'], reverse=True)
 
-        print(f"\n{'Realm':<22} {'Item ID':<10} {'Type':<15} {'Slot':<16} {'Stat 1':<15} {'Stat 2':<15} {'Name':<36} {'ilvl':>8} {'Buyout':>11}")
+        print(f"\n{'Realm':<22} {'Item ID':<10} {'Type':<15} {'Slot':<16} {'Stat 1':<15} {'Stat 2':<15} {'Name':<36} {'ilvl':>8} {'Max ilvl':>8} {'Buyout':>11}")
         for r in results:
             print_item_row(r, realms, raidbots_data, item_cache)
         print(f"\033[92m\nFound \033[93m{len(results)} \033[92mitems matching the filters: \033[94m{filter_str}\033[0m\n")
@@ -1505,7 +4966,7 @@ def display_results(results, realms, raidbots_data, item_cache, filter_str):
         # Clear CSV if no results found
         with open(CSV_FILENAME, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=[
-                'realm', 'item_id', 'type', 'slot', 'stat1', 'stat2', 'name', 'ilvl', 'buyout_gold'
+                'realm', 'item_id', 'type', 'slot', 'stat1', 'stat2', 'name', 'ilvl', 'max_ilvl', 'buyout_gold'
             ])
             writer.writeheader()
         logging.info("❌ No matching Speed-stat items found.")
@@ -1517,14 +4978,16 @@ def handle_config_load_error(reason):
     sys.exit(1)
     
     
-def print_scan_summary(start_time, realms_scanned):
-    """Prints performance and cache efficiency statistics."""
+def print_scan_summary(start_time, realms_scanned, report=None):
+    """Prints performance and cache efficiency statistics (with the phase timings of a run report, if given)."""
     total_time = perf_counter() - start_time
     rps_total = debug_stats['blizzard_requests'] / total_time if total_time > 0 else 0
     metadata_total = debug_stats['item_metadata_hits'] + debug_stats['item_metadata_misses']
     cache_hit_rate = debug_stats['item_metadata_hits'] / max(metadata_total, 1)
+    memo_total = debug_stats['evaluation_memo_hits'] + debug_stats['evaluation_memo_misses']
+    signature_total = debug_stats['signature_hits'] + debug_stats['signature_misses']
 
-    if PRINT_FULL_METADATA:
+    if PRINT_SCAN_SUMMARY:
         print("📊 === SCAN SUMMARY ===")
         print(f"⏱️  Time Elapsed          : {total_time:.2f} seconds")
         print(f"🌐 Realms Scanned        : {realms_scanned}")
@@ -1532,10 +4995,293 @@ def print_scan_summary(start_time, realms_scanned):
         print(f"    ├─ Cache Hits        : {debug_stats['item_metadata_hits']}")
         print(f"    └─ Cache Misses      : {debug_stats['item_metadata_misses']}")
         print(f"🎯 Cache Hit Rate        : {cache_hit_rate:.2%}")
+        print(f"🧠 Evaluation Memo       : {debug_stats['evaluation_memo_hits']} hit(s) / {memo_total} "
+              f"({debug_stats['evaluation_memo_hits'] / max(memo_total, 1):.2%})")
+        print(f"    └─ Bonus Signatures  : {debug_stats['signature_hits']} hit(s) / {signature_total} "
+              f"({debug_stats['signature_hits'] / max(signature_total, 1):.2%})")
+        if evaluation_memo is not None:
+            print("🧭 Predicate Plan        :")
+            for p in evaluation_memo.plan.report():
+                print(f"    ├─ {p['stage']:<8} {p['name']:<17}: {p['passed']}/{p['evaluated']} passed ({p['pass_rate']:.1%})")
         print(f"🔁 Blizzard API Requests : {debug_stats['blizzard_requests']}")
         print(f"    ├─ Auction Scans     : {debug_stats['auction_calls']}")
         print(f"    └─ Metadata Fetches  : {debug_stats['blizzard_requests'] - debug_stats['auction_calls']}")
-        print(f"🚀 Effective RPS         : {rps_total:.2f}\n")
+        print(f"♻️  Unchanged Snapshots  : {debug_stats['auctions_not_modified']}")
+        print(f"🚀 Effective RPS         : {rps_total:.2f}")
+        print(f"🚧 Retries (429/timeout) : {debug_stats['rate_limited']} / {debug_stats['request_timeouts']}")
+        levels = rate_limiter.fill_levels()
+        print(f"🪣 Rate Limiter Wait     : {rate_limiter.total_wait:.2f}s "
+              f"(bucket {levels['second']:.0%} sec / {levels['hour']:.0%} hour)")
+        if report is not None:
+            print("⏱️  Phases (thread time) :")
+            for name, p in report['phases'].items():
+                if p['count']:
+                    print(f"    ├─ {name:<15}: {p['seconds']:.2f}s over {p['count']} call(s)")
+            print("📶 Per Realm           :")
+            for name, h in report['histograms'].items():
+                if h['count']:
+                    print(f"    ├─ {name:<22}: avg {h['sum'] / h['count']:.2f}, min {h['min']:.2f}, max {h['max']:.2f}")
+        if pipeline_stats:
+            print("🏭 Pipeline Stages       :")
+            for name, st in pipeline_stats['stages'].items():
+                print(f"    ├─ {name:<7} x{st['threads']:<3}: {st['items']} realm(s), busy {st['busy_s']:.2f}s, "
+                      f"idle {st['idle_s']:.2f}s, blocked {st['blocked_s']:.2f}s ({st['utilisation']:.0%} utilised)")
+            for name, qs in pipeline_stats['queues'].items():
+                print(f"    ├─ {name:<14}: max depth {qs['max_depth']}/{qs['capacity']}, avg {qs['avg_depth']:.2f}")
+        print()
+
+    if active_profiler is not None:
+        print("\n".join(active_profiler.summary_lines()))
+        print()
+
+
+# === IN-PROCESS SCAN ENGINE ===
+# Long-lived scanner for app.py. One background thread runs queued jobs against a warm token,
+# HTTP session, realm map, Raidbots datasets and item metadata store. Each job keeps its own
+# config and writes its CSV and run report to JOB_OUTPUT_DIR/<job id>/. Jobs also overwrite the
+# shared SCAN_REPORT_FILE and append to the scan history on purpose: /report and /metrics read those.
+class ScanCancelled(Exception):
+    """Raised inside a running scan once its job has been cancelled."""
+
+
+class ScanJob:
+    """One submitted scan: its config, output folder, status and realm progress."""
+
+    def __init__(self, job_id, config, directory):
+        self.id = job_id
+        self.config = config
+        self.scan_config = scan_config_from_dict(config)
+        self.test_mode = self.scan_config.scan_mode == "single"
+        self.test_realm = self.scan_config.realm if self.test_mode else None
+        self.directory = directory
+        self.csv_path = os.path.join(directory, os.path.basename(CSV_FILENAME))
+        self.report_path = os.path.join(directory, os.path.basename(SCAN_REPORT_FILE))
+        self.status = 'queued'  # queued -> running -> done | failed | cancelled
+        self.stage = None  # 'preparing', 'scanning' or 'writing' while running
+        self.realms_total = 0
+        self.realms_done = 0
+        self.results = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise ScanCancelled(self.id)
+
+    def to_dict(self):
+        """Status, progress and timings as JSON-friendly values."""
+        def iso(ts):
+            return datetime.fromtimestamp(ts).isoformat(timespec='seconds') if ts else None
+        end = self.finished_at or time.time()
+        return {
+            'id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'realms_done': self.realms_done,
+            'realms_total': self.realms_total,
+            'progress': round(self.realms_done / self.realms_total, 4) if self.realms_total else 0.0,
+            'results': self.results,
+            'error': self.error,
+            'submitted_at': iso(self.submitted_at),
+            'started_at': iso(self.started_at),
+            'finished_at': iso(self.finished_at),
+            'duration_seconds': round(end - self.started_at, 3) if self.started_at else None,
+            'config': self.config,
+        }
+
+
+# The ScanEngine job currently being scanned (progress and cancellation hooks), or None
+active_job = None
+
+
+def job_checkpoint():
+    """Stop the scan with ScanCancelled if the ScanEngine job being scanned was cancelled."""
+    job = active_job
+    if job is not None:
+        job.check_cancelled()
+
+
+class ScanEngine:
+    """
+    Runs scan jobs one at a time on a background thread, keeping the token, HTTP session,
+    realm map, Raidbots datasets and item metadata store warm between jobs.
+
+    Jobs run serially because a scan owns the module's per-run state (scan_metrics, debug_stats,
+    the evaluation memo and FILTER_ID_SETS); the realms of a job are still scanned `workers`
+    at a time. A cancelled job stops at its next Blizzard request or evaluation batch
+    (see job_checkpoint()), so within about one request even mid-realm.
+    """
+
+    def __init__(self, workers=SCAN_WORKERS, output_dir=JOB_OUTPUT_DIR, history_limit=JOB_HISTORY_LIMIT):
+        self.workers = workers
+        self.output_dir = output_dir
+        self.history_limit = history_limit
+        self.jobs = OrderedDict()  # job ID -> ScanJob, oldest first
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.thread = None
+        self.session = None
+        self.headers = None
+        self.token_expires_at = 0
+        self.datasets = None
+        self.datasets_loaded_at = 0
+
+    def start(self):
+        """Load credentials, set up logging (unless the host app has) and start the worker thread, once."""
+        with self.lock:
+            if self.thread is not None:
+                return
+            configure_logging()
+            load_environment()
+            self.thread = threading.Thread(target=self.run, name='scan-engine', daemon=True)
+            self.thread.start()
+
+    def submit(self, config):
+        """
+        Queue a scan and return its ScanJob straight away.
+
+        Args:
+            config (dict): scan_config.json-style profile, including scan_mode and realm.
+
+        Raises:
+            ValueError: If the config is missing required keys.
+        """
+        self.start()
+        job_id = f"{datetime.now():%Y%m%d-%H%M%S}-{os.urandom(3).hex()}"
+        job = ScanJob(job_id, config, os.path.join(self.output_dir, job_id))
+        os.makedirs(job.directory, exist_ok=True)
+        with open(os.path.join(job.directory, 'scan_config.json'), 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2)
+        with self.lock:
+            self.jobs[job.id] = job
+            self.trim_jobs()
+        self.queue.put(job)
+        logging.info(f"📥 Queued scan job {job.id}")
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or stop a running one at its next request. Returns the job (None if unknown)."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            job.cancel_event.set()
+            if job.status == 'queued':
+                job.status = 'cancelled'
+                job.finished_at = time.time()
+        return job
+
+    def trim_jobs(self):
+        """Drop the oldest finished jobs (and their output folders) beyond history_limit. Caller holds the lock."""
+        import shutil
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in finished[:max(len(finished) - self.history_limit, 0)]:
+            del self.jobs[job.id]
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+    def run(self):
+        while True:
+            job = self.queue.get()
+            with self.lock:
+                if job.cancel_event.is_set():
+                    continue
+                job.status = 'running'
+                job.started_at = time.time()
+            try:
+                self.run_job(job)
+                status = 'done'
+            except ScanCancelled:
+                logging.info(f"🛑 Scan job {job.id} cancelled after {job.realms_done}/{job.realms_total} realm(s)")
+                finish_scan_caches(get_item_store())
+                status = 'cancelled'
+            except (Exception, SystemExit) as e:
+                logging.error(f"❌ Scan job {job.id} failed: {e}")
+                job.error = str(e) or type(e).__name__
+                status = 'failed'
+            with self.lock:
+                job.status = status
+                job.stage = None
+                job.finished_at = time.time()
+                self.trim_jobs()
+
+    def warm(self):
+        """Refresh the token (near expiry only), then load the realm map and Raidbots datasets if not yet warm."""
+        if self.session is None or time.time() > self.token_expires_at - 60:
+            with scan_metrics.phase('token'):
+                token = get_token()
+            self.token_expires_at = load_cached_token()[1]
+            self.headers = {'Authorization': f'Bearer {token}'}
+            if self.session is None:
+                self.session = create_session(self.headers, pool_size=self.workers)
+            else:
+                self.session.headers.update(self.headers)
+        if not realm_map:
+            with scan_metrics.phase('realm_map'):
+                load_realm_map(self.session, self.headers)
+        if self.datasets is None or time.time() - self.datasets_loaded_at > RAIDBOTS_CHECK_INTERVAL_HOURS * 3600:
+            with scan_metrics.phase('dataset_load'):
+                self.datasets = load_scan_datasets()
+            self.datasets_loaded_at = time.time()
+        return self.datasets
+
+    def run_job(self, job):
+        """Scan one job's realms and write its CSV and run report to the job folder."""
+        global active_job, region_intern_pool
+        reset_scan_metrics()
+        if not HOLD_REGION_AUCTIONS:
+            # AuctionTables bind the pool when built and none outlives a job, so a fresh pool per
+            # job keeps the warm process from interning every snapshot it ever scanned
+            region_intern_pool = InternPool()
+        job.stage = 'preparing'
+        raidbots_data, fallback_data, curve_data = self.warm()
+        realms = determine_realms(job.test_mode, job.test_realm)
+        normal_filters, max_stat_filters = parse_filter_types(job.scan_config.filter_type)
+        active_filters = {f: FILTER_ID_SETS[f] for f in normal_filters if f in FILTER_ID_SETS}
+        job.realms_total = len(realms)
+        job.stage = 'scanning'
+        job.check_cancelled()
+
+        active_job = job
+        try:
+            results, _ = scan_realms(
+                realms, self.session, self.headers,
+                raidbots_data, fallback_data, curve_data,
+                job.scan_config, active_filters, max_stat_filters, job.test_mode,
+                workers=self.workers, two_phase=False, pipeline=False
+            )
+        finally:
+            active_job = None
+
+        job.stage = 'writing'
+        with scan_metrics.phase('output'):
+            write_csv(results, filename=job.csv_path)
+        job.results = len(results)
+        report = scan_metrics.report(
+            realms=len(realms), results=len(results), profile='custom', filters=job.scan_config.filter_type,
+            mode=scan_mode_label(False, False), workers=self.workers, engine=scan_engine(), stream=STREAM_AUCTIONS, replay=None,
+            job=job.id, intern_pool_entries=len(region_intern_pool),
+        )
+        write_scan_report(report)
+        tmp_path = f"{job.report_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, job.report_path)
+        logging.info(f"✅ Scan job {job.id} found {len(results)} item(s) in {len(realms)} realm(s)")
 
 
 def main():
@@ -1543,10 +5289,40 @@ def main():
     Main entry point for the script.
     Handles authentication, realm loading, scanning, and output.
     """
+    global STREAM_AUCTIONS, REPLAY_TIMESTAMP, SCAN_ENGINE, HOLD_REGION_AUCTIONS, active_profiler
     parser = argparse.ArgumentParser(description="Scan WoW auctions for Speed gear.")
     parser.add_argument('--config', type=str, help='Path to scan_config.json file')
+    parser.add_argument('--workers', type=int, default=SCAN_WORKERS,
+                        help='Number of realms to download and scan concurrently (1 = serial)')
+    parser.add_argument('--stream', action='store_true', default=STREAM_AUCTIONS,
+                        help='Parse auction snapshots incrementally to keep memory flat on large realms')
+    parser.add_argument('--pipeline', action='store_true', default=PIPELINE_SCAN,
+                        help='Overlap downloading, decoding and filtering using bounded stage queues')
+    parser.add_argument('--two-phase', action='store_true', default=TWO_PHASE_SCAN,
+                        help='Pre-filter all realms, then bulk-prefetch item metadata before evaluating')
+    parser.add_argument('--engine', choices=['python', 'numpy'], default=SCAN_ENGINE,
+                        help='Filter engine; numpy applies the metadata-free filters as array masks')
+    parser.add_argument('--region-auctions', action='store_true', default=HOLD_REGION_AUCTIONS,
+                        help=f'Keep every scanned snapshot in memory and write all listings to {REGION_AUCTIONS_CSV}')
+    parser.add_argument('--replay', type=str, metavar='TIMESTAMP',
+                        help="Scan archived snapshots offline as of TIMESTAMP ('latest', epoch seconds or YYYY-MM-DDTHH:MM:SS)")
+    parser.add_argument('--trace', nargs='?', const=TRACE_FILE, metavar='PATH',
+                        help=f'Write request, item and listing debug events as JSON lines (default {TRACE_FILE})')
+    parser.add_argument('--trace-sample', type=float, default=TRACE_SAMPLE_RATE, metavar='RATE',
+                        help='Fraction of trace events kept when no item/realm selector is given (0-1)')
+    parser.add_argument('--trace-item', type=int, action='append', default=[], metavar='ITEM_ID',
+                        help='Only trace this item ID (repeatable; implies --trace)')
+    parser.add_argument('--trace-realm', type=int, action='append', default=[], metavar='REALM_ID',
+                        help='Only trace this connected-realm ID (repeatable; implies --trace)')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'Profile each realm (cProfile + tracemalloc) into {PROFILE_DIR} and print a hotspot summary; scans serially')
     args = parser.parse_args()
 
+    configure_logging()
+    load_environment()
+    from tqdm import tqdm
+    tqdm.get_lock()  # Create tqdm's lock up front so worker threads share it safely
+
     # === Load scan config from file or preset
     if args.config and os.path.exists(args.config):
         try:
@@ -1554,16 +5330,7 @@ def main():
             with open(args.config, "r") as f:
                 config = json.load(f)
 
-            required_keys = [
-                "MIN_ILVL", "MAX_ILVL", "MAX_BUYOUT",
-                "ALLOWED_ARMOR_SLOTS", "ALLOWED_WEAPON_SLOTS", "ALLOWED_ACCESSORY_SLOTS",
-                "ALLOWED_ARMOR_TYPES", "ALLOWED_WEAPON_TYPES"
-            ]
-            missing = [k for k in required_keys if k not in config]
-            if missing:
-                raise ValueError(f"Missing required keys: {missing}")
-
-            scan_config = ScanConfig(config)
+            scan_config = scan_config_from_dict(config)
             profile_name = "custom"
             test_mode = scan_config.scan_mode == "single"
             test_realm = scan_config.realm if test_mode else None
@@ -1575,28 +5342,85 @@ def main():
         test_mode, test_realm = select_scan_type()
         scan_config = get_scan_config(profile_name)
 
-    # === Prepare Blizzard session and data
-    session, headers, raidbots_data, fallback_data, curve_data = prepare_session_and_data()
+    STREAM_AUCTIONS = args.stream
+    SCAN_ENGINE = args.engine
+    HOLD_REGION_AUCTIONS = args.region_auctions
+    if args.engine == 'numpy' and load_numpy() is None:
+        logging.warning("⚠️ numpy is not installed; using the python filter engine")
+
+    reset_scan_metrics()
+    if args.replay:
+        # === Replay archived snapshots without touching the network
+        try:
+            REPLAY_TIMESTAMP = parse_replay_timestamp(args.replay)
+        except ValueError as e:
+            parser.error(f"invalid --replay timestamp: {e}")
+        session, headers, raidbots_data, fallback_data, curve_data = prepare_replay_data()
+        realms = determine_replay_realms(test_mode, test_realm, REPLAY_TIMESTAMP)
+        if not realms:
+            logging.error(f"❌ No archived snapshots found in {SNAPSHOT_ARCHIVE_DIR} at or before {args.replay}")
+            sys.exit(1)
+        # Replays never advance the live scan order
+        test_mode = True
+    else:
+        # === Prepare Blizzard session and data
+        session, headers, raidbots_data, fallback_data, curve_data = prepare_session_and_data(args.workers)
 
-    # === Determine realms to scan
-    realms = determine_realms(test_mode, test_realm)
+        # === Determine realms to scan
+        realms = determine_realms(test_mode, test_realm)
 
     # === Parse filters
     normal_filters, max_stat_filters = parse_filter_types(scan_config.filter_type)
-    active_filters = {f: set(FILTER_ID_MAP[f]) for f in normal_filters if f in FILTER_ID_MAP}
+    active_filters = {f: FILTER_ID_SETS[f] for f in normal_filters if f in FILTER_ID_SETS}
     filter_str = ", ".join(scan_config.filter_type)
 
     logging.info(f"🔍 Scanning {len(realms)} realm(s) for {filter_str or 'any'} gear (ilvl {scan_config.MIN_ILVL}-{scan_config.MAX_ILVL})...")
 
+    if args.trace or args.trace_item or args.trace_realm:
+        start_trace(args.trace or TRACE_FILE, args.trace_sample, args.trace_item, args.trace_realm)
+    if args.profile:
+        # Per-realm allocation sites need one realm at a time (tracemalloc is process-wide)
+        if args.workers > 1 or args.pipeline or args.two_phase:
+            logging.info("🔬 --profile scans realms serially; ignoring --workers/--pipeline/--two-phase")
+        args.workers, args.pipeline, args.two_phase = 1, False, False
+        active_profiler = RealmProfiler()
+    elif args.pipeline and args.two_phase:
+        logging.warning("⚠️ --pipeline and --two-phase are alternatives; running the two-phase scan")
+
     # === Run scan and output results
     start_time = perf_counter()
-    results, item_cache = scan_realms(
-        realms, session, headers,
-        raidbots_data, fallback_data, curve_data,
-        scan_config, active_filters, max_stat_filters, test_mode
-    )
-    display_results(results, realms, raidbots_data, item_cache, filter_str)
-    print_scan_summary(start_time, len(realms))
+    try:
+        results, item_cache = scan_realms(
+            realms, session, headers,
+            raidbots_data, fallback_data, curve_data,
+            scan_config, active_filters, max_stat_filters, test_mode,
+            workers=args.workers, two_phase=args.two_phase, pipeline=args.pipeline
+        )
+        with scan_metrics.phase('output'):
+            display_results(results, realms, raidbots_data, item_cache, filter_str)
+            if HOLD_REGION_AUCTIONS:
+                write_region_auctions_csv()
+                logging.info(f"🗺️  Held {region_auctions.total_auctions()} auction(s) from {len(region_auctions.realms())} realm(s) "
+                             f"in {region_auctions.nbytes() / 1e6:.1f} MB; listings written to {REGION_AUCTIONS_CSV}")
+
+        # === Run report and history
+        report = scan_metrics.report(
+            realms=len(realms), results=len(results), profile=profile_name, filters=scan_config.filter_type,
+            mode=scan_mode_label(args.two_phase, args.pipeline),
+            workers=args.workers, engine=scan_engine(), stream=STREAM_AUCTIONS, replay=args.replay,
+        )
+        history = write_scan_report(report)
+        logging.info(f"📈 Run report written to {SCAN_REPORT_FILE} ({len(history) + 1} run(s) in {SCAN_HISTORY_FILE})")
+        median = duration_regression(report, history)
+        if median is not None:
+            logging.warning(f"⚠️ Scan took {report['duration_seconds']:.1f}s, {report['duration_seconds'] / median:.2f}x "
+                            f"the median of recent comparable runs ({median:.1f}s)")
+        print_scan_summary(start_time, len(realms), report)
+    finally:
+        stop_trace()
+        if active_profiler is not None:
+            active_profiler.close()
+            active_profiler = None
 
         
 if __name__ == '__main__':
@@ -86,6 +86,14 @@ $(document).ready(function () {
                         : data;
                 }
             },
+            {
+                data: 'max_ilvl',
+                render: function (data, type) {
+                    return type === 'display'
+                        ? `<span class="stat-ilvl">${data}</span>`
+                        : data;
+                }
+            },
             {
                 data: 'buyout',
                 render: function (data, type) {
@@ -129,9 +137,10 @@ $(document).ready(function () {
         $('#scanStatus').html('');
         $('#scanProgress').removeClass('d-none');
         $('#scanProgressBar')
-            .removeClass('bg-danger bg-success')
+            .removeClass('bg-danger bg-success bg-warning')
             .addClass('progress-bar-animated')
-            .text('Scanning...');
+            .css('width', '100%')
+            .text('Submitting...');
 
         const selectedSlots = Array.from(activeSlots);
         const selectedArmorTypes = Array.from(activeArmorTypes);
@@ -188,7 +197,6 @@ $(document).ready(function () {
                 const versVal = parseInt($('#vers-val').val()) || 0;
                 const masteryVal = parseInt($('#mastery-val').val()) || 0;
                 const speedChecked = $('#speed').is(':checked');
-                const prismaticChecked = $('#prismatic').is(':checked');
 
                 config.STAT_DISTRIBUTION_THRESHOLDS = {
                     Haste: hasteVal,
@@ -199,9 +207,7 @@ $(document).ready(function () {
                 };
 
                 // Auto-add stats to FILTER_TYPE only if thresholds are > 0
-                const filters = [];
-                if (speedChecked) filters.push("Speed");
-                if (prismaticChecked) filters.push("Prismatic");
+                const filters = $('.bonus-check:checked').map((_, el) => el.value).get();
 
                 config.FILTER_TYPE = filters;
                 }
@@ -209,9 +215,7 @@ $(document).ready(function () {
             const selectedStats = $('.stat-check:checked').map((_, el) => el.value).get();
             const selectedMax = $('.max-stat-check:checked').map((_, el) => el.value).get();
 
-            const otherFilters = [];
-            if ($('#speed').is(':checked')) otherFilters.push("Speed");
-            if ($('#prismatic').is(':checked')) otherFilters.push("Prismatic");
+            const otherFilters = $('.bonus-check:checked').map((_, el) => el.value).get();
 
             const combined = [...selectedStats, ...selectedMax, ...otherFilters];
 
@@ -229,7 +233,7 @@ $(document).ready(function () {
             <strong>Max Buyout:</strong> ${config.MAX_BUYOUT}g<br>
             <strong>Filters:</strong> ${config.FILTER_TYPE?.join(", ") || "All"}`);
 
-        // === AJAX POST to Flask backend ===
+        // === AJAX POST to Flask backend (returns a job ID straight away) ===
         $.ajax({
             type: 'POST',
             url: '/scan',
@@ -237,43 +241,18 @@ $(document).ready(function () {
             data: JSON.stringify(config),
             success: function (response) {
                 if (response.success) {
-                    if (response.no_results) {
-                        $('#scanProgressBar')
-                            .removeClass('bg-success bg-danger')
-                            .addClass('bg-warning')
-                            .removeClass('progress-bar-animated')
-                            .text('⚠️ No results found');
-
-                        showScanMessage('⚠️ Scan completed but no results matched filters.', 'warning');
-
-                        $('#gearTable').DataTable().clear().draw();
-
-                        // ✅ Hide scan status after delay (only if no results)
-                        setTimeout(() => {
-                            $('#scanProgress').addClass('d-none');
-                        }, 4000);
-                    } else {
-                        $('#scanProgressBar')
-                            .removeClass('bg-danger')
-                            .addClass('bg-success')
-                            .removeClass('progress-bar-animated')
-                            .text('✅ Scan complete');
-
-                        showScanMessage('✅ Scan completed with new results.', 'success');
-
-                        setTimeout(() => {
-                            $('#scanProgress').addClass('d-none');
-                            reloadTable(true);
-                        }, 1000);
-                    }
+                    activeJobId = response.job_id;
+                    $('#cancelScan').removeClass('d-none').prop('disabled', false);
+                    pollScanStatus(response.job_id);
                 }
             },
-            error: function () {
+            error: function (xhr) {
+                const reason = xhr.responseJSON?.error;
                 $('#scanProgressBar')
                     .removeClass('bg-success')
                     .addClass('bg-danger')
                     .removeClass('progress-bar-animated')
-                    .text('❌ AJAX error');
+                    .text(reason ? `❌ ${reason}` : '❌ AJAX error');
             }
         });
 
@@ -281,14 +260,97 @@ $(document).ready(function () {
     });
 
 
-    // === Reloads table from backend data ===
-    function reloadTable(force = false) {
-        $.get('/reload', function (data) {
+    // === Polls a scan job until it finishes ===
+    let activeJobId = null;
+
+    function pollScanStatus(jobId) {
+        $.get(`/scan/${jobId}`, function (job) {
+            if (jobId !== activeJobId) return;
+
+            if (job.status === 'queued' || job.status === 'running') {
+                const percent = Math.round(job.progress * 100);
+                const label = job.status === 'queued'
+                    ? 'Queued...'
+                    : job.stage === 'scanning'
+                        ? `Scanning ${job.realms_done}/${job.realms_total} realm(s)`
+                        : job.stage === 'writing' ? 'Writing results...' : 'Preparing...';
+                $('#scanProgressBar')
+                    .css('width', job.stage === 'scanning' ? `${Math.max(percent, 5)}%` : '100%')
+                    .text(label);
+                setTimeout(() => pollScanStatus(jobId), 1000);
+                return;
+            }
+
+            activeJobId = null;
+            $('#cancelScan').addClass('d-none');
+            $('#scanProgressBar').css('width', '100%').removeClass('progress-bar-animated');
+
+            if (job.status === 'done' && job.results === 0) {
+                $('#scanProgressBar')
+                    .removeClass('bg-success bg-danger')
+                    .addClass('bg-warning')
+                    .text('⚠️ No results found');
+
+                showScanMessage('⚠️ Scan completed but no results matched filters.', 'warning');
+
+                $('#gearTable').DataTable().clear().draw();
+
+                // ✅ Hide scan status after delay (only if no results)
+                setTimeout(() => {
+                    $('#scanProgress').addClass('d-none');
+                }, 4000);
+            } else if (job.status === 'done') {
+                $('#scanProgressBar')
+                    .removeClass('bg-danger')
+                    .addClass('bg-success')
+                    .text('✅ Scan complete');
+
+                showScanMessage('✅ Scan completed with new results.', 'success');
+
+                setTimeout(() => {
+                    $('#scanProgress').addClass('d-none');
+                    reloadTable(true, `/scan/${jobId}/results`);
+                }, 1000);
+            } else if (job.status === 'cancelled') {
+                $('#scanProgressBar')
+                    .removeClass('bg-success bg-danger')
+                    .addClass('bg-warning')
+                    .text(`🛑 Cancelled after ${job.realms_done}/${job.realms_total} realm(s)`);
+
+                showScanMessage('🛑 Scan cancelled.', 'warning');
+            } else {
+                $('#scanProgressBar')
+                    .removeClass('bg-success')
+                    .addClass('bg-danger')
+                    .text('❌ Scan failed');
+
+                showScanMessage(`❌ Scan failed: ${job.error}`, 'danger');
+            }
+        }).fail(function () {
+            // Keep polling through transient errors while the job is still ours
+            if (jobId === activeJobId) {
+                setTimeout(() => pollScanStatus(jobId), 3000);
+            }
+        });
+    }
+
+    $('#cancelScan').click(function () {
+        if (!activeJobId) return;
+        $(this).prop('disabled', true);
+        $.post(`/scan/${activeJobId}/cancel`);
+        $('#scanProgressBar').text('Cancelling...');
+    });
+
+    // === Reloads table from backend data (the CLI's CSV, or a finished scan job's results) ===
+    function reloadTable(force = false, url = '/reload') {
+        $.get(url, function (data) {
             const table = $('#gearTable').DataTable();
             table.clear();
 
             for (let row of data) {
                 const ilvl = parseInt(row.ilvl) || 0;
+                // Older CSVs have no max_ilvl column
+                const maxIlvl = parseInt(row.max_ilvl) || ilvl;
                 const gold = parseInt(row.buyout_gold) || 0;
 
                 // === Format stat cells
@@ -302,6 +364,7 @@ $(document).ready(function () {
 
                 // === Format ilvl and buyout
                 const ilvlCell = `<span class="stat-ilvl" data-sort="${ilvl}">${ilvl}</span>`;
+                const maxIlvlCell = `<span class="stat-ilvl" data-sort="${maxIlvl}">${maxIlvl}</span>`;
                 const goldCell = `<span class="stat-buyout" data-sort="${gold}">${gold.toLocaleString()}g</span>`;
 
                 // === Add row to table with formatted cells
@@ -314,6 +377,7 @@ $(document).ready(function () {
                     stat2: stat2,
                     name: row.name || "—",
                     ilvl: ilvlCell,
+                    max_ilvl: maxIlvlCell,
                     buyout: goldCell
                 });
             }
@@ -337,11 +401,12 @@ $(document).ready(function () {
         activeSlots.clear();
         activeArmorTypes.clear();
 
-        // === Apply all 10 stat-related checkboxes
+        // === Apply all stat and bonus checkboxes
         const allStatKeys = [
             "haste", "crit", "vers", "mastery",
             "max-haste", "max-crit", "max-vers", "max-mastery",
-            "speed", "prismatic"
+            "speed", "prismatic", "socket", "leech", "avoidance", "indestructible",
+            "strength", "agility", "intellect"
         ];
 
         // Clear all stat filters first
@@ -350,7 +415,7 @@ $(document).ready(function () {
             const isEnabled = preset[key] === true;
             $(`#${key}`).prop("checked", isEnabled);
 
-            // Only count actual filtering stats, not speed/prismatic
+            // Only count actual secondary-stat filters, not bonus toggles
             if (
                 isEnabled &&
                 ["haste", "crit", "vers", "mastery", "max-haste", "max-crit", "max-vers", "max-mastery"].includes(key)
@@ -393,6 +458,13 @@ $(document).ready(function () {
         const filterTypes = [];
         if (preset.speed) filterTypes.push("Speed");
         if (preset.prismatic) filterTypes.push("Prismatic");
+        if (preset.socket) filterTypes.push("Socket");
+        if (preset.leech) filterTypes.push("Leech");
+        if (preset.avoidance) filterTypes.push("Avoidance");
+        if (preset.indestructible) filterTypes.push("Indestructible");
+        if (preset.strength) filterTypes.push("Strength");
+        if (preset.agility) filterTypes.push("Agility");
+        if (preset.intellect) filterTypes.push("Intellect");
         if (preset.haste) filterTypes.push("Haste");
         if (preset.crit) filterTypes.push("Crit");
         if (preset.vers) filterTypes.push("Vers");